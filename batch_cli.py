@@ -0,0 +1,336 @@
+import argparse
+import contextlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import requests
+
+from iiko_api import IikoClient, IikoApiError, BASE_URL
+from disk_cache import DiskCache
+from menu_index import MenuIndex
+from order_batch import _error_message
+from order_tracker import OrderStatusTracker
+from order_utils import OrderBuilder, OrderValidationError, FIRST_SIZE
+from token_manager import TokenManager
+from transport import SingleFlight
+
+
+class BatchContext:
+    """
+    Общие для всех строк пакета токены, меню, группы терминалов и отслеживание заказов
+
+    Каждый объект загружается один раз: строки с одинаковыми apiLogin и
+    организацией используют один токен, одно меню и одну группу терминалов.
+
+    Args:
+        client (IikoClient): Клиент iiko API
+        track_status (bool): Отслеживать статус созданных заказов
+    """
+
+    def __init__(self, client, track_status=False):
+        self.client = client
+        self.track_status = track_status
+        self._tokens = {}
+        self._loaded = {}
+        self._trackers = {}
+        self._lock = threading.Lock()
+        self._loading = SingleFlight()
+
+    def _load(self, key, function):
+        value = self._loaded.get(key)
+        if value is None:
+            value = self._loading.do(key, function)
+            self._loaded[key] = value
+        return value
+
+    def token(self, api_login):
+        with self._lock:
+            token = self._tokens.get(api_login)
+            if token is None:
+                token = self._tokens[api_login] = TokenManager(api_login, client=self.client)
+        if not token.get_token():
+            raise ValueError(f"Не удалось получить токен для apiLogin {api_login}")
+        return token
+
+    def organization_id(self, api_login, token):
+        def load():
+            organizations = self.client.call("organizations", {"includeDisabled": False}, token)['organizations']
+            if not organizations:
+                raise ValueError(f"У apiLogin {api_login} нет организаций")
+            return organizations[0]['id']
+        return self._load(("organization", api_login), load)
+
+    def terminal_group_id(self, api_login, token, organization_id):
+        def load():
+            result = self.client.call("terminal_groups", {"organizationIds": [organization_id]}, token)
+            for group in result.get('terminalGroups') or []:
+                for item in group.get('items') or []:
+                    return item['id']
+            raise ValueError(f"У организации {organization_id} нет групп терминалов")
+        return self._load(("terminal_group", api_login, organization_id), load)
+
+    def builder(self, api_login, token, organization_id):
+        def load():
+            menu = self.client.call("nomenclature", {"organizationId": organization_id, "startRevision": 0}, token)
+            return OrderBuilder(MenuIndex(menu), source_key="batch-cli", external_number_prefix="BATCH")
+        return self._load(("builder", api_login, organization_id), load)
+
+    def tracker(self, api_login, token):
+        with self._lock:
+            tracker = self._trackers.get(api_login)
+            if tracker is None:
+                tracker = self._trackers[api_login] = OrderStatusTracker(token, self.client, min_interval=0.5)
+                tracker.start()
+            return tracker
+
+    def close(self):
+        for tracker in self._trackers.values():
+            tracker.stop()
+        for token in self._tokens.values():
+            token.close()
+
+
+def _order_items(builder, spec):
+    items = spec.get('items')
+    if not items:
+        # Без позиций заказывается первый продукт меню, как в интерактивном режиме
+        products = [product for product in builder.menu.products.values()
+                    if not product.is_deleted and product.type != 'Modifier']
+        if not products:
+            raise OrderValidationError("В меню нет продуктов для заказа")
+        return [builder.item(products[0].id)]
+
+    order_items = []
+    for item in items:
+        modifiers = [
+            builder.modifier(modifier['productId'], modifier.get('amount', 1),
+                             modifier.get('productGroupId'), modifier.get('price'))
+            for modifier in item.get('modifiers') or []
+        ]
+        order_items.append(builder.item(
+            item['productId'],
+            item.get('amount', 1),
+            item['productSizeId'] if 'productSizeId' in item else FIRST_SIZE,
+            item.get('price'),
+            modifiers,
+            item.get('comment', "")
+        ))
+    return order_items
+
+
+def process_line(context, line_number, spec, defaults, status_timeout, dry_run=False, repeat=1):
+    """
+    Выполняет для одной строки пакета цепочку токен -> меню -> заказ -> статус
+
+    Args:
+        context (BatchContext): Общие данные пакета
+        line_number (int): Номер строки во входном файле (None без --input)
+        spec (dict): Описание заказа (поля apiLogin, organizationId, terminalGroupId,
+            items, tableIds, customerName, orderId, externalNumber)
+        defaults (dict): Значения полей, не указанных в строке
+        status_timeout (float): Сколько секунд ждать финального статуса заказа
+        dry_run (bool): Только собрать заказ, не отправляя его
+        repeat (int): Номер повтора строки при --count (с 1)
+
+    Returns:
+        dict: Результат строки для вывода в JSON
+    """
+    started = time.perf_counter()
+    spec = dict(defaults, **{key: value for key, value in spec.items() if value is not None})
+    result = {
+        "line": line_number,
+        "repeat": repeat,
+        "apiLogin": spec.get('apiLogin'),
+        "organizationId": spec.get('organizationId'),
+        "orderId": None,
+        "success": False
+    }
+
+    try:
+        api_login = spec.get('apiLogin')
+        if not api_login:
+            raise ValueError("Не указан apiLogin")
+
+        token = context.token(api_login)
+        organization_id = spec.get('organizationId') or context.organization_id(api_login, token)
+        result["organizationId"] = organization_id
+        terminal_group_id = spec.get('terminalGroupId') or context.terminal_group_id(api_login, token, organization_id)
+
+        builder = context.builder(api_login, token, organization_id)
+        order = builder.build(
+            _order_items(builder, spec),
+            order_id=spec.get('orderId'),
+            external_number=spec.get('externalNumber'),
+            table_ids=spec.get('tableIds')
+        )
+        if spec.get('customerName'):
+            order["customer"]["name"] = spec['customerName']
+        result["orderId"] = order["id"]
+
+        if dry_run:
+            result["order"] = order
+            result["success"] = True
+            return result
+
+        body = builder.encode_payload(organization_id, terminal_group_id, order)
+        order_info = context.client.call("order/create", body, token).get('orderInfo') or {}
+        result["creationStatus"] = order_info.get('creationStatus')
+
+        if context.track_status and order_info.get('creationStatus') not in ("Success", "Error"):
+            future = context.tracker(api_login, token).track(order["id"], organization_id)
+            try:
+                order_info = future.result(status_timeout)
+            except FutureTimeoutError:
+                context.tracker(api_login, token).untrack(order["id"])
+                raise ValueError(f"Статус заказа не получен за {status_timeout} с")
+            result["creationStatus"] = order_info.get('creationStatus')
+
+        if order_info.get('creationStatus') == 'Error':
+            error_info = order_info.get('errorInfo') or {}
+            result["error"] = error_info.get('message', 'Неизвестная ошибка')
+        else:
+            result["success"] = True
+            order_details = order_info.get('order') or {}
+            result["number"] = order_details.get('number')
+    except (IikoApiError, requests.exceptions.RequestException, OrderValidationError,
+            ValueError, KeyError) as e:
+        result["error"] = _error_message(e)
+    finally:
+        result["elapsed"] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def _read_specs(args):
+    # Отдает (номер строки файла, номер повтора, описание заказа или ошибка разбора)
+    if args.input is None:
+        for repeat in range(1, args.count + 1):
+            yield None, repeat, {}
+        return
+
+    stream = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError:
+                # Строка с ошибкой не выполняется, поэтому сообщается о ней один раз
+                yield line_number, 1, ValueError(f"Некорректный JSON: {line[:80]}")
+                continue
+            for repeat in range(1, args.count + 1):
+                yield line_number, repeat, spec
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_batch(args, output=None):
+    """
+    Выполняет пакет заказов, выводя результат каждой строки в output по мере готовности
+
+    Args:
+        args (argparse.Namespace): Разобранные аргументы командной строки
+        output: Файл для результатов (по умолчанию stdout)
+
+    Returns:
+        int: Количество строк с ошибкой
+    """
+    output = output or sys.stdout
+    defaults = {
+        "apiLogin": args.api_login,
+        "organizationId": args.organization_id,
+        "terminalGroupId": args.terminal_group_id,
+        "customerName": args.customer_name
+    }
+    if args.product_id:
+        defaults["items"] = [{"productId": product_id, "amount": args.amount} for product_id in args.product_id]
+
+    client = IikoClient(base_url=args.base_url, pool_maxsize=args.concurrency,
+                        cache=DiskCache() if args.cache else None)
+    context = BatchContext(client, track_status=args.wait_status)
+    output_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(args.concurrency)
+    failures = [0]
+
+    def write(result):
+        with output_lock:
+            if not result["success"]:
+                failures[0] += 1
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+
+    def run_line(line_number, repeat, spec):
+        try:
+            if isinstance(spec, Exception):
+                write({"line": line_number, "repeat": repeat, "success": False, "error": str(spec)})
+            else:
+                write(process_line(context, line_number, spec, defaults, args.status_timeout, args.dry_run,
+                                   repeat))
+        except Exception as e:
+            write({"line": line_number, "repeat": repeat, "success": False,
+                   "error": f"Непредвиденная ошибка: {e}"})
+        finally:
+            slots.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            # Строки читаются по мере освобождения слотов, поэтому большой файл не загружается целиком
+            for line_number, repeat, spec in _read_specs(args):
+                slots.acquire()
+                executor.submit(run_line, line_number, repeat, spec)
+    finally:
+        context.close()
+        client.close()
+    return failures[0]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Пакетное создание заказов iiko без интерактивного ввода. "
+                    "Результат каждой строки выводится в stdout одной строкой JSON."
+    )
+    parser.add_argument("--input", "-i", help="файл JSONL с описаниями заказов ('-' - stdin)")
+    parser.add_argument("--api-login", help="apiLogin по умолчанию")
+    parser.add_argument("--organization-id", help="ID организации (по умолчанию первая организация apiLogin)")
+    parser.add_argument("--terminal-group-id", help="ID группы терминалов (по умолчанию первая группа организации)")
+    parser.add_argument("--product-id", action="append", help="ID продукта (можно указать несколько раз)")
+    parser.add_argument("--amount", type=float, default=1, help="количество каждого продукта")
+    parser.add_argument("--customer-name", help="имя клиента")
+    parser.add_argument("--count", type=int, default=1, help="сколько раз выполнить каждую строку")
+    parser.add_argument("--concurrency", type=int, default=8, help="одновременно обрабатываемых строк")
+    parser.add_argument("--wait-status", action="store_true", help="дождаться финального статуса заказов")
+    parser.add_argument("--status-timeout", type=float, default=60.0, help="ожидание статуса в секундах")
+    parser.add_argument("--dry-run", action="store_true", help="собрать заказы, не отправляя их")
+    parser.add_argument("--cache", action="store_true", help="использовать кэш iiko_cache.sqlite3")
+    parser.add_argument("--base-url", default=BASE_URL, help="базовый URL API")
+    return parser
+
+
+def main(argv=None):
+    """
+    Точка входа пакетного режима: python main.py batch [параметры]
+
+    Returns:
+        int: Код завершения (1, если хотя бы одна строка завершилась ошибкой)
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.input is None and not args.api_login:
+        parser.error("укажите --input или --api-login")
+    if args.concurrency < 1 or args.count < 1:
+        parser.error("--concurrency и --count должны быть положительными")
+
+    output = sys.stdout
+    # Сообщения библиотеки выводятся в stderr, чтобы в stdout были только результаты
+    with contextlib.redirect_stdout(sys.stderr):
+        failures = run_batch(args, output)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
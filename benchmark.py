@@ -0,0 +1,359 @@
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+import requests
+
+from codec import Codec
+from iiko_api import IikoClient, IikoApiError, _create_order_payload
+from iiko_api_async import AsyncIikoClient
+from mock_server import MockIikoServer
+from order_utils import build_simple_order, get_product_size_and_price
+from transport import RetryPolicy
+
+
+def _organizations(context):
+    return "organizations", {"returnAdditionalInfo": True, "includeDisabled": True}
+
+
+def _nomenclature(context):
+    return "nomenclature", {"organizationId": context["organization_id"], "startRevision": 0}
+
+
+def _terminal_groups(context):
+    return "terminal_groups", {"organizationIds": [context["organization_id"]], "includeDisabled": True}
+
+
+def _restaurant_sections(context):
+    return "reserve/available_restaurant_sections", {
+        "terminalGroupIds": [context["terminal_group_id"]],
+        "returnSchema": True,
+        "revision": 0
+    }
+
+
+def _create_order(context):
+    product = context["product"]
+    product_size_id, price = get_product_size_and_price(product)
+    order = build_simple_order(product["id"], product_size_id, price)
+    return "order/create", _create_order_payload(
+        context["organization_id"], context["terminal_group_id"], order, None
+    )
+
+
+def _order_by_id(context):
+    return "order/by_id", {
+        "orderIds": context["order_ids"],
+        "organizationIds": [context["organization_id"]]
+    }
+
+
+# Сценарий возвращает путь метода API и тело очередного запроса
+SCENARIOS = {
+    "organizations": _organizations,
+    "nomenclature": _nomenclature,
+    "terminal_groups": _terminal_groups,
+    "restaurant_sections": _restaurant_sections,
+    "create_order": _create_order,
+    "order_by_id": _order_by_id
+}
+
+
+def percentile(sorted_values, fraction):
+    """
+    Возвращает перцентиль отсортированного списка
+
+    Args:
+        sorted_values (list): Отсортированные значения
+        fraction (float): Доля (0.5 - медиана, 0.99 - p99)
+
+    Returns:
+        float: Значение перцентиля или 0 для пустого списка
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # В Linux ru_maxrss в килобайтах, в macOS в байтах
+    if sys.platform == "darwin":
+        return rss / (1024 * 1024)
+    return rss / 1024
+
+
+class BenchmarkResult:
+    """
+    Результат одного сценария
+
+    Attributes:
+        name (str): Название сценария
+        requests (int): Количество запросов
+        errors (int): Количество ошибок
+        elapsed (float): Общее время в секундах
+        latencies (list): Время каждого успешного запроса в секундах
+        traced_peak_mb (float): Пик памяти по tracemalloc (если включен)
+    """
+
+    def __init__(self, name, requests, errors, elapsed, latencies, traced_peak_mb=None):
+        self.name = name
+        self.requests = requests
+        self.errors = errors
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies)
+        self.traced_peak_mb = traced_peak_mb
+        self.max_rss_mb = _max_rss_mb()
+
+    @property
+    def requests_per_second(self):
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            "scenario": self.name,
+            "requests": self.requests,
+            "errors": self.errors,
+            "elapsed_s": round(self.elapsed, 3),
+            "rps": round(self.requests_per_second, 1),
+            "p50_ms": round(percentile(self.latencies, 0.5) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 0.99) * 1000, 2),
+            "max_rss_mb": round(self.max_rss_mb, 1),
+            "traced_peak_mb": None if self.traced_peak_mb is None else round(self.traced_peak_mb, 1)
+        }
+
+
+def run_scenario(client, token, name, context, total, concurrency):
+    """
+    Выполняет сценарий синхронным клиентом в нескольких потоках
+
+    Args:
+        client (IikoClient): Клиент iiko API
+        token (str | TokenManager): Токен доступа
+        name (str): Название сценария из SCENARIOS
+        context (dict): Данные для построения запросов
+        total (int): Общее количество запросов
+        concurrency (int): Количество потоков
+
+    Returns:
+        tuple: (errors, latencies)
+    """
+    build_request = SCENARIOS[name]
+    latencies = []
+    errors = [0]
+    remaining = [total]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            path, payload = build_request(context)
+            started = time.perf_counter()
+            try:
+                client.call(path, payload, token)
+            except (IikoApiError, requests.exceptions.RequestException):
+                with lock:
+                    errors[0] += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors[0], latencies
+
+
+async def run_scenario_async(client, token, name, context, total, concurrency):
+    """
+    Выполняет сценарий асинхронным клиентом, держа concurrency запросов одновременно
+
+    Args:
+        client (AsyncIikoClient): Асинхронный клиент iiko API
+        token (str): Токен доступа
+        name (str): Название сценария из SCENARIOS
+        context (dict): Данные для построения запросов
+        total (int): Общее количество запросов
+        concurrency (int): Количество одновременных запросов
+
+    Returns:
+        tuple: (errors, latencies)
+    """
+    build_request = SCENARIOS[name]
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            path, payload = build_request(context)
+            started = time.perf_counter()
+            try:
+                await client.call(path, payload, token)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*[one() for _ in range(total)])
+    return errors, latencies
+
+
+def prepare_context(client, token):
+    """
+    Получает организацию, группу терминалов, продукт и несколько заказов для сценариев
+
+    Args:
+        client (IikoClient): Клиент iiko API
+        token (str): Токен доступа
+
+    Returns:
+        dict: Данные для построения запросов
+    """
+    organizations = client.call("organizations", {"returnAdditionalInfo": True}, token)["organizations"]
+    organization_id = organizations[0]["id"]
+
+    terminal_groups = client.call("terminal_groups", {"organizationIds": [organization_id]}, token)
+    terminal_group_id = terminal_groups["terminalGroups"][0]["items"][0]["id"]
+
+    menu = client.call("nomenclature", {"organizationId": organization_id, "startRevision": 0}, token)
+    context = {
+        "organization_id": organization_id,
+        "terminal_group_id": terminal_group_id,
+        "product": menu["products"][0],
+        "order_ids": []
+    }
+
+    for _ in range(10):
+        path, payload = _create_order(context)
+        context["order_ids"].append(client.call(path, payload, token)["orderInfo"]["id"])
+    return context
+
+
+def run_benchmark(base_url, api_login, scenarios, total, concurrency, use_async=False, trace_memory=False,
+                  json_codec=None):
+    """
+    Запускает сценарии и возвращает результаты
+
+    Args:
+        base_url (str): Базовый URL API
+        api_login (str): API логин
+        scenarios (list): Названия сценариев
+        total (int): Количество запросов в каждом сценарии
+        concurrency (int): Количество одновременных запросов
+        use_async (bool): Использовать AsyncIikoClient
+        trace_memory (bool): Измерять пик памяти через tracemalloc (замедляет работу)
+        json_codec (str): Реализация JSON клиента ("json", "orjson", None - самая быстрая)
+
+    Returns:
+        list: BenchmarkResult для каждого сценария
+    """
+    # Подготовка выполняется с повторами, а сами сценарии без них,
+    # чтобы ошибки сервера были видны в статистике. Одинаковые запросы
+    # сценария не объединяются, иначе до сервера дойдет лишь часть из них
+    with IikoClient(base_url=base_url) as setup_client:
+        token = setup_client.call("access_token", {"apiLogin": api_login})["token"]
+        context = prepare_context(setup_client, token)
+
+    no_retries = RetryPolicy(max_retries=0)
+    codec = Codec(json_codec)
+    client = IikoClient(base_url=base_url, pool_maxsize=concurrency, retry_policy=no_retries, coalesce=False,
+                        codec=codec)
+
+    results = []
+    for name in scenarios:
+        if trace_memory:
+            tracemalloc.start()
+
+        started = time.perf_counter()
+        if use_async:
+            async def run():
+                async with AsyncIikoClient(base_url=base_url, limit=concurrency,
+                                           retry_policy=no_retries, coalesce=False,
+                                           codec=codec) as async_client:
+                    return await run_scenario_async(async_client, token, name, context, total, concurrency)
+            errors, latencies = asyncio.run(run())
+        else:
+            errors, latencies = run_scenario(client, token, name, context, total, concurrency)
+        elapsed = time.perf_counter() - started
+
+        traced_peak_mb = None
+        if trace_memory:
+            traced_peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+
+        results.append(BenchmarkResult(name, total, errors, elapsed, latencies, traced_peak_mb))
+
+    client.close()
+    return results
+
+
+def print_results(results):
+    """Выводит результаты в виде таблицы"""
+    header = f"{'Сценарий':<22}{'Запросов':>10}{'Ошибок':>8}{'RPS':>10}{'p50, мс':>10}{'p99, мс':>10}{'RSS, МБ':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        row = result.to_dict()
+        print(f"{row['scenario']:<22}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10}"
+              f"{row['p50_ms']:>10}{row['p99_ms']:>10}{row['max_rss_mb']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест клиента iiko API на mock-сервере")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"сценарии через запятую ({', '.join(SCENARIOS)})")
+    parser.add_argument("--requests", type=int, default=500, help="запросов в каждом сценарии")
+    parser.add_argument("--concurrency", type=int, default=10, help="одновременных запросов")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="использовать AsyncIikoClient")
+    parser.add_argument("--base-url", help="URL уже запущенного сервера (по умолчанию встроенный mock)")
+    parser.add_argument("--api-login", default="benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка встроенного mock-сервера")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ошибок встроенного mock-сервера")
+    parser.add_argument("--menu-size", type=int, default=1000, help="размер меню встроенного mock-сервера")
+    parser.add_argument("--json-codec", choices=("json", "orjson"), help="реализация JSON (по умолчанию самая быстрая)")
+    parser.add_argument("--trace-memory", action="store_true", help="измерять пик памяти через tracemalloc")
+    parser.add_argument("--json", action="store_true", help="вывести результаты в JSON")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(unknown)}")
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = MockIikoServer(latency=args.latency, error_rate=args.error_rate,
+                                menu_size=args.menu_size).start()
+        base_url = server.url
+
+    try:
+        results = run_benchmark(base_url, args.api_login, scenarios, args.requests, args.concurrency,
+                                use_async=args.use_async, trace_memory=args.trace_memory,
+                                json_codec=args.json_codec)
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.json:
+        print(json.dumps([result.to_dict() for result in results], ensure_ascii=False, indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
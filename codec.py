@@ -0,0 +1,249 @@
+import gzip
+import json
+import threading
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+# Тела запросов меньше этого размера не сжимаются: выигрыш меньше заголовков gzip
+DEFAULT_COMPRESS_MIN_SIZE = 16 * 1024
+
+
+class JsonCodec:
+    """
+    Кодирование и разбор JSON
+
+    Args:
+        name (str): Название реализации
+        dumps (callable): Функция data -> bytes (компактный JSON в UTF-8)
+        loads (callable): Функция bytes -> data
+    """
+    __slots__ = ("name", "dumps", "loads")
+
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f"JsonCodec({self.name!r})"
+
+
+def _stdlib_dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+
+STDLIB_JSON = JsonCodec("json", _stdlib_dumps, json.loads)
+
+# orjson кодирует NaN и бесконечность как null, а не выдает ошибку
+ORJSON = JsonCodec("orjson", orjson.dumps, orjson.loads) if orjson is not None else None
+
+JSON_CODECS = {codec.name: codec for codec in (STDLIB_JSON, ORJSON) if codec is not None}
+
+
+def get_json_codec(name=None):
+    """
+    Возвращает реализацию JSON по названию
+
+    Args:
+        name (str | JsonCodec): "json", "orjson" или None - самая быстрая из установленных
+
+    Returns:
+        JsonCodec: Реализация JSON
+
+    Raises:
+        ValueError: Если реализация не установлена
+    """
+    if isinstance(name, JsonCodec):
+        return name
+    if name is None:
+        return ORJSON or STDLIB_JSON
+    codec = JSON_CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Реализация JSON {name} не установлена (доступны: {', '.join(JSON_CODECS)})")
+    return codec
+
+
+def accept_encoding():
+    """Значение Accept-Encoding со всеми поддерживаемыми способами сжатия ответа"""
+    return "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+def compress(body, encoding="gzip"):
+    """
+    Сжимает тело запроса
+
+    Args:
+        body (bytes): Тело
+        encoding (str): gzip или br
+
+    Returns:
+        bytes: Сжатое тело
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    if encoding == "br":
+        if brotli is None:
+            raise ValueError("Для сжатия br нужен пакет brotli")
+        return brotli.compress(body, quality=5)
+    raise ValueError(f"Неизвестный способ сжатия: {encoding}")
+
+
+def decompress(body, encoding):
+    """
+    Распаковывает тело ответа по заголовку Content-Encoding
+
+    Args:
+        body (bytes): Тело ответа в том виде, в каком оно передано по сети
+        encoding (str): Значение Content-Encoding (None - тело не сжато)
+
+    Returns:
+        bytes: Распакованное тело
+    """
+    if not encoding:
+        return body
+    # Несколько способов перечисляются в порядке применения
+    for name in reversed([name.strip().lower() for name in encoding.split(',')]):
+        if name in ("gzip", "x-gzip"):
+            body = gzip.decompress(body)
+        elif name == "deflate":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+        elif name == "br" and brotli is not None:
+            body = brotli.decompress(body)
+        elif name not in ("", "identity"):
+            raise ValueError(f"Неподдерживаемый Content-Encoding: {encoding}")
+    return body
+
+
+class WireStats:
+    """
+    Объем тел запросов и ответов по методам API до и после сжатия
+
+    Передается в Codec(stats=...). Потоковые ответы (send_stream) не учитываются.
+    """
+
+    _FIELDS = ("requests", "request_bytes", "request_wire_bytes", "response_bytes", "response_wire_bytes")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def _counters(self, endpoint):
+        counters = self._endpoints.get(endpoint)
+        if counters is None:
+            counters = self._endpoints[endpoint] = dict.fromkeys(self._FIELDS, 0)
+        return counters
+
+    def record_request(self, endpoint, size, wire_size):
+        with self._lock:
+            counters = self._counters(endpoint)
+            counters["requests"] += 1
+            counters["request_bytes"] += size
+            counters["request_wire_bytes"] += wire_size
+
+    def record_response(self, endpoint, size, wire_size):
+        with self._lock:
+            counters = self._counters(endpoint)
+            counters["response_bytes"] += size
+            counters["response_wire_bytes"] += wire_size
+
+    def snapshot(self):
+        """
+        Возвращает счетчики по методам API
+
+        Returns:
+            dict: {endpoint: {"requests", "request_bytes", "request_wire_bytes",
+                "response_bytes", "response_wire_bytes"}}
+        """
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._endpoints.items()}
+
+    def totals(self):
+        """Сумма счетчиков по всем методам API"""
+        totals = dict.fromkeys(self._FIELDS, 0)
+        for counters in self.snapshot().values():
+            for field, value in counters.items():
+                totals[field] += value
+        return totals
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def print_summary(self):
+        """Выводит объем данных по методам API"""
+        print(f"{'Метод':<40} {'запросов':>9} {'отправлено':>12} {'получено':>12} {'без сжатия':>12}")
+        for endpoint, counters in sorted(self.snapshot().items()):
+            print(f"{endpoint:<40} {counters['requests']:>9} {counters['request_wire_bytes']:>12} "
+                  f"{counters['response_wire_bytes']:>12} {counters['response_bytes']:>12}")
+
+
+class Codec:
+    """
+    Кодирование тел запросов и ответов для IikoClient и AsyncIikoClient
+
+    Ответы запрашиваются сжатыми (gzip, deflate и br, если установлен
+    brotli) и разбираются выбранной реализацией JSON. Тела запросов больше
+    compress_min_size сжимаются, если это включено: сервер должен принимать
+    Content-Encoding в запросах.
+
+    Args:
+        json_codec (str | JsonCodec): "json", "orjson" или None - самая быстрая из установленных
+        compress_requests (bool): Сжимать большие тела запросов
+        compress_min_size (int): Минимальный размер тела для сжатия в байтах
+        compression (str): Способ сжатия запросов (gzip или br)
+        stats (WireStats): Учет объема данных по методам API
+    """
+
+    def __init__(self, json_codec=None, compress_requests=False, compress_min_size=DEFAULT_COMPRESS_MIN_SIZE,
+                 compression="gzip", stats=None):
+        self.json = get_json_codec(json_codec)
+        self.compress_requests = compress_requests
+        self.compress_min_size = compress_min_size
+        self.compression = compression
+        self.stats = stats
+        self.accept_encoding = accept_encoding()
+
+        if compress_requests and compression == "br" and brotli is None:
+            raise ValueError("Для сжатия br нужен пакет brotli")
+
+    def dumps(self, data):
+        return self.json.dumps(data)
+
+    def loads(self, body):
+        return self.json.loads(body)
+
+    def compress(self, body):
+        """
+        Сжимает тело запроса, если это включено и тело достаточно большое
+
+        Returns:
+            tuple: (body, content_encoding) - тело для отправки и значение
+                Content-Encoding (None, если тело не сжато)
+        """
+        if not self.compress_requests or len(body) < self.compress_min_size:
+            return body, None
+        return compress(body, self.compression), self.compression
+
+    def record_request(self, endpoint, size, wire_size):
+        if self.stats is not None:
+            self.stats.record_request(endpoint, size, wire_size)
+
+    def record_response(self, endpoint, size, wire_size):
+        if self.stats is not None:
+            self.stats.record_response(endpoint, size, wire_size)
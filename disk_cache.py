@@ -0,0 +1,170 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+DEFAULT_CACHE_FILE = "iiko_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    revision INTEGER,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class CacheEntry:
+    """
+    Запись кэша
+
+    Attributes:
+        value (dict): Сохраненный ответ API
+        revision (int): Ревизия ответа (если есть)
+        expired (bool): Истек ли срок жизни записи
+    """
+    __slots__ = ("value", "revision", "expired")
+
+    def __init__(self, value, revision, expired):
+        self.value = value
+        self.revision = revision
+        self.expired = expired
+
+
+def make_cache_key(endpoint, tenant, payload):
+    """
+    Формирует ключ кэша из метода API, клиента iiko и тела запроса
+
+    Args:
+        endpoint (str): Путь метода API
+        tenant (str): apiLogin или токен
+        payload (dict): Тело запроса
+
+    Returns:
+        str: Ключ кэша
+    """
+    raw = json.dumps([endpoint, tenant, payload], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """
+    Кэш ответов API в файле SQLite с ограничением срока жизни и размера
+
+    Файл можно использовать из нескольких процессов одновременно. Когда
+    записей становится больше max_entries, удаляются давно не читавшиеся.
+
+    Args:
+        path (str): Путь к файлу базы
+        max_entries (int): Максимум записей
+        timeout (float): Сколько секунд ждать блокировку базы другим процессом
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES, timeout=5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = threading.local()
+
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(_SCHEMA)
+            connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def _connection(self):
+        # Соединение SQLite нельзя разделять между потоками
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key, allow_expired=False):
+        """
+        Читает запись кэша
+
+        Args:
+            key (str): Ключ кэша
+            allow_expired (bool): Возвращать запись с истекшим сроком жизни
+
+        Returns:
+            CacheEntry: Запись или None
+        """
+        now = time.time()
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value, revision, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            expired = row[2] <= now
+            if expired and not allow_expired:
+                return None
+
+            connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+
+        return CacheEntry(json.loads(row[0]), row[1], expired)
+
+    def set(self, key, value, ttl, revision=None):
+        """
+        Сохраняет запись кэша
+
+        Args:
+            key (str): Ключ кэша
+            value (dict): Ответ API
+            ttl (float): Срок жизни в секундах
+            revision (int): Ревизия ответа
+        """
+        now = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, revision, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, revision, now + ttl, now)
+            )
+            self._evict(connection)
+
+    def touch(self, key, ttl):
+        """
+        Продлевает срок жизни записи, не изменяя ее
+
+        Args:
+            key (str): Ключ кэша
+            ttl (float): Новый срок жизни в секундах
+        """
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                "UPDATE cache SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                (now + ttl, now, key)
+            )
+
+    def delete(self, key):
+        """Удаляет запись кэша"""
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        """Удаляет все записи кэша"""
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache")
+
+    def __len__(self):
+        with self._connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def _evict(self, connection):
+        excess = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
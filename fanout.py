@@ -0,0 +1,361 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from iiko_api import (get_default_client, _organizations_payload, _nomenclature_payload,
+                      _terminal_groups_payload, _order_by_id_payload)
+from order_batch import _error_message
+from token_manager import get_token_manager
+
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_TENANT_CONCURRENCY = 2
+
+
+class Tenant:
+    """
+    Учетные данные одного клиента iiko
+
+    Args:
+        api_login (str): API логин
+        organization_ids (list): ID организаций (None - все организации apiLogin,
+            определяются через FanOutEngine.discover_organizations)
+        token (str | TokenManager): Токен доступа (по умолчанию общий TokenManager для apiLogin)
+    """
+    __slots__ = ("api_login", "organization_ids", "token")
+
+    def __init__(self, api_login, organization_ids=None, token=None):
+        self.api_login = api_login
+        self.organization_ids = list(organization_ids) if organization_ids is not None else None
+        self.token = token
+
+    def __repr__(self):
+        return f"Tenant(api_login={self.api_login!r}, organization_ids={self.organization_ids!r})"
+
+
+class TaskResult:
+    """
+    Результат операции для одного клиента iiko или одной его организации
+
+    Attributes:
+        api_login (str): API логин
+        organization_id (str): ID организации (None для операций над всем apiLogin)
+        success (bool): Операция выполнена
+        value: Результат операции
+        error (str): Описание ошибки
+        elapsed (float): Длительность в секундах
+    """
+    __slots__ = ("api_login", "organization_id", "success", "value", "error", "elapsed")
+
+    def __init__(self, api_login, organization_id, success, value=None, error=None, elapsed=0.0):
+        self.api_login = api_login
+        self.organization_id = organization_id
+        self.success = success
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        status = "ok" if self.success else f"error={self.error!r}"
+        return (f"TaskResult(api_login={self.api_login!r}, organization_id={self.organization_id!r}, "
+                f"{status}, elapsed={self.elapsed:.3f})")
+
+
+class FanOutReport:
+    """
+    Сводка выполнения операции по всем клиентам iiko
+
+    Attributes:
+        results (list): TaskResult в порядке задач (клиент, затем организация)
+        elapsed (float): Общая длительность в секундах
+    """
+
+    def __init__(self, results, elapsed):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.success]
+
+    def by_tenant(self):
+        """
+        Группирует результаты по apiLogin
+
+        Returns:
+            dict: {api_login: [TaskResult, ...]}
+        """
+        grouped = {}
+        for result in self.results:
+            grouped.setdefault(result.api_login, []).append(result)
+        return grouped
+
+    def values(self):
+        """
+        Возвращает результаты успешных операций
+
+        Returns:
+            dict: {(api_login, organization_id): value}
+        """
+        return {(result.api_login, result.organization_id): result.value for result in self.succeeded}
+
+    def print_summary(self):
+        """Выводит количество успешных и неудачных операций и ошибки"""
+        print(f"Выполнено: {len(self.succeeded)} из {len(self.results)} за {self.elapsed:.1f} с")
+        for result in self.failed:
+            target = result.organization_id or "все организации"
+            print(f"  {result.api_login} / {target}: {result.error}")
+
+    def __repr__(self):
+        return f"FanOutReport(succeeded={len(self.succeeded)}, failed={len(self.failed)}, elapsed={self.elapsed:.3f})"
+
+
+class _TenantQueue:
+    __slots__ = ("tasks", "running")
+
+    def __init__(self):
+        self.tasks = deque()
+        self.running = 0
+
+
+class FanOutEngine:
+    """
+    Выполняет операции параллельно для многих apiLogin и организаций
+
+    Задачи распределяются между клиентами iiko по кругу, и одновременно для
+    одного apiLogin выполняется не больше per_tenant_concurrency запросов,
+    поэтому медленный клиент занимает только свои слоты и не задерживает
+    остальных. Чтобы соединения переиспользовались, pool_maxsize клиента
+    должен быть не меньше max_workers.
+
+    Args:
+        tenants (iterable): Tenant или строки apiLogin
+        client (IikoClient): Клиент iiko API (по умолчанию общий)
+        max_workers (int): Максимум одновременных запросов всего
+        per_tenant_concurrency (int): Максимум одновременных запросов одного apiLogin
+    """
+
+    def __init__(self, tenants, client=None, max_workers=DEFAULT_MAX_WORKERS,
+                 per_tenant_concurrency=DEFAULT_PER_TENANT_CONCURRENCY):
+        self.client = client or get_default_client()
+        self.max_workers = max_workers
+        self.per_tenant_concurrency = per_tenant_concurrency
+        self.tenants = [tenant if isinstance(tenant, Tenant) else Tenant(tenant) for tenant in tenants]
+
+    def _token(self, tenant):
+        if tenant.token is None:
+            tenant.token = get_token_manager(tenant.api_login, client=self.client)
+        return tenant.token
+
+    def run(self, operation, per_organization=True, deadline=None):
+        """
+        Выполняет операцию для каждой организации (или каждого apiLogin)
+
+        Исключения операции не прерывают выполнение и записываются в TaskResult.
+
+        Args:
+            operation (callable): operation(client, token, organization_id) при
+                per_organization=True, иначе operation(client, token, organization_ids)
+            per_organization (bool): Отдельная задача на каждую организацию
+            deadline (float): Сколько секунд можно запускать новые задачи; не
+                начатые к этому времени задачи завершаются с ошибкой
+
+        Returns:
+            FanOutReport: Результаты всех задач
+        """
+        started = time.perf_counter()
+        stop_at = started + deadline if deadline is not None else None
+
+        if per_organization and any(tenant.organization_ids is None for tenant in self.tenants):
+            self.discover_organizations(deadline)
+
+        queues = []
+        results = []
+        for tenant in self.tenants:
+            queue = _TenantQueue()
+            targets = tenant.organization_ids if per_organization else [None]
+            for organization_id in targets:
+                result = TaskResult(tenant.api_login, organization_id, False)
+                argument = organization_id if per_organization else tenant.organization_ids
+                queue.tasks.append((tenant, argument, result))
+                results.append(result)
+            if queue.tasks:
+                queues.append(queue)
+
+        self._dispatch(operation, deque(queues), stop_at)
+        return FanOutReport(results, time.perf_counter() - started)
+
+    def _dispatch(self, operation, rotation, stop_at):
+        condition = threading.Condition()
+        in_flight = [0]
+
+        def finished(queue):
+            with condition:
+                queue.running -= 1
+                in_flight[0] -= 1
+                condition.notify()
+
+        def execute(queue, tenant, argument, result):
+            task_started = time.perf_counter()
+            try:
+                result.value = operation(self.client, self._token(tenant), argument)
+                result.success = True
+            except Exception as e:
+                result.error = _error_message(e)
+            finally:
+                result.elapsed = time.perf_counter() - task_started
+                finished(queue)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                with condition:
+                    queue = None
+                    while True:
+                        if stop_at is not None and time.perf_counter() >= stop_at:
+                            self._expire(rotation)
+                            rotation.clear()
+                        if not rotation:
+                            break
+                        if in_flight[0] < self.max_workers:
+                            queue = self._next_queue(rotation)
+                            if queue is not None:
+                                break
+                        condition.wait(None if stop_at is None else max(stop_at - time.perf_counter(), 0))
+                    if queue is None:
+                        break
+
+                    tenant, argument, result = queue.tasks.popleft()
+                    queue.running += 1
+                    in_flight[0] += 1
+                    if not queue.tasks:
+                        rotation.remove(queue)
+
+                executor.submit(execute, queue, tenant, argument, result)
+
+    def _next_queue(self, rotation):
+        # Первый по кругу клиент со свободным слотом переносится в конец очереди
+        for _ in range(len(rotation)):
+            queue = rotation[0]
+            rotation.rotate(-1)
+            if queue.running < self.per_tenant_concurrency:
+                return queue
+        return None
+
+    def _expire(self, rotation):
+        for queue in rotation:
+            for _, _, result in queue.tasks:
+                result.error = "Задача не начата: истекло время выполнения"
+            queue.tasks.clear()
+
+    def discover_organizations(self, deadline=None):
+        """
+        Запрашивает организации для клиентов iiko, у которых они не указаны
+
+        Args:
+            deadline (float): Ограничение времени в секундах
+
+        Returns:
+            FanOutReport: Результаты запросов организаций
+        """
+        unknown = [tenant for tenant in self.tenants if tenant.organization_ids is None]
+        engine = FanOutEngine(unknown, self.client, self.max_workers, self.per_tenant_concurrency)
+        report = engine.run(fetch_organization_ids, per_organization=False, deadline=deadline)
+
+        for tenant, result in zip(unknown, report.results):
+            # Клиент без доступных организаций пропускается в следующих операциях
+            tenant.organization_ids = result.value if result.success else []
+            if not result.success:
+                print(f"Не удалось получить организации {tenant.api_login}: {result.error}")
+        return report
+
+    def sync_nomenclature(self, menu_sync=None, deadline=None):
+        """
+        Загружает меню всех организаций
+
+        Args:
+            menu_sync (MenuSync): Локальное хранилище меню; если передано,
+                запрашиваются только изменения с последней ревизии
+            deadline (float): Ограничение времени в секундах
+
+        Returns:
+            FanOutReport: Количество измененных объектов (с menu_sync) или ответ
+                get_nomenclature для каждой организации
+        """
+        return self.run(nomenclature_operation(menu_sync), deadline=deadline)
+
+    def refresh_terminal_groups(self, include_disabled=True, deadline=None):
+        """
+        Запрашивает группы терминалов всех организаций, по одному запросу на apiLogin
+
+        Args:
+            include_disabled (bool): Включать неактивные группы
+            deadline (float): Ограничение времени в секундах
+
+        Returns:
+            FanOutReport: Ответ get_terminal_groups для каждого apiLogin
+        """
+        def operation(client, token, organization_ids):
+            if not organization_ids:
+                return {"terminalGroups": []}
+            payload = _terminal_groups_payload(organization_ids, include_disabled, None)
+            return client.call("terminal_groups", payload, token)
+
+        if any(tenant.organization_ids is None for tenant in self.tenants):
+            self.discover_organizations(deadline)
+        return self.run(operation, per_organization=False, deadline=deadline)
+
+    def poll_orders(self, order_ids_by_organization, deadline=None):
+        """
+        Запрашивает заказы всех организаций одним запросом order/by_id на организацию
+
+        Args:
+            order_ids_by_organization (dict): {organization_id: [order_id, ...]}
+            deadline (float): Ограничение времени в секундах
+
+        Returns:
+            FanOutReport: Список заказов для каждой организации
+        """
+        def operation(client, token, organization_id):
+            order_ids = order_ids_by_organization.get(organization_id)
+            if not order_ids:
+                return []
+            payload = _order_by_id_payload(list(order_ids), [organization_id], None, None, None)
+            return client.call("order/by_id", payload, token).get('orders', [])
+
+        return self.run(operation, deadline=deadline)
+
+
+def fetch_organization_ids(client, token, organization_ids=None):
+    """
+    Операция для FanOutEngine.run(per_organization=False): ID доступных организаций
+
+    Returns:
+        list: ID организаций
+    """
+    payload = _organizations_payload(organization_ids, False, False, None)
+    return [organization['id'] for organization in client.call("organizations", payload, token)['organizations']]
+
+
+def nomenclature_operation(menu_sync=None):
+    """
+    Создает операцию загрузки меню для FanOutEngine.run
+
+    Args:
+        menu_sync (MenuSync): Локальное хранилище меню для загрузки только изменений
+
+    Returns:
+        callable: operation(client, token, organization_id)
+    """
+    def operation(client, token, organization_id):
+        if menu_sync is None:
+            return client.call("nomenclature", _nomenclature_payload(organization_id, 0), token)
+        # Ревизия, запрос и применение изменений выполняются под блокировкой организации в MenuSync
+        return menu_sync.update(organization_id, lambda revision: client.call(
+            "nomenclature", _nomenclature_payload(organization_id, revision), token))
+
+    return operation
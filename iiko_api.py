@@ -1,6 +1,697 @@
+import sqlite3
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
+from codec import Codec
+from transport import RetryPolicy, SingleFlight, READ_ONLY_PATHS, request_key, tenant_key
+from disk_cache import make_cache_key
+from instrumentation import RequestEvent, TimingHTTPAdapter, set_current_event
+
+
+BASE_URL = "https://api-ru.iiko.services/api/1/"
+
+# Срок жизни в кэше (в секундах) для редко меняющихся данных
+DEFAULT_CACHE_TTLS = {
+    "organizations": 3600,
+    "terminal_groups": 3600,
+    "reserve/available_restaurant_sections": 300
+}
+
+
+class IikoApiError(Exception):
+    """
+    Ошибка HTTP от iiko API
+
+    Attributes:
+        status_code (int): Код ответа
+        reason (str): Описание кода ответа
+        details (dict | str): Тело ответа с описанием ошибки
+    """
+
+    def __init__(self, status_code, reason, details=None):
+        super().__init__(f"Ошибка HTTP {status_code}: {reason}")
+        self.status_code = status_code
+        self.reason = reason
+        self.details = details
+
+
+def _resolve_token(token):
+    """Возвращает строку токена для строки или объекта с методом get_token()"""
+    if hasattr(token, 'get_token'):
+        return token.get_token()
+    return token
+
+
+# Сборка тел запросов общая для синхронного и асинхронного клиентов
+
+def _organizations_payload(organization_ids, return_additional_info, include_disabled, return_external_data):
+    payload = {
+        "returnAdditionalInfo": return_additional_info,
+        "includeDisabled": include_disabled
+    }
+
+    if organization_ids:
+        payload["organizationIds"] = organization_ids
+
+    if return_external_data:
+        payload["returnExternalData"] = return_external_data
+
+    return payload
+
+
+def _nomenclature_payload(organization_id, start_revision):
+    return {
+        "organizationId": organization_id,
+        "startRevision": start_revision
+    }
+
+
+def _terminal_groups_payload(organization_ids, include_disabled, return_external_data):
+    payload = {
+        "organizationIds": organization_ids,
+        "includeDisabled": include_disabled
+    }
+
+    if return_external_data:
+        payload["returnExternalData"] = return_external_data
+
+    return payload
+
+
+def _create_order_payload(organization_id, terminal_group_id, order_data, settings):
+    if settings is None:
+        settings = {
+            "servicePrint": False,
+            "transportToFrontTimeout": 0,
+            "checkStopList": False
+        }
+
+    return {
+        "organizationId": organization_id,
+        "terminalGroupId": terminal_group_id,
+        "order": order_data,
+        "createOrderSettings": settings
+    }
+
+
+def _restaurant_sections_payload(terminal_group_ids, return_schema, revision):
+    return {
+        "terminalGroupIds": terminal_group_ids,
+        "returnSchema": return_schema,
+        "revision": revision
+    }
+
+
+def _order_by_id_payload(order_ids, organization_ids, pos_order_ids, source_keys, return_external_data_keys):
+    payload = {}
+
+    if order_ids:
+        payload["orderIds"] = order_ids
+    if organization_ids:
+        payload["organizationIds"] = organization_ids
+    if pos_order_ids:
+        payload["posOrderIds"] = pos_order_ids
+    if source_keys:
+        payload["sourceKeys"] = source_keys
+    if return_external_data_keys:
+        payload["returnExternalDataKeys"] = return_external_data_keys
+
+    return payload
+
+
+class IikoClient:
+    """
+    Клиент iiko API с общим пулом HTTP-соединений
+
+    Все запросы идут через одну requests.Session, поэтому TCP и TLS
+    соединения с сервером iiko переиспользуются между вызовами (keep-alive).
+
+    Args:
+        base_url (str): Базовый URL API
+        pool_connections (int): Количество хостов, для которых хранится пул соединений
+        pool_maxsize (int): Максимум соединений к одному хосту
+        pool_block (bool): Ждать свободное соединение, а не открывать лишнее сверх pool_maxsize
+        timeout (float): Таймаут запроса в секундах (None - без таймаута)
+        retry_policy (RetryPolicy): Политика повторов при 429, 5xx и ошибках соединения
+            (по умолчанию RetryPolicy(), RetryPolicy(max_retries=0) отключает повторы)
+        rate_limiter (RateLimiter): Ограничение частоты запросов для каждого apiLogin
+        cache (DiskCache): Кэш для организаций, групп терминалов и секций ресторана
+        cache_ttls (dict): Срок жизни записей кэша по пути метода API
+        instrumentation (Instrumentation): Обработчики замеров каждого запроса
+        coalesce (bool): Объединять одинаковые одновременные запросы к методам
+            чтения (организации, меню, группы терминалов, секции, заказы по ID)
+            в один; все вызывающие получают один и тот же объект ответа
+        codec (Codec): Реализация JSON, сжатие и учет объема данных
+            (по умолчанию Codec() - самый быстрый установленный JSON, сжатые ответы)
+    """
+
+    def __init__(self, base_url=BASE_URL, pool_connections=10, pool_maxsize=10,
+                 pool_block=False, timeout=None, retry_policy=None, rate_limiter=None,
+                 cache=None, cache_ttls=None, instrumentation=None, coalesce=True, codec=None):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.timeout = timeout
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS if cache_ttls is None else cache_ttls)
+        self.instrumentation = instrumentation
+        self.single_flight = SingleFlight() if coalesce else None
+        self.codec = codec if codec is not None else Codec()
+
+        self.session = requests.Session()
+        # Замер установки соединений подключается только вместе с instrumentation
+        adapter_class = TimingHTTPAdapter if instrumentation is not None else HTTPAdapter
+        adapter = adapter_class(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept-Encoding": self.codec.accept_encoding,
+            "Connection": "keep-alive"
+        })
+
+    def close(self):
+        """Закрывает все соединения пула"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _send(self, path, payload, token=None, stream=False, event=None):
+        """
+        Отправляет POST запрос через общую сессию
+
+        Если вместо строки передан TokenManager, токен берется из него,
+        а при ответе 401 обновляется и запрос повторяется один раз.
+
+        Args:
+            path (str): Путь метода API относительно base_url
+            payload (dict | bytes): Тело запроса или уже закодированный JSON
+            token (str | TokenManager): Токен доступа (опционально)
+            stream (bool): Не читать тело ответа сразу
+            event (RequestEvent): Событие для записи замеров
+
+        Returns:
+            requests.Response: Ответ сервера
+        """
+        body = self._encode(payload, event)
+        wire_body, content_encoding = self.codec.compress(body)
+        self.codec.record_request(path, len(body), len(wire_body))
+        tenant = tenant_key(token, payload)
+        access_token = _resolve_token(token)
+        response = self._send_with_retries(path, wire_body, access_token, tenant, stream, event, content_encoding)
+
+        if response.status_code == 401 and hasattr(token, 'refresh'):
+            access_token = token.refresh(stale_token=access_token)
+            if access_token:
+                response.close()
+                response = self._send_with_retries(path, wire_body, access_token, tenant, stream, event,
+                                                   content_encoding)
+
+        return response
+
+    def _encode(self, payload, event=None):
+        # Уже закодированное тело (например, из OrderBuilder.encode_payload) отправляется как есть
+        if isinstance(payload, (bytes, bytearray)):
+            if event is not None:
+                event.request_bytes = len(payload)
+            return payload
+
+        if event is None:
+            return self.codec.dumps(payload)
+
+        started = time.perf_counter()
+        body = self.codec.dumps(payload)
+        event.add_phase("encode", time.perf_counter() - started)
+        event.request_bytes = len(body)
+        return body
+
+    def _send_with_retries(self, path, body, access_token, tenant, stream=False, event=None, content_encoding=None):
+        """
+        Отправляет запрос с учетом ограничения частоты и политики повторов
+
+        Returns:
+            requests.Response: Последний полученный ответ
+        """
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(tenant)
+
+            try:
+                response = self._send_once(path, body, access_token, stream, event, content_encoding)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                delay = self.retry_policy.error_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.status_delay(
+                    attempt, response.status_code, response.headers.get("Retry-After")
+                )
+                if delay is None:
+                    return response
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+            if event is not None:
+                event.retries += 1
+
+    def _send_once(self, path, body, access_token, stream=False, event=None, content_encoding=None):
+        headers = None
+        if access_token:
+            headers = {"Authorization": f"Bearer {access_token}"}
+        if content_encoding:
+            headers = dict(headers or {}, **{"Content-Encoding": content_encoding})
+
+        if event is None:
+            return self.session.post(
+                self.base_url + path,
+                data=body,
+                headers=headers,
+                timeout=self.timeout,
+                stream=stream
+            )
+
+        phases = event.phases
+        connecting_before = phases.get("connect", 0.0) + phases.get("tls", 0.0)
+        set_current_event(event)
+        started = time.perf_counter()
+        try:
+            response = self.session.post(
+                self.base_url + path,
+                data=body,
+                headers=headers,
+                timeout=self.timeout,
+                stream=stream
+            )
+        finally:
+            set_current_event(None)
+        total = time.perf_counter() - started
+
+        # elapsed - время до получения заголовков ответа, включая установку соединения
+        waited = response.elapsed.total_seconds()
+        connecting = phases.get("connect", 0.0) + phases.get("tls", 0.0) - connecting_before
+        event.add_phase("server", max(waited - connecting, 0.0))
+        if not stream:
+            event.add_phase("download", max(total - waited, 0.0))
+        event.status_code = response.status_code
+        return response
+
+    def _decode(self, response, event=None):
+        """
+        Разбирает JSON ответа. Для ответов с ошибкой некорректный JSON дает None.
+
+        Returns:
+            dict: Разобранный ответ или None
+
+        Raises:
+            requests.exceptions.JSONDecodeError: Если успешный ответ не является JSON
+                (как у response.json(), чтобы обработчики RequestException его перехватывали)
+        """
+        ok = 200 <= response.status_code < 300
+        started = time.perf_counter() if event is not None else None
+        try:
+            data = self.codec.loads(response.content)
+        except ValueError as e:
+            if ok:
+                raise requests.exceptions.JSONDecodeError(
+                    getattr(e, 'msg', str(e)), getattr(e, 'doc', None) or response.text, getattr(e, 'pos', 0)
+                ) from e
+            data = None
+
+        if event is not None:
+            event.add_phase("parse", time.perf_counter() - started)
+            event.response_bytes = len(response.content)
+            if isinstance(data, dict):
+                event.correlation_id = data.get('correlationId')
+        return data
+
+    def _emit(self, event, error=None):
+        if error is not None:
+            event.error = str(error)
+        event.finish()
+        self.instrumentation.emit(event)
+
+    def _execute(self, path, payload, token=None):
+        """
+        Отправляет запрос и разбирает ответ, записывая замеры, если подключен instrumentation
+
+        Returns:
+            tuple: (response, data) - ответ сервера и разобранный JSON (или None)
+        """
+        if self.instrumentation is None:
+            response = self._send(path, payload, token)
+            data = self._decode(response)
+        else:
+            event = RequestEvent(path)
+            try:
+                response = self._send(path, payload, token, event=event)
+                data = self._decode(response, event)
+            except Exception as e:
+                self._emit(event, e)
+                raise
+            self._emit(event)
+
+        if self.codec.stats is not None:
+            # raw.tell() - сколько байтов тела пришло по сети до распаковки
+            self.codec.record_response(path, len(response.content), response.raw.tell())
+        return response, data
+
+    def send_stream(self, path, payload, token=None):
+        """
+        Отправляет запрос, не загружая тело ответа в память
+
+        Тело читается по частям через response.iter_content(), после чего
+        ответ нужно закрыть (response.close() или with).
+
+        Args:
+            path (str): Путь метода API относительно base_url
+            payload (dict): Тело запроса
+            token (str | TokenManager): Токен доступа
+
+        Returns:
+            requests.Response: Ответ сервера с успешным статусом
+
+        Raises:
+            requests.exceptions.RequestException: При ошибке сети или HTTP
+        """
+        event = RequestEvent(path) if self.instrumentation is not None else None
+        try:
+            response = self._send(path, payload, token, stream=True, event=event)
+        except Exception as e:
+            if event is not None:
+                self._emit(event, e)
+            raise
+        if event is not None:
+            self._emit(event)
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return response
+
+    def call(self, path, payload, token=None):
+        """
+        Выполняет запрос без вывода в консоль, сообщая об ошибках исключениями
+
+        Args:
+            path (str): Путь метода API относительно base_url
+            payload (dict | bytes): Тело запроса или уже закодированный JSON
+            token (str | TokenManager): Токен доступа
+
+        Returns:
+            dict: Ответ от API
+
+        Raises:
+            IikoApiError: Если сервер ответил кодом, отличным от 2xx
+            requests.exceptions.RequestException: При ошибке сети
+        """
+        if self.single_flight is not None and path in READ_ONLY_PATHS and isinstance(payload, dict):
+            return self.single_flight.do(request_key(path, token, payload),
+                                         lambda: self._call(path, payload, token))
+        return self._call(path, payload, token)
+
+    def _call(self, path, payload, token=None):
+        response, data = self._execute(path, payload, token)
+
+        if not 200 <= response.status_code < 300:
+            raise IikoApiError(response.status_code, response.reason,
+                               data if data is not None else response.text)
+
+        return data
+
+    def _post(self, path, payload, token, error_message):
+        """
+        Отправляет запрос и возвращает разобранный JSON ответа
+
+        Args:
+            path (str): Путь метода API относительно base_url
+            payload (dict): Тело запроса
+            token (str | TokenManager): Токен доступа
+            error_message (str): Текст, выводимый при ошибке запроса
+
+        Returns:
+            dict: Ответ от API или None при ошибке
+        """
+        try:
+            return self.call(path, payload, token)
+        except (IikoApiError, requests.exceptions.RequestException) as e:
+            print(f"{error_message}: {e}")
+            return None
+
+    def _cached_post(self, path, payload, token, error_message, revision_field=None):
+        """
+        Выполняет запрос через кэш, если он настроен для метода path
+
+        Если задан revision_field, запись с истекшим сроком жизни проверяется
+        запросом с сохраненной ревизией: при неизменной ревизии срок жизни
+        записи продлевается, иначе данные загружаются заново.
+
+        Args:
+            path (str): Путь метода API относительно base_url
+            payload (dict): Тело запроса
+            token (str | TokenManager): Токен доступа
+            error_message (str): Текст, выводимый при ошибке запроса
+            revision_field (str): Поле тела запроса с ревизией
+
+        Returns:
+            dict: Ответ от API или None при ошибке
+        """
+        ttl = self.cache_ttls.get(path)
+        if self.cache is None or not ttl:
+            return self._post(path, payload, token, error_message)
+
+        key_payload = payload
+        if revision_field:
+            key_payload = {name: value for name, value in payload.items() if name != revision_field}
+        key = make_cache_key(path, tenant_key(token, payload), key_payload)
+
+        try:
+            entry = self.cache.get(key, allow_expired=revision_field is not None)
+        except sqlite3.Error as e:
+            print(f"Ошибка чтения кэша: {e}")
+            return self._post(path, payload, token, error_message)
+
+        if entry is not None and not entry.expired:
+            return entry.value
+
+        if entry is not None and entry.revision is not None:
+            check_payload = dict(payload)
+            check_payload[revision_field] = entry.revision
+            check = self._post(path, check_payload, token, error_message)
+            if check is None:
+                return None
+            if check.get('revision') == entry.revision:
+                try:
+                    self.cache.touch(key, ttl)
+                except sqlite3.Error as e:
+                    print(f"Ошибка записи кэша: {e}")
+                return entry.value
+
+        result = self._post(path, payload, token, error_message)
+        if result is not None:
+            try:
+                self.cache.set(key, result, ttl, result.get('revision'))
+            except sqlite3.Error as e:
+                print(f"Ошибка записи кэша: {e}")
+        return result
+
+    def get_iiko_access_token(self, api_login):
+        """
+        Получает токен доступа от iiko API
+
+        Args:
+            api_login (str): API логин для iiko
+
+        Returns:
+            dict: Ответ от API с correlationId и token
+        """
+        payload = {
+            "apiLogin": api_login
+        }
+
+        return self._post("access_token", payload, None, "Ошибка при запросе")
+
+    def get_organizations(self, token, organization_ids=None, return_additional_info=True,
+                          include_disabled=True, return_external_data=None):
+        """
+        Получает список организаций от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_ids (list): Список ID организаций (опционально)
+            return_additional_info (bool): Возвращать дополнительную информацию
+            include_disabled (bool): Включать отключенные организации
+            return_external_data (list): Список внешних данных для возврата
+
+        Returns:
+            dict: Ответ от API со списком организаций
+        """
+        payload = _organizations_payload(
+            organization_ids, return_additional_info, include_disabled, return_external_data
+        )
+
+        return self._cached_post("organizations", payload, token, "Ошибка при запросе организаций")
+
+    def get_nomenclature(self, token, organization_id, start_revision="0"):
+        """
+        Получает меню (номенклатуру) от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_id (str): ID организации
+            start_revision (str): Начальная ревизия (по умолчанию "0")
+
+        Returns:
+            dict: Ответ от API с меню (группы, продукты, размеры)
+        """
+        payload = _nomenclature_payload(organization_id, start_revision)
+
+        return self._post("nomenclature", payload, token, "Ошибка при запросе меню")
+
+    def get_terminal_groups(self, token, organization_ids, include_disabled=True, return_external_data=None):
+        """
+        Получает список групп терминалов от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_ids (list): Список ID организаций
+            include_disabled (bool): Включать отключенные группы терминалов
+            return_external_data (list): Список внешних данных для возврата
+
+        Returns:
+            dict: Ответ от API со списком групп терминалов
+        """
+        payload = _terminal_groups_payload(organization_ids, include_disabled, return_external_data)
+
+        return self._cached_post("terminal_groups", payload, token, "Ошибка при запросе групп терминалов")
+
+    def create_order(self, token, organization_id, terminal_group_id, order_data, settings=None):
+        """
+        Создает заказ через iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_id (str): ID организации
+            terminal_group_id (str): ID группы терминалов
+            order_data (dict): Данные заказа
+            settings (dict): Настройки создания заказа
+
+        Returns:
+            dict: Ответ от API с информацией о созданном заказе
+        """
+        payload = _create_order_payload(organization_id, terminal_group_id, order_data, settings)
+
+        try:
+            print("Отправляемые данные заказа:")
+            print(json.dumps(payload, indent=2, ensure_ascii=False))
+
+            response, data = self._execute("order/create", payload, token)
+
+            if response.status_code != 200:
+                print(f"Ошибка HTTP {response.status_code}: {response.reason}")
+                if data is not None:
+                    print("Детали ошибки:")
+                    print(json.dumps(data, indent=2, ensure_ascii=False))
+                else:
+                    print("Текст ошибки:", response.text)
+                return None
+
+            return data
+        except requests.exceptions.RequestException as e:
+            print(f"Ошибка при создании заказа: {e}")
+            return None
+
+    def get_available_restaurant_sections(self, token, terminal_group_ids, return_schema=True, revision=0):
+        """
+        Получает доступные секции ресторана и столы от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            terminal_group_ids (list): Список ID групп терминалов
+            return_schema (bool): Возвращать схему расположения
+            revision (int): Ревизия для обновления
+
+        Returns:
+            dict: Ответ от API с секциями ресторана и столами
+        """
+        payload = _restaurant_sections_payload(terminal_group_ids, return_schema, revision)
+
+        # Кэшируется только полный список секций, запросы изменений с ревизии идут напрямую
+        if revision:
+            return self._post("reserve/available_restaurant_sections", payload, token,
+                              "Ошибка при запросе секций ресторана")
+
+        return self._cached_post("reserve/available_restaurant_sections", payload, token,
+                                 "Ошибка при запросе секций ресторана", revision_field="revision")
+
+    def get_order_by_id(self, token, order_ids=None, organization_ids=None, pos_order_ids=None,
+                        source_keys=None, return_external_data_keys=None):
+        """
+        Получает заказы по ID от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            order_ids (list): Список ID заказов
+            organization_ids (list): Список ID организаций
+            pos_order_ids (list): Список POS ID заказов
+            source_keys (list): Список ключей источников
+            return_external_data_keys (list): Ключи внешних данных для возврата
+
+        Returns:
+            dict: Ответ от API с информацией о заказах
+        """
+        payload = _order_by_id_payload(
+            order_ids, organization_ids, pos_order_ids, source_keys, return_external_data_keys
+        )
+
+        return self._post("order/by_id", payload, token, "Ошибка при запросе заказа")
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """
+    Возвращает общий клиент, через который работают функции модуля
+
+    Returns:
+        IikoClient: Клиент по умолчанию
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = IikoClient()
+    return _default_client
+
+
+def set_default_client(client):
+    """
+    Заменяет общий клиент (например, чтобы изменить размер пула или base_url)
+
+    Args:
+        client (IikoClient): Новый клиент по умолчанию
+    """
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
 
 def get_iiko_access_token(api_login):
     """
@@ -12,23 +703,7 @@ def get_iiko_access_token(api_login):
     Returns:
         dict: Ответ от API с correlationId и token
     """
-    url = "https://api-ru.iiko.services/api/1/access_token"
-
-    payload = {
-        "apiLogin": api_login
-    }
-
-    headers = {
-        "Content-Type": "application/json"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при запросе: {e}")
-        return None
+    return get_default_client().get_iiko_access_token(api_login)
 
 
 def get_organizations(token, organization_ids=None, return_additional_info=True,
@@ -37,7 +712,7 @@ def get_organizations(token, organization_ids=None, return_additional_info=True,
     Получает список организаций от iiko API
 
     Args:
-        token (str): Токен доступа
+        token (str | TokenManager): Токен доступа
         organization_ids (list): Список ID организаций (опционально)
         return_additional_info (bool): Возвращать дополнительную информацию
         include_disabled (bool): Включать отключенные организации
@@ -46,31 +721,9 @@ def get_organizations(token, organization_ids=None, return_additional_info=True,
     Returns:
         dict: Ответ от API со списком организаций
     """
-    url = "https://api-ru.iiko.services/api/1/organizations"
-
-    payload = {
-        "returnAdditionalInfo": return_additional_info,
-        "includeDisabled": include_disabled
-    }
-
-    if organization_ids:
-        payload["organizationIds"] = organization_ids
-
-    if return_external_data:
-        payload["returnExternalData"] = return_external_data
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при запросе организаций: {e}")
-        return None
+    return get_default_client().get_organizations(
+        token, organization_ids, return_additional_info, include_disabled, return_external_data
+    )
 
 
 def get_nomenclature(token, organization_id, start_revision="0"):
@@ -78,32 +731,14 @@ def get_nomenclature(token, organization_id, start_revision="0"):
     Получает меню (номенклатуру) от iiko API
 
     Args:
-        token (str): Токен доступа
+        token (str | TokenManager): Токен доступа
         organization_id (str): ID организации
         start_revision (str): Начальная ревизия (по умолчанию "0")
 
     Returns:
         dict: Ответ от API с меню (группы, продукты, размеры)
     """
-    url = "https://api-ru.iiko.services/api/1/nomenclature"
-
-    payload = {
-        "organizationId": organization_id,
-        "startRevision": start_revision
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при запросе меню: {e}")
-        return None
+    return get_default_client().get_nomenclature(token, organization_id, start_revision)
 
 
 def get_terminal_groups(token, organization_ids, include_disabled=True, return_external_data=None):
@@ -111,7 +746,7 @@ def get_terminal_groups(token, organization_ids, include_disabled=True, return_e
     Получает список групп терминалов от iiko API
 
     Args:
-        token (str): Токен доступа
+        token (str | TokenManager): Токен доступа
         organization_ids (list): Список ID организаций
         include_disabled (bool): Включать отключенные группы терминалов
         return_external_data (list): Список внешних данных для возврата
@@ -119,28 +754,9 @@ def get_terminal_groups(token, organization_ids, include_disabled=True, return_e
     Returns:
         dict: Ответ от API со списком групп терминалов
     """
-    url = "https://api-ru.iiko.services/api/1/terminal_groups"
-
-    payload = {
-        "organizationIds": organization_ids,
-        "includeDisabled": include_disabled
-    }
-
-    if return_external_data:
-        payload["returnExternalData"] = return_external_data
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при запросе групп терминалов: {e}")
-        return None
+    return get_default_client().get_terminal_groups(
+        token, organization_ids, include_disabled, return_external_data
+    )
 
 
 def create_order(token, organization_id, terminal_group_id, order_data, settings=None):
@@ -148,7 +764,7 @@ def create_order(token, organization_id, terminal_group_id, order_data, settings
     Создает заказ через iiko API
 
     Args:
-        token (str): Токен доступа
+        token (str | TokenManager): Токен доступа
         organization_id (str): ID организации
         terminal_group_id (str): ID группы терминалов
         order_data (dict): Данные заказа
@@ -157,47 +773,9 @@ def create_order(token, organization_id, terminal_group_id, order_data, settings
     Returns:
         dict: Ответ от API с информацией о созданном заказе
     """
-    url = "https://api-ru.iiko.services/api/1/order/create"
-
-    if settings is None:
-        settings = {
-            "servicePrint": False,
-            "transportToFrontTimeout": 0,
-            "checkStopList": False
-        }
-
-    payload = {
-        "organizationId": organization_id,
-        "terminalGroupId": terminal_group_id,
-        "order": order_data,
-        "createOrderSettings": settings
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    try:
-        print("Отправляемые данные заказа:")
-        print(json.dumps(payload, indent=2, ensure_ascii=False))
-
-        response = requests.post(url, json=payload, headers=headers)
-
-        if response.status_code != 200:
-            print(f"Ошибка HTTP {response.status_code}: {response.reason}")
-            try:
-                error_data = response.json()
-                print("Детали ошибки:")
-                print(json.dumps(error_data, indent=2, ensure_ascii=False))
-            except:
-                print("Текст ошибки:", response.text)
-            return None
-
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при создании заказа: {e}")
-        return None
+    return get_default_client().create_order(
+        token, organization_id, terminal_group_id, order_data, settings
+    )
 
 
 def get_available_restaurant_sections(token, terminal_group_ids, return_schema=True, revision=0):
@@ -205,7 +783,7 @@ def get_available_restaurant_sections(token, terminal_group_ids, return_schema=T
     Получает доступные секции ресторана и столы от iiko API
 
     Args:
-        token (str): Токен доступа
+        token (str | TokenManager): Токен доступа
         terminal_group_ids (list): Список ID групп терминалов
         return_schema (bool): Возвращать схему расположения
         revision (int): Ревизия для обновления
@@ -213,26 +791,9 @@ def get_available_restaurant_sections(token, terminal_group_ids, return_schema=T
     Returns:
         dict: Ответ от API с секциями ресторана и столами
     """
-    url = "https://api-ru.iiko.services/api/1/reserve/available_restaurant_sections"
-
-    payload = {
-        "terminalGroupIds": terminal_group_ids,
-        "returnSchema": return_schema,
-        "revision": revision
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при запросе секций ресторана: {e}")
-        return None
+    return get_default_client().get_available_restaurant_sections(
+        token, terminal_group_ids, return_schema, revision
+    )
 
 
 def get_order_by_id(token, order_ids=None, organization_ids=None, pos_order_ids=None, source_keys=None, return_external_data_keys=None):
@@ -240,7 +801,7 @@ def get_order_by_id(token, order_ids=None, organization_ids=None, pos_order_ids=
     Получает заказы по ID от iiko API
 
     Args:
-        token (str): Токен доступа
+        token (str | TokenManager): Токен доступа
         order_ids (list): Список ID заказов
         organization_ids (list): Список ID организаций
         pos_order_ids (list): Список POS ID заказов
@@ -250,30 +811,6 @@ def get_order_by_id(token, order_ids=None, organization_ids=None, pos_order_ids=
     Returns:
         dict: Ответ от API с информацией о заказах
     """
-    url = "https://api-ru.iiko.services/api/1/order/by_id"
-
-    payload = {}
-
-    if order_ids:
-        payload["orderIds"] = order_ids
-    if organization_ids:
-        payload["organizationIds"] = organization_ids
-    if pos_order_ids:
-        payload["posOrderIds"] = pos_order_ids
-    if source_keys:
-        payload["sourceKeys"] = source_keys
-    if return_external_data_keys:
-        payload["returnExternalDataKeys"] = return_external_data_keys
-
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Ошибка при запросе заказа: {e}")
-        return None
\ No newline at end of file
+    return get_default_client().get_order_by_id(
+        token, order_ids, organization_ids, pos_order_ids, source_keys, return_external_data_keys
+    )
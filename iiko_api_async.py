@@ -0,0 +1,363 @@
+import asyncio
+import json
+
+import aiohttp
+
+from iiko_api import (
+    BASE_URL,
+    IikoApiError,
+    _organizations_payload,
+    _nomenclature_payload,
+    _terminal_groups_payload,
+    _create_order_payload,
+    _restaurant_sections_payload,
+    _order_by_id_payload
+)
+from codec import Codec, decompress
+from transport import RetryPolicy, AsyncSingleFlight, READ_ONLY_PATHS, request_key, tenant_key
+
+
+async def _resolve_token(token):
+    """
+    Возвращает строку токена. Для TokenManager сначала берется кэш,
+    а блокирующий запрос нового токена выполняется в пуле потоков.
+    """
+    if not hasattr(token, 'get_token'):
+        return token
+
+    cached = getattr(token, 'cached_token', None)
+    if cached:
+        return cached
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, token.get_token)
+
+
+class AsyncIikoClient:
+    """
+    Асинхронный клиент iiko API на aiohttp
+
+    Повторяет методы iiko_api.IikoClient: те же тела запросов и тот же формат
+    ответов. Все запросы используют один пул соединений aiohttp.
+
+    Args:
+        base_url (str): Базовый URL API
+        limit (int): Максимум одновременных соединений
+        limit_per_host (int): Максимум соединений к одному хосту (0 - без ограничения)
+        keepalive_timeout (float): Сколько секунд держать простаивающее соединение
+        timeout (float): Таймаут запроса в секундах (None - без таймаута)
+        retry_policy (RetryPolicy): Политика повторов при 429, 5xx и ошибках соединения
+        rate_limiter (RateLimiter): Ограничение частоты запросов для каждого apiLogin
+        coalesce (bool): Объединять одинаковые одновременные запросы к методам чтения в один
+        codec (Codec): Реализация JSON, сжатие и учет объема данных
+    """
+
+    def __init__(self, base_url=BASE_URL, limit=100, limit_per_host=0,
+                 keepalive_timeout=30, timeout=None, retry_policy=None, rate_limiter=None, coalesce=True,
+                 codec=None):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+        self.codec = codec if codec is not None else Codec()
+        self._session = None
+
+    @property
+    def session(self):
+        """Сессия aiohttp, создается при первом запросе внутри цикла событий"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            # Ответ распаковывается в _send, чтобы знать его размер в сети
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Content-Type": "application/json", "Accept-Encoding": self.codec.accept_encoding},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                auto_decompress=False
+            )
+        return self._session
+
+    async def close(self):
+        """Закрывает все соединения пула"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _send(self, path, payload, token=None):
+        """
+        Отправляет POST запрос и читает тело ответа
+
+        Если вместо строки передан TokenManager, при ответе 401 токен
+        обновляется и запрос повторяется один раз.
+
+        Args:
+            path (str): Путь метода API относительно base_url
+            payload (dict | bytes): Тело запроса или уже закодированный JSON
+            token (str | TokenManager): Токен доступа (опционально)
+
+        Returns:
+            tuple: (status, reason, body) - код ответа, его описание и распакованное тело в байтах
+        """
+        body = payload if isinstance(payload, (bytes, bytearray)) else self.codec.dumps(payload)
+        wire_body, content_encoding = self.codec.compress(body)
+        self.codec.record_request(path, len(body), len(wire_body))
+        tenant = tenant_key(token, payload)
+        access_token = await _resolve_token(token)
+        status, reason, raw, encoding = await self._send_with_retries(path, wire_body, content_encoding,
+                                                                      access_token, tenant)
+
+        if status == 401 and hasattr(token, 'refresh'):
+            loop = asyncio.get_running_loop()
+            access_token = await loop.run_in_executor(None, token.refresh, access_token)
+            if access_token:
+                status, reason, raw, encoding = await self._send_with_retries(path, wire_body, content_encoding,
+                                                                              access_token, tenant)
+
+        body = decompress(raw, encoding)
+        self.codec.record_response(path, len(body), len(raw))
+        return status, reason, body
+
+    async def _send_with_retries(self, path, body, content_encoding, access_token, tenant):
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.reserve(tenant)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            try:
+                status, reason, raw, encoding, retry_after = await self._send_once(path, body, content_encoding,
+                                                                                  access_token)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = self.retry_policy.error_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.status_delay(attempt, status, retry_after)
+                if delay is None:
+                    return status, reason, raw, encoding
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send_once(self, path, body, content_encoding, access_token):
+        headers = {}
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+        if content_encoding:
+            headers["Content-Encoding"] = content_encoding
+
+        async with self.session.post(self.base_url + path, data=body, headers=headers) as response:
+            raw = await response.read()
+            return (response.status, response.reason, raw, response.headers.get("Content-Encoding"),
+                    response.headers.get("Retry-After"))
+
+    async def call(self, path, payload, token=None):
+        """
+        Выполняет запрос без вывода в консоль, сообщая об ошибках исключениями
+
+        Args:
+            path (str): Путь метода API относительно base_url
+            payload (dict): Тело запроса
+            token (str | TokenManager): Токен доступа
+
+        Returns:
+            dict: Ответ от API
+
+        Raises:
+            IikoApiError: Если сервер ответил кодом, отличным от 2xx
+            aiohttp.ClientError: При ошибке сети
+        """
+        if self.single_flight is not None and path in READ_ONLY_PATHS and isinstance(payload, dict):
+            return await self.single_flight.do(request_key(path, token, payload),
+                                               lambda: self._call(path, payload, token))
+        return await self._call(path, payload, token)
+
+    async def _call(self, path, payload, token=None):
+        status, reason, body = await self._send(path, payload, token)
+
+        if not 200 <= status < 300:
+            try:
+                details = self.codec.loads(body)
+            except ValueError:
+                details = body.decode('utf-8', errors='replace')
+            raise IikoApiError(status, reason, details)
+
+        return self.codec.loads(body)
+
+    async def _post(self, path, payload, token, error_message):
+        """
+        Отправляет запрос и возвращает разобранный JSON ответа
+
+        Args:
+            path (str): Путь метода API относительно base_url
+            payload (dict): Тело запроса
+            token (str | TokenManager): Токен доступа
+            error_message (str): Текст, выводимый при ошибке запроса
+
+        Returns:
+            dict: Ответ от API или None при ошибке
+        """
+        try:
+            return await self.call(path, payload, token)
+        except (IikoApiError, aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"{error_message}: {e}")
+            return None
+
+    async def get_iiko_access_token(self, api_login):
+        """
+        Получает токен доступа от iiko API
+
+        Args:
+            api_login (str): API логин для iiko
+
+        Returns:
+            dict: Ответ от API с correlationId и token
+        """
+        payload = {
+            "apiLogin": api_login
+        }
+
+        return await self._post("access_token", payload, None, "Ошибка при запросе")
+
+    async def get_organizations(self, token, organization_ids=None, return_additional_info=True,
+                                include_disabled=True, return_external_data=None):
+        """
+        Получает список организаций от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_ids (list): Список ID организаций (опционально)
+            return_additional_info (bool): Возвращать дополнительную информацию
+            include_disabled (bool): Включать отключенные организации
+            return_external_data (list): Список внешних данных для возврата
+
+        Returns:
+            dict: Ответ от API со списком организаций
+        """
+        payload = _organizations_payload(
+            organization_ids, return_additional_info, include_disabled, return_external_data
+        )
+
+        return await self._post("organizations", payload, token, "Ошибка при запросе организаций")
+
+    async def get_nomenclature(self, token, organization_id, start_revision="0"):
+        """
+        Получает меню (номенклатуру) от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_id (str): ID организации
+            start_revision (str): Начальная ревизия (по умолчанию "0")
+
+        Returns:
+            dict: Ответ от API с меню (группы, продукты, размеры)
+        """
+        payload = _nomenclature_payload(organization_id, start_revision)
+
+        return await self._post("nomenclature", payload, token, "Ошибка при запросе меню")
+
+    async def get_terminal_groups(self, token, organization_ids, include_disabled=True,
+                                  return_external_data=None):
+        """
+        Получает список групп терминалов от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_ids (list): Список ID организаций
+            include_disabled (bool): Включать отключенные группы терминалов
+            return_external_data (list): Список внешних данных для возврата
+
+        Returns:
+            dict: Ответ от API со списком групп терминалов
+        """
+        payload = _terminal_groups_payload(organization_ids, include_disabled, return_external_data)
+
+        return await self._post("terminal_groups", payload, token, "Ошибка при запросе групп терминалов")
+
+    async def create_order(self, token, organization_id, terminal_group_id, order_data, settings=None):
+        """
+        Создает заказ через iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_id (str): ID организации
+            terminal_group_id (str): ID группы терминалов
+            order_data (dict): Данные заказа
+            settings (dict): Настройки создания заказа
+
+        Returns:
+            dict: Ответ от API с информацией о созданном заказе
+        """
+        payload = _create_order_payload(organization_id, terminal_group_id, order_data, settings)
+
+        try:
+            status, reason, body = await self._send("order/create", payload, token)
+
+            if status != 200:
+                print(f"Ошибка HTTP {status}: {reason}")
+                try:
+                    error_data = self.codec.loads(body)
+                    print("Детали ошибки:")
+                    print(json.dumps(error_data, indent=2, ensure_ascii=False))
+                except ValueError:
+                    print("Текст ошибки:", body.decode('utf-8', errors='replace'))
+                return None
+
+            return self.codec.loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"Ошибка при создании заказа: {e}")
+            return None
+
+    async def get_available_restaurant_sections(self, token, terminal_group_ids, return_schema=True, revision=0):
+        """
+        Получает доступные секции ресторана и столы от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            terminal_group_ids (list): Список ID групп терминалов
+            return_schema (bool): Возвращать схему расположения
+            revision (int): Ревизия для обновления
+
+        Returns:
+            dict: Ответ от API с секциями ресторана и столами
+        """
+        payload = _restaurant_sections_payload(terminal_group_ids, return_schema, revision)
+
+        return await self._post("reserve/available_restaurant_sections", payload, token,
+                                "Ошибка при запросе секций ресторана")
+
+    async def get_order_by_id(self, token, order_ids=None, organization_ids=None, pos_order_ids=None,
+                              source_keys=None, return_external_data_keys=None):
+        """
+        Получает заказы по ID от iiko API
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            order_ids (list): Список ID заказов
+            organization_ids (list): Список ID организаций
+            pos_order_ids (list): Список POS ID заказов
+            source_keys (list): Список ключей источников
+            return_external_data_keys (list): Ключи внешних данных для возврата
+
+        Returns:
+            dict: Ответ от API с информацией о заказах
+        """
+        payload = _order_by_id_payload(
+            order_ids, organization_ids, pos_order_ids, source_keys, return_external_data_keys
+        )
+
+        return await self._post("order/by_id", payload, token, "Ошибка при запросе заказа")
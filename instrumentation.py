@@ -0,0 +1,311 @@
+import json
+import logging
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Фазы запроса в порядке выполнения. DNS входит в connect: urllib3 разрешает
+# имя и открывает сокет одним вызовом
+PHASES = ("encode", "connect", "tls", "server", "download", "parse")
+
+_timing = threading.local()
+
+
+class RequestEvent:
+    """
+    Замеры одного вызова API
+
+    Attributes:
+        endpoint (str): Путь метода API
+        started_at (float): Время начала (unix time)
+        duration (float): Общая длительность в секундах
+        phases (dict): Длительность фаз в секундах (ключи из PHASES; connect и
+            tls есть только при открытии нового соединения)
+        status_code (int): Код ответа (None при ошибке сети)
+        request_bytes (int): Размер тела запроса
+        response_bytes (int): Размер тела ответа
+        retries (int): Количество повторов
+        correlation_id (str): correlationId из ответа
+        error (str): Описание ошибки
+    """
+    __slots__ = ("endpoint", "started_at", "duration", "phases", "status_code", "request_bytes",
+                 "response_bytes", "retries", "correlation_id", "error", "_started")
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started_at = time.time()
+        self.duration = None
+        self.phases = {}
+        self.status_code = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.retries = 0
+        self.correlation_id = None
+        self.error = None
+        self._started = time.perf_counter()
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._started
+
+    def add_phase(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def to_dict(self):
+        return {
+            "endpoint": self.endpoint,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "phases": dict(self.phases),
+            "status_code": self.status_code,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "retries": self.retries,
+            "correlation_id": self.correlation_id,
+            "error": self.error
+        }
+
+    def __repr__(self):
+        return f"RequestEvent(endpoint={self.endpoint!r}, status_code={self.status_code}, duration={self.duration})"
+
+
+class Instrumentation:
+    """
+    Точка подключения обработчиков замеров
+
+    Передается в IikoClient(instrumentation=...). Без него клиент не
+    выполняет никаких замеров.
+
+    Args:
+        *hooks: Функции hook(event), вызываемые после каждого запроса
+    """
+
+    def __init__(self, *hooks):
+        self.hooks = list(hooks)
+
+    def add_hook(self, hook):
+        """Добавляет обработчик hook(event)"""
+        self.hooks.append(hook)
+
+    def emit(self, event):
+        """
+        Передает событие всем обработчикам
+
+        Args:
+            event (RequestEvent): Замеры запроса
+        """
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"Ошибка в обработчике метрик: {e}")
+
+
+# Замер установки соединения. Фазы записываются в событие текущего потока,
+# которое IikoClient устанавливает на время запроса
+
+def set_current_event(event):
+    _timing.event = event
+
+
+def _current_event():
+    return getattr(_timing, 'event', None)
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        started = time.perf_counter()
+        sock = super()._new_conn()
+        event = _current_event()
+        if event is not None:
+            event.add_phase("connect", time.perf_counter() - started)
+        return sock
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        started = time.perf_counter()
+        sock = super()._new_conn()
+        self._connect_seconds = time.perf_counter() - started
+        event = _current_event()
+        if event is not None:
+            event.add_phase("connect", self._connect_seconds)
+        return sock
+
+    def connect(self):
+        self._connect_seconds = 0.0
+        started = time.perf_counter()
+        super().connect()
+        event = _current_event()
+        if event is not None:
+            event.add_phase("tls", time.perf_counter() - started - self._connect_seconds)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter, замеряющий установку TCP и TLS соединений"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool
+        }
+
+
+class StructuredLogExporter:
+    """
+    Записывает каждое событие одной строкой JSON в журнал logging
+
+    Args:
+        logger (logging.Logger): Журнал (по умолчанию "iiko_api.requests")
+        level (int): Уровень записей
+    """
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("iiko_api.requests")
+        self.level = level
+
+    def __call__(self, event):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, json.dumps(event.to_dict(), ensure_ascii=False))
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+class PrometheusExporter:
+    """
+    Собирает метрики запросов и отдает их в текстовом формате Prometheus
+
+    Метрики:
+        iiko_requests_total{endpoint, status} - количество запросов
+        iiko_request_duration_seconds{endpoint} - гистограмма длительности
+        iiko_request_phase_seconds{endpoint, phase} - сумма и количество по фазам
+        iiko_request_bytes_total{endpoint, direction} - объем тел запросов и ответов
+        iiko_request_retries_total{endpoint} - количество повторов
+
+    Args:
+        buckets (tuple): Границы гистограммы длительности в секундах
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._durations = {}
+        self._phases = {}
+        self._bytes = {}
+        self._retries = {}
+
+    def __call__(self, event):
+        status = event.status_code if event.status_code is not None else "error"
+        endpoint = event.endpoint
+
+        with self._lock:
+            key = (endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+            histogram = self._durations.get(endpoint)
+            if histogram is None:
+                histogram = self._durations[endpoint] = [[0] * len(self.buckets), 0, 0.0]
+            if event.duration is not None:
+                for i, bound in enumerate(self.buckets):
+                    if event.duration <= bound:
+                        histogram[0][i] += 1
+                histogram[1] += 1
+                histogram[2] += event.duration
+
+            for phase, seconds in event.phases.items():
+                summary = self._phases.setdefault((endpoint, phase), [0, 0.0])
+                summary[0] += 1
+                summary[1] += seconds
+
+            for direction, size in (("request", event.request_bytes), ("response", event.response_bytes)):
+                key = (endpoint, direction)
+                self._bytes[key] = self._bytes.get(key, 0) + (size or 0)
+
+            self._retries[endpoint] = self._retries.get(endpoint, 0) + event.retries
+
+    def render(self):
+        """
+        Возвращает метрики в текстовом формате Prometheus
+
+        Returns:
+            str: Текст метрик
+        """
+        lines = []
+        with self._lock:
+            lines.append("# TYPE iiko_requests_total counter")
+            for (endpoint, status), count in sorted(self._requests.items(), key=str):
+                lines.append(f"iiko_requests_total{_labels(endpoint=endpoint, status=status)} {count}")
+
+            lines.append("# TYPE iiko_request_duration_seconds histogram")
+            for endpoint, (bucket_counts, count, total) in sorted(self._durations.items()):
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(f"iiko_request_duration_seconds_bucket"
+                                 f"{_labels(endpoint=endpoint, le=bound)} {bucket_count}")
+                lines.append(f"iiko_request_duration_seconds_bucket{_labels(endpoint=endpoint, le='+Inf')} {count}")
+                lines.append(f"iiko_request_duration_seconds_sum{_labels(endpoint=endpoint)} {total}")
+                lines.append(f"iiko_request_duration_seconds_count{_labels(endpoint=endpoint)} {count}")
+
+            lines.append("# TYPE iiko_request_phase_seconds summary")
+            for (endpoint, phase), (count, total) in sorted(self._phases.items()):
+                labels = _labels(endpoint=endpoint, phase=phase)
+                lines.append(f"iiko_request_phase_seconds_sum{labels} {total}")
+                lines.append(f"iiko_request_phase_seconds_count{labels} {count}")
+
+            lines.append("# TYPE iiko_request_bytes_total counter")
+            for (endpoint, direction), size in sorted(self._bytes.items()):
+                lines.append(f"iiko_request_bytes_total{_labels(endpoint=endpoint, direction=direction)} {size}")
+
+            lines.append("# TYPE iiko_request_retries_total counter")
+            for endpoint, retries in sorted(self._retries.items()):
+                lines.append(f"iiko_request_retries_total{_labels(endpoint=endpoint)} {retries}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="0.0.0.0"):
+        """
+        Запускает HTTP-сервер, отдающий метрики по любому GET запросу
+
+        Args:
+            port (int): Порт
+            host (str): Адрес для прослушивания
+
+        Returns:
+            ThreadingHTTPServer: Запущенный сервер (остановить - shutdown())
+        """
+        exporter = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="iiko-metrics", daemon=True).start()
+        return server
@@ -1,10 +1,11 @@
 import json
+import sys
 from iiko_api import (
-    get_iiko_access_token,
+    IikoClient,
+    set_default_client,
     get_organizations,
     get_nomenclature,
     get_terminal_groups,
-    get_available_restaurant_sections,
     create_order,
     get_order_by_id
 )
@@ -18,6 +19,9 @@ from ui import (
     save_menu_to_file,
     get_customer_input
 )
+from token_manager import get_token_manager
+from disk_cache import DiskCache
+from table_index import TableIndex
 from order_utils import (
     build_simple_order,
     get_product_size_and_price
@@ -34,15 +38,18 @@ def main():
         print("API логин не может быть пустым!")
         return
 
+    # Организации, группы терминалов и секции ресторана берутся из кэша между запусками
+    set_default_client(IikoClient(cache=DiskCache()))
+
     print("Получение токена доступа...")
-    token_result = get_iiko_access_token(api_login)
+    # Менеджер кэширует токен и сам обновляет его до истечения срока
+    token = get_token_manager(api_login)
 
-    if not token_result or 'token' not in token_result:
+    if not token.get_token():
         print("Не удалось получить токен")
         return
 
-    token = token_result['token']
-    print(f"Токен получен: {token_result['correlationId']}")
+    print(f"Токен получен: {token.correlation_id}")
 
     print("\nПолучение списка организаций...")
     organizations_result = get_organizations(token)
@@ -87,12 +94,11 @@ def main():
                 return
 
             print("\nПолучение доступных столов...")
-            sections_result = get_available_restaurant_sections(token, [terminal_group_id])
+            table_index = TableIndex(token)
 
             selected_table_info = None
-            if sections_result and sections_result.get('restaurantSections'):
-                restaurant_sections = sections_result['restaurantSections']
-                selected_table_info = select_table(restaurant_sections)
+            if table_index.refresh([terminal_group_id]) and len(table_index):
+                selected_table_info = select_table(table_index)
 
                 if not selected_table_info:
                     print("Стол не выбран, заказ будет создан без привязки к столу")
@@ -191,4 +197,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # python main.py batch ... - пакетный режим без интерактивного ввода (см. batch_cli.py)
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        import batch_cli
+        sys.exit(batch_cli.main(sys.argv[2:]))
     main()
\ No newline at end of file
@@ -0,0 +1,234 @@
+class SizePriceRecord:
+    """Цена продукта для одного размера"""
+    __slots__ = ("size_id", "current_price", "is_included_in_menu")
+
+    def __init__(self, size_id, current_price, is_included_in_menu):
+        self.size_id = size_id
+        self.current_price = current_price
+        self.is_included_in_menu = is_included_in_menu
+
+    def __repr__(self):
+        return f"SizePriceRecord(size_id={self.size_id!r}, current_price={self.current_price!r})"
+
+
+class ProductRecord:
+    """
+    Продукт меню
+
+    Из исходного объекта продукта копируются только нужные поля, ссылка на
+    ответ get_nomenclature не сохраняется. modifiers - кортеж пар
+    (ID группы модификаторов или None для одиночного модификатора, ID модификатора).
+    """
+    __slots__ = ("id", "name", "code", "type", "group_id", "product_category_id",
+                 "is_deleted", "size_prices", "modifiers")
+
+    def __init__(self, id, name, code, type, group_id, product_category_id, is_deleted, size_prices, modifiers):
+        self.id = id
+        self.name = name
+        self.code = code
+        self.type = type
+        self.group_id = group_id
+        self.product_category_id = product_category_id
+        self.is_deleted = is_deleted
+        self.size_prices = size_prices
+        self.modifiers = modifiers
+
+    def __repr__(self):
+        return f"ProductRecord(id={self.id!r}, name={self.name!r})"
+
+
+class GroupRecord:
+    """Группа меню"""
+    __slots__ = ("id", "name", "parent_group", "is_deleted")
+
+    def __init__(self, id, name, parent_group, is_deleted):
+        self.id = id
+        self.name = name
+        self.parent_group = parent_group
+        self.is_deleted = is_deleted
+
+    def __repr__(self):
+        return f"GroupRecord(id={self.id!r}, name={self.name!r})"
+
+
+class SizeRecord:
+    """Размер продукта"""
+    __slots__ = ("id", "name", "priority", "is_default")
+
+    def __init__(self, id, name, priority, is_default):
+        self.id = id
+        self.name = name
+        self.priority = priority
+        self.is_default = is_default
+
+    def __repr__(self):
+        return f"SizeRecord(id={self.id!r}, name={self.name!r})"
+
+
+def product_modifiers(product):
+    """
+    Возвращает модификаторы объекта продукта из ответа get_nomenclature
+
+    Args:
+        product (dict): Продукт из ответа get_nomenclature
+
+    Returns:
+        tuple: Пары (ID группы модификаторов или None, ID модификатора)
+    """
+    modifiers = [(None, modifier.get('id')) for modifier in product.get('modifiers') or []]
+    for group in product.get('groupModifiers') or []:
+        for child in group.get('childModifiers') or []:
+            modifiers.append((group.get('id'), child.get('id')))
+    return tuple(modifiers)
+
+
+def _build_product(product):
+    size_prices = []
+    for size_price in product.get('sizePrices') or []:
+        price_info = size_price.get('price') or {}
+        size_prices.append(SizePriceRecord(
+            size_price.get('sizeId'),
+            price_info.get('currentPrice', 0),
+            price_info.get('isIncludedInMenu', True)
+        ))
+
+    return ProductRecord(
+        product['id'],
+        product.get('name'),
+        product.get('code'),
+        product.get('type'),
+        product.get('parentGroup'),
+        product.get('productCategoryId'),
+        product.get('isDeleted', False),
+        tuple(size_prices),
+        product_modifiers(product)
+    )
+
+
+class MenuIndex:
+    """
+    Индексированное меню, собранное один раз из ответа get_nomenclature
+
+    Поиск продукта, группы, размера и цены выполняется по словарям
+    за O(1) вместо перебора списков продуктов.
+
+    Args:
+        menu_result (dict): Ответ get_nomenclature
+    """
+
+    def __init__(self, menu_result):
+        self.revision = menu_result.get('revision')
+        self.products = {}
+        self.groups = {}
+        self.sizes = {}
+        self._group_products = {}
+        self._prices = {}
+
+        for group in menu_result.get('groups') or []:
+            self.groups[group['id']] = GroupRecord(
+                group['id'],
+                group.get('name'),
+                group.get('parentGroup'),
+                group.get('isDeleted', False)
+            )
+
+        for size in menu_result.get('sizes') or []:
+            self.sizes[size['id']] = SizeRecord(
+                size['id'],
+                size.get('name'),
+                size.get('priority'),
+                size.get('isDefault', False)
+            )
+
+        for product in menu_result.get('products') or []:
+            self._add_product(_build_product(product))
+
+    def _add_product(self, record):
+        self.products[record.id] = record
+        self._group_products.setdefault(record.group_id, []).append(record)
+        for size_price in record.size_prices:
+            self._prices[(record.id, size_price.size_id)] = size_price.current_price
+
+    def __len__(self):
+        return len(self.products)
+
+    def __contains__(self, product_id):
+        return product_id in self.products
+
+    def get_product(self, product_id):
+        """
+        Возвращает продукт по ID
+
+        Args:
+            product_id (str): ID продукта
+
+        Returns:
+            ProductRecord: Продукт или None
+        """
+        return self.products.get(product_id)
+
+    def get_group(self, group_id):
+        """
+        Возвращает группу по ID
+
+        Args:
+            group_id (str): ID группы
+
+        Returns:
+            GroupRecord: Группа или None
+        """
+        return self.groups.get(group_id)
+
+    def get_size(self, size_id):
+        """
+        Возвращает размер по ID
+
+        Args:
+            size_id (str): ID размера
+
+        Returns:
+            SizeRecord: Размер или None
+        """
+        return self.sizes.get(size_id)
+
+    def products_in_group(self, group_id):
+        """
+        Возвращает продукты, непосредственно входящие в группу
+
+        Args:
+            group_id (str): ID группы (None - продукты без группы)
+
+        Returns:
+            list: Список ProductRecord
+        """
+        return self._group_products.get(group_id, [])
+
+    def get_price(self, product_id, size_id=None):
+        """
+        Возвращает текущую цену продукта для размера
+
+        Args:
+            product_id (str): ID продукта
+            size_id (str): ID размера (None - продукт без размеров)
+
+        Returns:
+            float: Цена или None, если продукт или размер не найден
+        """
+        return self._prices.get((product_id, size_id))
+
+    def get_product_size_and_price(self, product_id):
+        """
+        Возвращает размер и цену продукта так же, как order_utils.get_product_size_and_price
+
+        Args:
+            product_id (str): ID продукта
+
+        Returns:
+            tuple: (product_size_id, price) или (None, 0), если продукт не найден
+        """
+        record = self.products.get(product_id)
+        if record is None or not record.size_prices:
+            return None, 0
+
+        size_price = record.size_prices[0]
+        return size_price.size_id, size_price.current_price
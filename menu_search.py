@@ -0,0 +1,542 @@
+import bisect
+import re
+import threading
+from itertools import filterfalse, islice
+
+
+DEFAULT_PAGE_SIZE = 20
+
+# Вес совпадения слова запроса со словом продукта
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.0
+# Надбавка, если название начинается с запроса или запрос совпадает с артикулом
+NAME_PREFIX_BONUS = 2.0
+CODE_BONUS = 10.0
+
+# Слова короче не ищутся с опечатками: для них почти любое слово меню на расстоянии 1
+MIN_FUZZY_LENGTH = 4
+
+# Для префиксов до этой длины продукты хранятся заранее: у коротких префиксов тысячи слов
+SHORT_PREFIX_LENGTH = 3
+# Сколько слов с более длинным префиксом учитывается при поиске по префиксу
+MAX_PREFIX_TOKENS = 256
+
+_EMPTY = frozenset()
+
+_SPLIT = re.compile(r"[^\w]+")
+
+
+def normalize(text):
+    """
+    Приводит текст к виду для поиска: нижний регистр, ё -> е, без знаков препинания
+
+    Args:
+        text (str): Текст
+
+    Returns:
+        str: Слова, разделенные одним пробелом
+    """
+    if not text:
+        return ""
+    return " ".join(_SPLIT.sub(" ", str(text).lower().replace("ё", "е")).split())
+
+
+def _trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_distance(token):
+    return 1 if len(token) < 8 else 2
+
+
+def _within_one(a, b):
+    """Расстояние Левенштейна, если оно не больше 1, иначе 2"""
+    if a == b:
+        return 0
+    length_a, length_b = len(a), len(b)
+    if abs(length_a - length_b) > 1:
+        return 2
+    i = 0
+    common = min(length_a, length_b)
+    while i < common and a[i] == b[i]:
+        i += 1
+    if length_a == length_b:
+        return 1 if a[i + 1:] == b[i + 1:] else 2
+    if length_a < length_b:
+        return 1 if a[i:] == b[i + 1:] else 2
+    return 1 if a[i + 1:] == b[i:] else 2
+
+
+def _distance(a, b, limit):
+    """Расстояние Левенштейна или limit + 1, если оно больше limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class _Entry:
+    __slots__ = ("id", "name", "norm_name", "codes", "tokens", "group_id", "is_deleted", "order", "product")
+
+    def __init__(self, product, order):
+        self.id = product['id']
+        self.name = product.get('name') or ""
+        self.norm_name = normalize(self.name)
+        self.codes = tuple(code for code in (normalize(product.get('code')), normalize(product.get('article')))
+                           if code)
+        self.tokens = frozenset(self.norm_name.split()) | frozenset(
+            token for code in self.codes for token in code.split())
+        self.group_id = product.get('parentGroup')
+        self.is_deleted = product.get('isDeleted', False)
+        self.order = order
+        self.product = product
+
+
+class SearchPage:
+    """
+    Страница результатов поиска
+
+    Attributes:
+        items (list): Продукты страницы (словари из ответа меню)
+        total (int): Всего найдено продуктов
+        page (int): Номер страницы, начиная с 1
+        page_size (int): Размер страницы
+    """
+    __slots__ = ("items", "total", "page", "page_size")
+
+    def __init__(self, items, total, page, page_size):
+        self.items = items
+        self.total = total
+        self.page = page
+        self.page_size = page_size
+
+    @property
+    def pages(self):
+        return max(1, -(-self.total // self.page_size))
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __repr__(self):
+        return f"SearchPage(page={self.page}/{self.pages}, total={self.total})"
+
+
+class MenuSearchIndex:
+    """
+    Поисковый индекс по названиям и артикулам продуктов меню
+
+    Слова названий и артикулов хранятся в обратном индексе (слово -> ID
+    продуктов), отсортированный список слов отвечает на поиск по префиксу
+    бинарным поиском (продукты коротких префиксов хранятся заранее), а индекс
+    триграмм слов находит слова с опечатками без перебора всего словаря.
+    Продукт находится, если каждое слово запроса совпадает с каким-либо его
+    словом точно, как префикс или с опечаткой; результаты ранжируются по
+    качеству совпадения.
+
+    Найденные продукты делятся на группы с одинаковой оценкой операциями над
+    множествами, и из групп с лучшей оценкой берется только нужная страница,
+    поэтому время поиска почти не зависит от количества совпадений.
+
+    Args:
+        menu_result (dict | list): Ответ get_nomenclature или список продуктов
+    """
+
+    def __init__(self, menu_result=None):
+        self.revision = None
+        self._entries = {}
+        self._postings = {}
+        self._prefix_postings = {}
+        self._trigram_tokens = {}
+        self._code_ids = {}
+        self._group_ids = {}
+        self._deleted = set()
+        self._sorted_tokens = []
+        self._sorted_dirty = False
+        # Порядок выдачи при равной оценке (короткие названия, затем порядок меню)
+        # и отсортированные названия для надбавки за начало названия
+        self._rank = {}
+        self._ranked = []
+        self._names = []
+        self._name_ids = []
+        self._rank_dirty = False
+        self._next_order = 0
+        self._lock = threading.Lock()
+
+        if menu_result is not None:
+            self.apply(menu_result)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, product_id):
+        return product_id in self._entries
+
+    def apply(self, menu_result):
+        """
+        Добавляет, обновляет и удаляет продукты по ответу меню
+
+        Подходит и для полного ответа, и для изменений, полученных с
+        startRevision: продукты с isDeleted заменяют прежние версии и не
+        находятся поиском без include_deleted.
+
+        Args:
+            menu_result (dict | list): Ответ get_nomenclature или список продуктов
+        """
+        if isinstance(menu_result, dict):
+            products = menu_result.get('products') or []
+            revision = menu_result.get('revision')
+        else:
+            products = menu_result
+            revision = None
+
+        with self._lock:
+            for product in products:
+                self._add(product)
+            if revision is not None:
+                self.revision = revision
+
+    def add(self, product):
+        """
+        Добавляет или заменяет продукт
+
+        Args:
+            product (dict): Продукт из ответа меню
+        """
+        with self._lock:
+            self._add(product)
+
+    def remove(self, product_id):
+        """
+        Удаляет продукт из индекса
+
+        Args:
+            product_id (str): ID продукта
+
+        Returns:
+            bool: True, если продукт был в индексе
+        """
+        with self._lock:
+            return self._remove(product_id)
+
+    def _add(self, product):
+        # Обновленный продукт сохраняет свое место в порядке меню
+        previous = self._entries.get(product['id'])
+        if previous is not None:
+            order = previous.order
+            self._unindex(previous)
+        else:
+            order = self._next_order
+            self._next_order += 1
+        entry = _Entry(product, order)
+        self._entries[entry.id] = entry
+        for token in entry.tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                self._sorted_dirty = True
+                for trigram in _trigrams(token):
+                    self._trigram_tokens.setdefault(trigram, set()).add(token)
+            postings.add(entry.id)
+            for length in range(1, min(len(token), SHORT_PREFIX_LENGTH) + 1):
+                self._prefix_postings.setdefault(token[:length], set()).add(entry.id)
+        for code in entry.codes:
+            self._code_ids.setdefault(code, set()).add(entry.id)
+        self._group_ids.setdefault(entry.group_id, set()).add(entry.id)
+        if entry.is_deleted:
+            self._deleted.add(entry.id)
+        self._rank_dirty = True
+
+    def _remove(self, product_id):
+        entry = self._entries.pop(product_id, None)
+        if entry is None:
+            return False
+        self._unindex(entry)
+        return True
+
+    def _unindex(self, entry):
+        for token in entry.tokens:
+            postings = self._postings[token]
+            postings.discard(entry.id)
+            if not postings:
+                del self._postings[token]
+                self._sorted_dirty = True
+                for trigram in _trigrams(token):
+                    tokens = self._trigram_tokens[trigram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._trigram_tokens[trigram]
+            for length in range(1, min(len(token), SHORT_PREFIX_LENGTH) + 1):
+                _discard(self._prefix_postings, token[:length], entry.id)
+        for code in entry.codes:
+            _discard(self._code_ids, code, entry.id)
+        _discard(self._group_ids, entry.group_id, entry.id)
+        self._deleted.discard(entry.id)
+        self._rank_dirty = True
+
+    def _refresh_ranks(self):
+        if not self._rank_dirty:
+            return
+        entries = sorted(self._entries.values(), key=lambda entry: (len(entry.name), entry.order))
+        self._ranked = [entry.id for entry in entries]
+        self._rank = {product_id: rank for rank, product_id in enumerate(self._ranked)}
+        names = sorted((entry.norm_name, entry.order, entry.id) for entry in entries)
+        self._names = [name for name, _, _ in names]
+        self._name_ids = [product_id for _, _, product_id in names]
+        self._rank_dirty = False
+
+    def _tokens_with_prefix(self, prefix):
+        if self._sorted_dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._sorted_dirty = False
+        tokens = self._sorted_tokens
+        start = bisect.bisect_left(tokens, prefix)
+        end = bisect.bisect_left(tokens, prefix + "\uffff", start)
+        return tokens[start:min(end, start + MAX_PREFIX_TOKENS)]
+
+    def _similar_tokens(self, token):
+        limit = _max_distance(token)
+        query_trigrams = _trigrams(token)
+        # Каждая правка меняет не больше трех триграмм
+        required = max(1, len(query_trigrams) - 3 * limit)
+
+        shared = {}
+        for trigram in query_trigrams:
+            for candidate in self._trigram_tokens.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        for candidate, count in shared.items():
+            if count >= required and candidate != token:
+                distance = _within_one(token, candidate) if limit == 1 else _distance(token, candidate, limit)
+                if distance <= limit:
+                    yield candidate, distance
+
+    def _match_token(self, token, fuzzy):
+        """
+        Находит продукты, совпавшие со словом запроса
+
+        Returns:
+            list: (оценка, [множества ID]) от лучшей оценки к худшей; продукты
+                уровня - объединение множеств, уровни могут пересекаться
+        """
+        levels = []
+        exact = self._postings.get(token)
+        if exact:
+            levels.append((EXACT_SCORE, [exact]))
+
+        if len(token) <= SHORT_PREFIX_LENGTH:
+            prefixed = self._prefix_postings.get(token)
+            prefixed = [prefixed] if prefixed else []
+        else:
+            prefixed = [self._postings[candidate] for candidate in self._tokens_with_prefix(token)
+                        if candidate != token]
+        if prefixed:
+            levels.append((PREFIX_SCORE, prefixed))
+
+        if fuzzy and len(token) >= MIN_FUZZY_LENGTH and not token.isdigit():
+            by_distance = {}
+            for candidate, distance in self._similar_tokens(token):
+                by_distance.setdefault(distance, []).append(self._postings[candidate])
+            for distance in sorted(by_distance):
+                levels.append((FUZZY_SCORE / distance, by_distance[distance]))
+        return levels
+
+    @staticmethod
+    def _split(ids, levels):
+        """
+        Делит продукты ids (None - все совпавшие) по лучшему уровню совпадения
+
+        Множества индекса не изменяются и могут вернуться как есть.
+
+        Returns:
+            list: (оценка, множество ID) с непустыми непересекающимися множествами
+        """
+        parts = []
+        seen = None
+        for score, sets in levels:
+            if ids is None:
+                part = sets[0] if len(sets) == 1 else set().union(*sets)
+            elif len(sets) == 1:
+                # Проверка вложенности не создает копию, если все продукты совпали
+                part = ids if ids <= sets[0] else ids & sets[0]
+            else:
+                part = set().union(*[ids & other for other in sets])
+            if seen is not None:
+                part = part - seen
+            if part:
+                parts.append((score, part))
+                seen = part if seen is None else seen | part
+                if ids is not None and len(seen) == len(ids):
+                    break
+        return parts
+
+    def _first_ranked(self, ids, excluded, count):
+        """Первые count продуктов ids, кроме excluded, в порядке выдачи при равной оценке"""
+        # Большое множество быстрее отфильтровать по общему порядку, чем сортировать
+        if count * len(self._ranked) < len(ids) * len(ids):
+            ranked = filter(ids.__contains__, self._ranked)
+            for other in excluded:
+                ranked = filterfalse(other.__contains__, ranked)
+            return list(islice(ranked, count))
+        return sorted(ids.difference(*excluded), key=self._rank.__getitem__)[:count]
+
+    def search(self, query, page=1, page_size=DEFAULT_PAGE_SIZE, fuzzy=True, include_deleted=False,
+               group_id=None):
+        """
+        Ищет продукты по названию и артикулу
+
+        Args:
+            query (str): Запрос (пустой запрос возвращает все продукты в порядке меню)
+            page (int): Номер страницы, начиная с 1
+            page_size (int): Размер страницы
+            fuzzy (bool): Учитывать опечатки
+            include_deleted (bool): Возвращать удаленные продукты
+            group_id (str): Только продукты группы
+
+        Returns:
+            SearchPage: Страница результатов
+        """
+        page = max(1, page)
+        normalized = normalize(query)
+        tokens = normalized.split()
+        end = page * page_size
+
+        with self._lock:
+            if not tokens:
+                return self._all_products(page, page_size, include_deleted, group_id)
+
+            # Сочетания уровней совпадения всех слов: (сумма оценок, ID продуктов).
+            # Длинные слова обычно редкие, поэтому остальные слова проверяются
+            # только среди продуктов, найденных по первому
+            combinations = None
+            for token in sorted(set(tokens), key=len, reverse=True):
+                levels = self._match_token(token, fuzzy)
+                if combinations is None:
+                    combinations = self._split(None, levels)
+                    if group_id is not None:
+                        members = self._group_ids.get(group_id, _EMPTY)
+                        combinations = [(score, ids & members) for score, ids in combinations]
+                        combinations = [(score, ids) for score, ids in combinations if ids]
+                else:
+                    combinations = [(score + level_score, part) for score, ids in combinations
+                                    for level_score, part in self._split(ids, levels)]
+                if not combinations:
+                    return SearchPage([], 0, page, page_size)
+
+            # Удаленные продукты исключаются при выборке страницы, а не копированием множеств
+            excluded = (self._deleted,) if not include_deleted and self._deleted else ()
+            total = 0
+            for _, ids in combinations:
+                total += len(ids) - (len(ids & self._deleted) if excluded else 0)
+
+            self._refresh_ranks()
+            start = bisect.bisect_left(self._names, normalized)
+            stop = bisect.bisect_left(self._names, normalized + "\uffff", start)
+            # Надбавка, которую получают все продукты, не меняет порядок
+            name_prefixed = set(self._name_ids[start:stop]) if stop - start < len(self._names) else _EMPTY
+            bonuses = ((NAME_PREFIX_BONUS, name_prefixed), (CODE_BONUS, self._code_ids.get(normalized, _EMPTY)))
+
+            scored = {}
+            for score, ids in combinations:
+                parts = [(score, ids, excluded)]
+                for bonus, bonus_ids in bonuses:
+                    if not bonus_ids:
+                        continue
+                    split = []
+                    for part_score, part, part_excluded in parts:
+                        matched = part & bonus_ids
+                        if matched:
+                            split.append((part_score + bonus, matched, part_excluded))
+                            part_excluded += (matched,)
+                        split.append((part_score, part, part_excluded))
+                    parts = split
+                for part_score, part, part_excluded in parts:
+                    scored.setdefault(part_score, []).append((part, part_excluded))
+
+            found = []
+            for score in sorted(scored, reverse=True):
+                count = end - len(found)
+                candidates = []
+                for ids, ids_excluded in scored[score]:
+                    candidates += self._first_ranked(ids, ids_excluded, count)
+                if len(scored[score]) > 1:
+                    candidates.sort(key=self._rank.__getitem__)
+                found += candidates[:count]
+                if len(found) >= end:
+                    break
+
+            items = [self._entries[product_id].product for product_id in found[end - page_size:end]]
+        return SearchPage(items, total, page, page_size)
+
+    def _all_products(self, page, page_size, include_deleted, group_id):
+        if group_id is not None:
+            members = self._group_ids.get(group_id, _EMPTY)
+            ids = filter(members.__contains__, self._entries)
+            total = len(members) if include_deleted else len(members - self._deleted)
+        else:
+            ids = iter(self._entries)
+            total = len(self._entries) - (0 if include_deleted else len(self._deleted))
+        if not include_deleted and self._deleted:
+            ids = filterfalse(self._deleted.__contains__, ids)
+
+        end = page * page_size
+        items = [self._entries[product_id].product for product_id in islice(ids, end - page_size, end)]
+        return SearchPage(items, total, page, page_size)
+
+    def find(self, query, limit=10, **kwargs):
+        """
+        Возвращает лучшие совпадения запроса
+
+        Args:
+            query (str): Запрос
+            limit (int): Максимум продуктов
+            **kwargs: Параметры search()
+
+        Returns:
+            list: Продукты из ответа меню
+        """
+        return self.search(query, page=1, page_size=limit, **kwargs).items
+
+    def find_by_code(self, code):
+        """
+        Находит продукт по точному артикулу
+
+        Args:
+            code (str): Артикул
+
+        Returns:
+            dict: Продукт или None
+        """
+        normalized = normalize(code)
+        if not normalized:
+            return None
+        with self._lock:
+            ids = self._code_ids.get(normalized)
+            return self._entries[next(iter(ids))].product if ids else None
+
+
+def _discard(index, key, product_id):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(product_id)
+        if not ids:
+            del index[key]
@@ -0,0 +1,744 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+
+from menu_index import SizePriceRecord, ProductRecord, GroupRecord, SizeRecord, product_modifiers
+
+
+# Формат снимка (все числа little-endian):
+#   заголовок: MAGIC, версия, затем для каждой секции из _SECTIONS пара (смещение, количество)
+#   strings_offsets/strings_data: таблица строк в UTF-8, строка i - data[offsets[i]:offsets[i + 1]]
+#   groups/sizes/products/prices/modifiers: записи фиксированного размера в исходном порядке меню,
+#       строки хранятся номерами в таблице строк; цены и модификаторы продукта идут подряд
+#   *_hash: хеш-таблицы с открытой адресацией по crc32 ID: номер записи или EMPTY_SLOT,
+#       число ячеек - степень двойки (поиск по ID за O(1))
+#   products_by_group: номера продуктов, отсортированные по ID группы
+#   groups_by_parent: номера групп, отсортированные по ID родительской группы
+#   values: объекты групп, размеров и продуктов в двоичной записи значений (см. _ValueWriter);
+#       поля, которые запись хранит без потерь, отмечены _FROM_RECORD и берутся из записи
+#   meta: остальные поля ответа get_nomenclature в той же записи значений
+MAGIC = b"IIKOMENU"
+VERSION = 3
+
+_SECTIONS = ("strings_offsets", "strings_data", "groups", "sizes", "products", "prices", "modifiers",
+             "group_hash", "size_hash", "product_hash", "products_by_group", "groups_by_parent",
+             "values", "meta")
+
+_HEADER = struct.Struct("<8sHH" + "QQ" * len(_SECTIONS))
+_INDEX = struct.Struct("<I")
+_GROUP = struct.Struct("<IIIBI")
+_SIZE = struct.Struct("<IIiBI")
+_PRODUCT = struct.Struct("<IIIIIIBIHIHI")
+_PRICE = struct.Struct("<IdB")
+_MODIFIER = struct.Struct("<II")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+
+# Номер строки для значения None
+NO_STRING = 0xFFFFFFFF
+# Пустая ячейка хеш-таблицы
+EMPTY_SLOT = 0xFFFFFFFF
+
+_DELETED = 1
+_DEFAULT_SIZE = 2
+_NO_PRIORITY = 4
+
+_INCLUDED_IN_MENU = 1
+_INTEGER_PRICE = 2
+_NO_PRICE = 4
+
+# Типы значений в секциях values и meta: байт типа, затем данные
+_NONE, _FALSE, _TRUE, _INTEGER, _BIG_INTEGER, _REAL, _STRING, _LIST, _OBJECT, _FROM_RECORD = range(10)
+
+# Разделы, которые хранятся записями; productCategories и прочие поля идут в meta
+_RECORD_COLLECTIONS = ("groups", "sizes", "products")
+
+# Поля объектов, которые хранятся в записях: строковые и логические
+_GROUP_STRINGS = ("id", "name", "parentGroup")
+_SIZE_STRINGS = ("id", "name")
+_PRODUCT_STRINGS = ("id", "name", "code", "type", "parentGroup", "productCategoryId")
+
+
+class _StringTable:
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, value):
+        if value is None:
+            return NO_STRING
+        number = self.index.get(value)
+        if number is None:
+            number = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return number
+
+
+class _ValueWriter:
+    """
+    Записывает значения JSON в двоичном виде: байт типа, затем число,
+    номер строки в таблице строк или количество элементов и сами элементы
+    """
+
+    def __init__(self, strings):
+        self.strings = strings
+        self.data = bytearray()
+
+    def add(self, value, record_keys=()):
+        """
+        Записывает значение
+
+        Args:
+            value: Значение JSON
+            record_keys: Ключи верхнего уровня, значения которых берутся из записи
+
+        Returns:
+            int: Смещение значения в секции
+        """
+        offset = len(self.data)
+        self._write(value, record_keys)
+        return offset
+
+    def _write(self, value, record_keys=()):
+        data = self.data
+        if value is None:
+            data.append(_NONE)
+        elif value is True:
+            data.append(_TRUE)
+        elif value is False:
+            data.append(_FALSE)
+        elif isinstance(value, str):
+            data.append(_STRING)
+            data += _INDEX.pack(self.strings.add(value))
+        elif isinstance(value, int):
+            if -2 ** 63 <= value < 2 ** 63:
+                data.append(_INTEGER)
+                data += _INT.pack(value)
+            else:
+                data.append(_BIG_INTEGER)
+                data += _INDEX.pack(self.strings.add(str(value)))
+        elif isinstance(value, float):
+            data.append(_REAL)
+            data += _FLOAT.pack(value)
+        elif isinstance(value, dict):
+            data.append(_OBJECT)
+            data += _INDEX.pack(len(value))
+            for key, item in value.items():
+                data += _INDEX.pack(self.strings.add(key))
+                if key in record_keys:
+                    data.append(_FROM_RECORD)
+                else:
+                    self._write(item)
+        elif isinstance(value, (list, tuple)):
+            data.append(_LIST)
+            data += _INDEX.pack(len(value))
+            for item in value:
+                self._write(item)
+        else:
+            raise TypeError(f"Значение типа {type(value).__name__} нельзя сохранить в снимке")
+
+
+def _record_keys(item, string_keys, flag_keys, integer_keys=()):
+    # Ключи, значения которых запись хранит без потерь
+    keys = [key for key in string_keys if key in item and (item[key] is None or isinstance(item[key], str))]
+    keys += [key for key in flag_keys if type(item.get(key)) is bool]
+    keys += [key for key in integer_keys
+             if key in item and (item[key] is None or (type(item[key]) is int and -2 ** 31 <= item[key] < 2 ** 31))]
+    return keys
+
+
+def _sort_key(value):
+    # Порядок совпадает с побайтовым сравнением строк UTF-8 при поиске; None идет первым
+    if value is None:
+        return (False, b"")
+    return (True, value.encode('utf-8'))
+
+
+def _hash_table(items):
+    size = 1
+    while size < 2 * len(items):
+        size *= 2
+    mask = size - 1
+    slots = [EMPTY_SLOT] * size
+    for index, item in enumerate(items):
+        slot = zlib.crc32(item['id'].encode('utf-8')) & mask
+        # При повторе ID находится первая запись, как в MenuIndex
+        while slots[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & mask
+        slots[slot] = index
+    return struct.pack(f"<{size}I", *slots), size
+
+
+def _snapshot_chunks(menu_result):
+    """
+    Кодирует ответ get_nomenclature в части снимка
+
+    Returns:
+        tuple: (chunks, size) - части снимка по порядку и их общий размер
+    """
+    strings = _StringTable()
+    values = _ValueWriter(strings)
+
+    groups = menu_result.get('groups') or []
+    sizes = menu_result.get('sizes') or []
+    products = menu_result.get('products') or []
+
+    group_records = bytearray()
+    for group in groups:
+        flags = _DELETED if group.get('isDeleted', False) else 0
+        group_records += _GROUP.pack(
+            strings.add(group['id']), strings.add(group.get('name')), strings.add(group.get('parentGroup')),
+            flags, values.add(group, _record_keys(group, _GROUP_STRINGS, ("isDeleted",)))
+        )
+
+    size_records = bytearray()
+    for size in sizes:
+        keys = _record_keys(size, _SIZE_STRINGS, ("isDefault",), ("priority",))
+        # Приоритет, который не помещается в запись, сохраняется только среди значений
+        priority = size.get('priority') if "priority" in keys else None
+        flags = (_DEFAULT_SIZE if size.get('isDefault', False) else 0) | (_NO_PRIORITY if priority is None else 0)
+        size_records += _SIZE.pack(
+            strings.add(size['id']), strings.add(size.get('name')), priority or 0,
+            flags, values.add(size, keys)
+        )
+
+    product_records = bytearray()
+    price_records = bytearray()
+    price_count = 0
+    modifier_records = bytearray()
+    modifier_count = 0
+    for product in products:
+        size_prices = product.get('sizePrices') or []
+        for size_price in size_prices:
+            price_info = size_price.get('price') or {}
+            price = price_info.get('currentPrice', 0)
+            flags = _INCLUDED_IN_MENU if price_info.get('isIncludedInMenu', True) else 0
+            if price is None:
+                flags |= _NO_PRICE
+            elif isinstance(price, int):
+                flags |= _INTEGER_PRICE
+            price_records += _PRICE.pack(strings.add(size_price.get('sizeId')), price or 0, flags)
+
+        modifiers = product_modifiers(product)
+        for group_id, modifier_id in modifiers:
+            modifier_records += _MODIFIER.pack(strings.add(group_id), strings.add(modifier_id))
+
+        flags = _DELETED if product.get('isDeleted', False) else 0
+        product_records += _PRODUCT.pack(
+            strings.add(product['id']), strings.add(product.get('name')), strings.add(product.get('code')),
+            strings.add(product.get('type')), strings.add(product.get('parentGroup')),
+            strings.add(product.get('productCategoryId')), flags,
+            price_count, len(size_prices), modifier_count, len(modifiers),
+            values.add(product, _record_keys(product, _PRODUCT_STRINGS, ("isDeleted",)))
+        )
+        price_count += len(size_prices)
+        modifier_count += len(modifiers)
+
+    def order(items, field):
+        return b"".join(_INDEX.pack(i) for i in sorted(range(len(items)),
+                                                        key=lambda i: _sort_key(items[i].get(field))))
+
+    # Порядок полей ответа сохраняется, списки групп, размеров и продуктов собираются из записей
+    meta = _ValueWriter(strings)
+    meta.add(menu_result, [key for key in _RECORD_COLLECTIONS if isinstance(menu_result.get(key), list)])
+
+    encoded = [value.encode('utf-8') for value in strings.strings]
+    string_offsets = bytearray()
+    position = 0
+    for value in encoded:
+        string_offsets += _INDEX.pack(position)
+        position += len(value)
+    string_offsets += _INDEX.pack(position)
+
+    sections = {
+        "strings_offsets": (string_offsets, len(encoded)),
+        "strings_data": (b"".join(encoded), position),
+        "groups": (group_records, len(groups)),
+        "sizes": (size_records, len(sizes)),
+        "products": (product_records, len(products)),
+        "prices": (price_records, price_count),
+        "modifiers": (modifier_records, modifier_count),
+        "group_hash": _hash_table(groups),
+        "size_hash": _hash_table(sizes),
+        "product_hash": _hash_table(products),
+        "products_by_group": (order(products, 'parentGroup'), len(products)),
+        "groups_by_parent": (order(groups, 'parentGroup'), len(groups)),
+        "values": (values.data, None),
+        "meta": (meta.data, None)
+    }
+
+    header = []
+    offset = _HEADER.size
+    for name in _SECTIONS:
+        data, count = sections[name]
+        header += [offset, len(data) if count is None else count]
+        offset += len(data)
+
+    return [_HEADER.pack(MAGIC, VERSION, 0, *header)] + [sections[name][0] for name in _SECTIONS], offset
+
+
+def write_snapshot(menu_result, filename):
+    """
+    Сохраняет ответ get_nomenclature в бинарный снимок
+
+    Файл записывается во временный и затем заменяет существующий, поэтому
+    процессы, уже открывшие старый снимок, продолжают работать с ним.
+
+    Args:
+        menu_result (dict): Ответ get_nomenclature
+        filename (str): Имя файла снимка
+
+    Returns:
+        int: Размер файла в байтах
+    """
+    chunks, size = _snapshot_chunks(menu_result)
+    # Свой временный файл у каждого процесса: снимок одного меню могут записывать несколько процессов
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_filename, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_filename, filename)
+    return size
+
+
+def write_snapshot_into(menu_result, allocate):
+    """
+    Записывает бинарный снимок в буфер, выделенный вызывающим кодом
+
+    Args:
+        menu_result (dict): Ответ get_nomenclature
+        allocate (callable): allocate(size) -> записываемый буфер не меньше size
+            байтов (например, SharedMemory(create=True, size=size).buf)
+
+    Returns:
+        int: Размер снимка в байтах
+    """
+    chunks, size = _snapshot_chunks(menu_result)
+    buffer = allocate(size)
+    position = 0
+    for chunk in chunks:
+        buffer[position:position + len(chunk)] = chunk
+        position += len(chunk)
+    return size
+
+
+class _ValueReader:
+    """Читает значения, записанные _ValueWriter, из секции снимка"""
+
+    def __init__(self, snapshot, section):
+        offset, size = snapshot._sections[section]
+        self.data = bytes(snapshot._mm[offset:offset + size])
+        self.snapshot = snapshot
+        self.strings = {}
+
+    def string(self, number):
+        value = self.strings.get(number)
+        if value is None:
+            value = self.strings[number] = self.snapshot._string(number)
+        return value
+
+    def read(self, position, record_fields=None):
+        """
+        Читает значение
+
+        Args:
+            position (int): Смещение значения в секции
+            record_fields (dict): Значения полей верхнего уровня из записи
+
+        Returns:
+            Значение JSON
+        """
+        return self._read(position, record_fields)[0]
+
+    def _read(self, position, record_fields=None):
+        data = self.data
+        kind = data[position]
+        position += 1
+        if kind == _STRING:
+            return self.string(_INDEX.unpack_from(data, position)[0]), position + 4
+        if kind == _OBJECT:
+            count = _INDEX.unpack_from(data, position)[0]
+            position += 4
+            value = {}
+            for _ in range(count):
+                key = self.string(_INDEX.unpack_from(data, position)[0])
+                position += 4
+                if data[position] == _FROM_RECORD:
+                    value[key] = record_fields[key]
+                    position += 1
+                else:
+                    value[key], position = self._read(position)
+            return value, position
+        if kind == _LIST:
+            count = _INDEX.unpack_from(data, position)[0]
+            position += 4
+            value = []
+            for _ in range(count):
+                item, position = self._read(position)
+                value.append(item)
+            return value, position
+        if kind == _INTEGER:
+            return _INT.unpack_from(data, position)[0], position + 8
+        if kind == _REAL:
+            return _FLOAT.unpack_from(data, position)[0], position + 8
+        if kind == _BIG_INTEGER:
+            return int(self.string(_INDEX.unpack_from(data, position)[0])), position + 4
+        if kind == _NONE:
+            return None, position
+        if kind == _TRUE:
+            return True, position
+        if kind == _FALSE:
+            return False, position
+        raise ValueError(f"Неизвестный тип значения {kind} в снимке {self.snapshot.filename}")
+
+
+class MenuSnapshot:
+    """
+    Меню из бинарного снимка, открытого через mmap
+
+    При открытии читается только заголовок; группы, размеры, продукты и цены
+    читаются из файла при обращении к ним, поиск по ID - по хеш-таблице. Методы
+    поиска совпадают с MenuIndex.
+
+    Вместо файла можно передать буфер со снимком, например из разделяемой
+    памяти (см. write_snapshot_into); он читается так же, без копирования.
+
+    Args:
+        filename (str): Имя файла, созданного write_snapshot (для буфера - только название)
+        buffer (memoryview): Снимок в памяти вместо файла
+        on_close (callable): Вызывается после close(), когда буфер больше не используется
+    """
+
+    def __init__(self, filename, buffer=None, on_close=None):
+        self.filename = filename
+        self._on_close = on_close
+        if buffer is None:
+            with open(filename, 'rb') as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._mm = memoryview(buffer)
+
+        try:
+            values = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            self.close()
+            raise ValueError(f"Файл {filename} слишком короткий для снимка меню")
+        if values[0] != MAGIC or values[1] != VERSION:
+            self.close()
+            raise ValueError(f"Файл {filename} не является снимком меню версии {VERSION}")
+
+        self._sections = {}
+        for i, name in enumerate(_SECTIONS):
+            self._sections[name] = (values[3 + 2 * i], values[4 + 2 * i])
+
+        # Секции идут подряд, последняя (meta) должна заканчиваться в пределах файла
+        meta_offset, meta_size = self._sections["meta"]
+        if meta_offset + meta_size > len(self._mm):
+            self.close()
+            raise ValueError(f"Снимок меню {filename} обрезан")
+
+        self._meta = None
+        self._strings_offset = self._sections["strings_offsets"][0]
+        self._strings_data = self._sections["strings_data"][0]
+
+    def close(self):
+        if isinstance(self._mm, memoryview):
+            self._mm.release()
+        else:
+            self._mm.close()
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _meta_data(self):
+        if self._meta is None:
+            # Списки групп, размеров и продуктов здесь не читаются
+            self._meta = _ValueReader(self, "meta").read(0, dict.fromkeys(_RECORD_COLLECTIONS))
+        return self._meta
+
+    @property
+    def revision(self):
+        return self._meta_data().get('revision')
+
+    def _string_bytes(self, number):
+        start, end = struct.unpack_from("<II", self._mm, self._strings_offset + 4 * number)
+        return bytes(self._mm[self._strings_data + start:self._strings_data + end])
+
+    def _string(self, number):
+        if number == NO_STRING:
+            return None
+        return self._string_bytes(number).decode('utf-8')
+
+    def _record(self, section, record_struct, index):
+        return record_struct.unpack_from(self._mm, self._sections[section][0] + record_struct.size * index)
+
+    def _order_index(self, section, position):
+        return _INDEX.unpack_from(self._mm, self._sections[section][0] + 4 * position)[0]
+
+    def _search_key(self, number):
+        if number == NO_STRING:
+            return (False, b"")
+        return (True, self._string_bytes(number))
+
+    def _lower_bound(self, order_section, record_section, record_struct, field, key):
+        low, high = 0, self._sections[order_section][1]
+        while low < high:
+            middle = (low + high) // 2
+            index = self._order_index(order_section, middle)
+            if self._search_key(self._record(record_section, record_struct, index)[field]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find(self, hash_section, record_section, record_struct, item_id):
+        if item_id is None:
+            return None
+        key = item_id.encode('utf-8')
+        offset, size = self._sections[hash_section]
+        mask = size - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            index = _INDEX.unpack_from(self._mm, offset + 4 * slot)[0]
+            if index == EMPTY_SLOT:
+                return None
+            record = self._record(record_section, record_struct, index)
+            if self._string_bytes(record[0]) == key:
+                return record
+            slot = (slot + 1) & mask
+
+    def _size_prices(self, start, count):
+        size_prices = []
+        for i in range(start, start + count):
+            size_number, price, flags = self._record("prices", _PRICE, i)
+            if flags & _NO_PRICE:
+                price = None
+            elif flags & _INTEGER_PRICE:
+                price = int(price)
+            size_prices.append(SizePriceRecord(self._string(size_number), price, bool(flags & _INCLUDED_IN_MENU)))
+        return tuple(size_prices)
+
+    def _modifiers(self, start, count):
+        modifiers = []
+        for i in range(start, start + count):
+            group_number, modifier_number = self._record("modifiers", _MODIFIER, i)
+            modifiers.append((self._string(group_number), self._string(modifier_number)))
+        return tuple(modifiers)
+
+    def _product(self, record):
+        (id_number, name, code, product_type, group_id, category_id, flags,
+         price_start, price_count, modifier_start, modifier_count, _) = record
+        return ProductRecord(
+            self._string(id_number), self._string(name), self._string(code), self._string(product_type),
+            self._string(group_id), self._string(category_id), bool(flags & _DELETED),
+            self._size_prices(price_start, price_count), self._modifiers(modifier_start, modifier_count)
+        )
+
+    def __len__(self):
+        return self._sections["products"][1]
+
+    def __contains__(self, product_id):
+        return self._find("product_hash", "products", _PRODUCT, product_id) is not None
+
+    def get_product(self, product_id):
+        """
+        Возвращает продукт по ID
+
+        Args:
+            product_id (str): ID продукта
+
+        Returns:
+            ProductRecord: Продукт или None
+        """
+        record = self._find("product_hash", "products", _PRODUCT, product_id)
+        return self._product(record) if record is not None else None
+
+    def get_group(self, group_id):
+        """
+        Возвращает группу по ID
+
+        Args:
+            group_id (str): ID группы
+
+        Returns:
+            GroupRecord: Группа или None
+        """
+        record = self._find("group_hash", "groups", _GROUP, group_id)
+        return self._group(record) if record is not None else None
+
+    def _group(self, record):
+        id_number, name, parent_group, flags, _ = record
+        return GroupRecord(self._string(id_number), self._string(name), self._string(parent_group),
+                           bool(flags & _DELETED))
+
+    def get_size(self, size_id):
+        """
+        Возвращает размер по ID
+
+        Args:
+            size_id (str): ID размера
+
+        Returns:
+            SizeRecord: Размер или None
+        """
+        record = self._find("size_hash", "sizes", _SIZE, size_id)
+        if record is None:
+            return None
+        id_number, name, priority, flags, _ = record
+        return SizeRecord(self._string(id_number), self._string(name),
+                          None if flags & _NO_PRIORITY else priority, bool(flags & _DEFAULT_SIZE))
+
+    def products_in_group(self, group_id):
+        """
+        Возвращает продукты, непосредственно входящие в группу
+
+        Args:
+            group_id (str): ID группы (None - продукты без группы)
+
+        Returns:
+            list: Список ProductRecord
+        """
+        key = _sort_key(group_id)
+        # Поле 4 записи продукта - ID группы
+        position = self._lower_bound("products_by_group", "products", _PRODUCT, 4, key)
+        products = []
+        while position < self._sections["products_by_group"][1]:
+            record = self._record("products", _PRODUCT, self._order_index("products_by_group", position))
+            if self._search_key(record[4]) != key:
+                break
+            products.append(self._product(record))
+            position += 1
+        return products
+
+    def child_groups(self, group_id):
+        """
+        Возвращает группы, непосредственно вложенные в группу
+
+        Args:
+            group_id (str): ID родительской группы (None - группы верхнего уровня)
+
+        Returns:
+            list: Список GroupRecord
+        """
+        key = _sort_key(group_id)
+        # Поле 2 записи группы - ID родительской группы
+        position = self._lower_bound("groups_by_parent", "groups", _GROUP, 2, key)
+        children = []
+        while position < self._sections["groups_by_parent"][1]:
+            record = self._record("groups", _GROUP, self._order_index("groups_by_parent", position))
+            if self._search_key(record[2]) != key:
+                break
+            children.append(self._group(record))
+            position += 1
+        return children
+
+    def get_price(self, product_id, size_id=None):
+        """
+        Возвращает текущую цену продукта для размера
+
+        Args:
+            product_id (str): ID продукта
+            size_id (str): ID размера (None - продукт без размеров)
+
+        Returns:
+            float: Цена или None, если продукт или размер не найден
+        """
+        record = self._find("product_hash", "products", _PRODUCT, product_id)
+        if record is None:
+            return None
+        for size_price in self._size_prices(record[7], record[8]):
+            if size_price.size_id == size_id:
+                return size_price.current_price
+        return None
+
+    def get_product_size_and_price(self, product_id):
+        """
+        Возвращает размер и цену продукта так же, как MenuIndex.get_product_size_and_price
+
+        Args:
+            product_id (str): ID продукта
+
+        Returns:
+            tuple: (product_size_id, price) или (None, 0), если продукт не найден
+        """
+        record = self._find("product_hash", "products", _PRODUCT, product_id)
+        if record is None or not record[8]:
+            return None, 0
+        size_price = self._size_prices(record[7], 1)[0]
+        return size_price.size_id, size_price.current_price
+
+    def _collection(self, reader, section, record_struct, fields):
+        # fields(string, record) - поля объекта, которые хранятся в записи
+        string = reader.string
+        return [reader.read(record[-1], fields(string, record))
+                for record in record_struct.iter_unpack(self._section_bytes(section, record_struct))]
+
+    def _section_bytes(self, section, record_struct):
+        offset, count = self._sections[section]
+        return self._mm[offset:offset + record_struct.size * count]
+
+    def to_result(self):
+        """
+        Восстанавливает ответ get_nomenclature, из которого создан снимок
+
+        Группы, размеры и продукты собираются из записей снимка и таблицы
+        строк, остальные поля объектов - из секции значений.
+
+        Returns:
+            dict: Меню в формате ответа get_nomenclature
+        """
+        reader = _ValueReader(self, "values")
+        collections = {
+            "groups": self._collection(reader, "groups", _GROUP, lambda string, record: {
+                "id": string(record[0]), "name": string(record[1]), "parentGroup": string(record[2]),
+                "isDeleted": bool(record[3] & _DELETED)
+            }),
+            "sizes": self._collection(reader, "sizes", _SIZE, lambda string, record: {
+                "id": string(record[0]), "name": string(record[1]),
+                "priority": None if record[3] & _NO_PRIORITY else record[2],
+                "isDefault": bool(record[3] & _DEFAULT_SIZE)
+            }),
+            "products": self._collection(reader, "products", _PRODUCT, lambda string, record: {
+                "id": string(record[0]), "name": string(record[1]), "code": string(record[2]),
+                "type": string(record[3]), "parentGroup": string(record[4]),
+                "productCategoryId": string(record[5]), "isDeleted": bool(record[6] & _DELETED)
+            })
+        }
+        meta = _ValueReader(self, "meta")
+        meta.strings = reader.strings
+        return meta.read(0, collections)
+
+    def export_json(self, filename):
+        """
+        Сохраняет меню в JSON в том же виде, что и save_menu_to_file
+
+        Args:
+            filename (str): Имя файла
+        """
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_result(), f, indent=2, ensure_ascii=False)
+
+
+def load_snapshot(filename):
+    """
+    Открывает снимок меню
+
+    Args:
+        filename (str): Имя файла снимка
+
+    Returns:
+        MenuSnapshot: Снимок или None, если файл не найден или поврежден
+    """
+    try:
+        return MenuSnapshot(filename)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Ошибка при загрузке снимка меню: {e}")
+        return None
@@ -0,0 +1,273 @@
+import codecs
+import json
+import os
+import re
+
+import requests
+
+from iiko_api import get_default_client, _nomenclature_payload
+from menu_sync import MENU_COLLECTIONS
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# События потокового разбора
+START_ARRAY = "start_array"
+ITEM = "item"
+END_ARRAY = "end_array"
+VALUE = "value"
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Символы, которыми может продолжаться число
+_NUMBER_TAIL = re.compile(r'[0-9.eE+\-]*')
+_decoder = json.JSONDecoder()
+
+
+def _decode_chunks(chunks):
+    """Декодирует поток байтов UTF-8 в поток строк"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+class _StreamingObjectParser:
+    """
+    Разбирает JSON-объект верхнего уровня по мере поступления данных
+
+    Массивы с ключами из array_keys отдаются поэлементно, остальные значения
+    целиком. В памяти одновременно находится только текущий элемент и
+    непрочитанный остаток буфера.
+    """
+
+    def __init__(self, text_chunks, array_keys):
+        self._chunks = iter(text_chunks)
+        self._array_keys = frozenset(array_keys)
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            self._buf = self._buf[self._pos:] + chunk
+            self._pos = 0
+            return True
+        self._eof = True
+        return False
+
+    def _peek(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Неожиданный конец JSON")
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Ожидался символ {char!r}, получен {found!r} (позиция {self._pos})")
+        self._pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # Число или литерал в конце буфера может быть обрезан, в том числе после
+            # точки или экспоненты ("3." + "5e10"), когда raw_decode уже вернул "3"
+            if (self._buf[self._pos] not in '{["'
+                    and _NUMBER_TAIL.match(self._buf, end).end() >= len(self._buf) and self._fill()):
+                continue
+
+            self._pos = end
+            return value
+
+    def events(self):
+        """
+        Генерирует события разбора
+
+        Yields:
+            tuple: (событие, ключ, значение), где событие - START_ARRAY, ITEM,
+                END_ARRAY или VALUE
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            return
+
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError("Ключ объекта должен быть строкой")
+            self._expect(':')
+
+            if key in self._array_keys and self._peek() == '[':
+                self._pos += 1
+                yield START_ARRAY, key, None
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield ITEM, key, self._value()
+                        separator = self._peek()
+                        self._pos += 1
+                        if separator == ']':
+                            break
+                        if separator != ',':
+                            raise ValueError(f"Неожиданный символ {separator!r} в массиве {key}")
+                yield END_ARRAY, key, None
+            else:
+                yield VALUE, key, self._value()
+
+            separator = self._peek()
+            self._pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"Неожиданный символ {separator!r} в объекте")
+
+
+def iter_json_events(byte_chunks, array_keys=MENU_COLLECTIONS):
+    """
+    Потоково разбирает JSON-объект из последовательности байтовых блоков
+
+    Args:
+        byte_chunks (iterable): Блоки байтов ответа
+        array_keys (iterable): Ключи массивов, которые отдаются поэлементно
+
+    Yields:
+        tuple: (событие, ключ, значение)
+    """
+    parser = _StreamingObjectParser(_decode_chunks(byte_chunks), array_keys)
+    for event in parser.events():
+        yield event
+
+
+def _stream_nomenclature_events(token, organization_id, start_revision, client, chunk_size):
+    client = client or get_default_client()
+    payload = _nomenclature_payload(organization_id, start_revision)
+
+    with client.send_stream("nomenclature", payload, token) as response:
+        for event in iter_json_events(response.iter_content(chunk_size=chunk_size)):
+            yield event
+
+
+def iter_nomenclature(token, organization_id, start_revision="0", client=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Получает меню и отдает группы, продукты, размеры и категории по мере
+    разбора ответа, не собирая все меню в памяти
+
+    Args:
+        token (str | TokenManager): Токен доступа
+        organization_id (str): ID организации
+        start_revision (str): Начальная ревизия (по умолчанию "0")
+        client (IikoClient): Клиент iiko API (по умолчанию общий)
+        chunk_size (int): Размер блока чтения ответа в байтах
+
+    Yields:
+        tuple: (ключ, значение) - для groups, products, sizes и productCategories
+            по одному объекту на элемент, для остальных полей (revision,
+            correlationId) значение целиком
+
+    Raises:
+        requests.exceptions.RequestException: При ошибке сети или HTTP, в том
+            числе после того, как часть меню уже отдана
+        ValueError: Если ответ не является корректным JSON
+    """
+    for event, key, value in _stream_nomenclature_events(
+            token, organization_id, start_revision, client, chunk_size):
+        if event == ITEM or event == VALUE:
+            yield key, value
+
+
+def _remove_file(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+def stream_menu_to_file(token, organization_id, filename=None, start_revision="0", client=None,
+                        chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Сохраняет меню в файл по мере получения, не собирая все меню в памяти
+
+    Файл содержит тот же JSON, что и ответ get_nomenclature, но без отступов.
+    Меню записывается во временный файл рядом с filename и заменяет его только
+    после успешного получения всего ответа, поэтому при ошибке прежний файл
+    остается нетронутым.
+
+    Args:
+        token (str | TokenManager): Токен доступа
+        organization_id (str): ID организации
+        filename (str): Имя файла (по умолчанию menu_<organization_id>.json)
+        start_revision (str): Начальная ревизия (по умолчанию "0")
+        client (IikoClient): Клиент iiko API (по умолчанию общий)
+        chunk_size (int): Размер блока чтения ответа в байтах
+
+    Returns:
+        dict: Статистика {имя раздела: количество элементов, "revision": ревизия}
+            или None при ошибке
+    """
+    if filename is None:
+        filename = f"menu_{organization_id}.json"
+
+    stats = {}
+    temp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(temp_filename, 'w', encoding='utf-8') as f:
+            f.write('{')
+            first_key = True
+            first_item = False
+            for event, key, value in _stream_nomenclature_events(
+                    token, organization_id, start_revision, client, chunk_size):
+                if event == ITEM:
+                    if not first_item:
+                        f.write(',')
+                    first_item = False
+                    f.write(json.dumps(value, ensure_ascii=False))
+                    stats[key] += 1
+                    continue
+
+                if event == END_ARRAY:
+                    f.write(']')
+                    continue
+
+                if not first_key:
+                    f.write(',')
+                first_key = False
+                f.write(json.dumps(key, ensure_ascii=False))
+                f.write(':')
+
+                if event == START_ARRAY:
+                    f.write('[')
+                    first_item = True
+                    stats[key] = 0
+                else:
+                    f.write(json.dumps(value, ensure_ascii=False))
+                    if key == 'revision':
+                        stats[key] = value
+            f.write('}')
+        os.replace(temp_filename, filename)
+    except requests.exceptions.RequestException as e:
+        print(f"Ошибка при запросе меню: {e}")
+        _remove_file(temp_filename)
+        return None
+    except ValueError as e:
+        print(f"Ошибка разбора меню: {e}")
+        _remove_file(temp_filename)
+        return None
+
+    print(f"Меню сохранено в файл: {filename}")
+    return stats
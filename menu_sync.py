@@ -0,0 +1,212 @@
+import json
+import threading
+
+from iiko_api import get_default_client
+
+
+# Разделы номенклатуры, которые приходят списками объектов с полем id
+MENU_COLLECTIONS = ("groups", "productCategories", "products", "sizes")
+
+
+def merge_by_id(items, changes):
+    """
+    Объединяет изменения со списком объектов по полю id
+
+    Args:
+        items (dict): Текущие объекты {id: объект}, изменяется на месте
+        changes (list): Новые или измененные объекты
+
+    Returns:
+        int: Количество примененных изменений
+    """
+    count = 0
+    for item in changes or []:
+        item_id = item.get('id')
+        if item_id is None:
+            continue
+        items[item_id] = item
+        count += 1
+    return count
+
+
+class _StoredMenu:
+    __slots__ = ("revision", "correlation_id", "collections", "lock", "_snapshot")
+
+    def __init__(self):
+        self.revision = 0
+        self.correlation_id = None
+        self.collections = {name: {} for name in MENU_COLLECTIONS}
+        self.lock = threading.Lock()
+        self._snapshot = None
+
+    def to_result(self):
+        if self._snapshot is None:
+            snapshot = {
+                "correlationId": self.correlation_id,
+                "revision": self.revision
+            }
+            for name in MENU_COLLECTIONS:
+                snapshot[name] = list(self.collections[name].values())
+            self._snapshot = snapshot
+        return self._snapshot
+
+
+class MenuSync:
+    """
+    Инкрементальная синхронизация меню по startRevision
+
+    Для каждой организации хранит последнюю ревизию и локальную копию меню.
+    При синхронизации запрашиваются только изменения с этой ревизии, которые
+    объединяются с локальной копией по id.
+
+    Args:
+        client (IikoClient): Клиент iiko API (по умолчанию общий)
+    """
+
+    def __init__(self, client=None):
+        self.client = client
+        self._menus = {}
+        self._menus_lock = threading.Lock()
+
+    def _get_stored(self, organization_id):
+        with self._menus_lock:
+            stored = self._menus.get(organization_id)
+            if stored is None:
+                stored = self._menus[organization_id] = _StoredMenu()
+            return stored
+
+    def get_revision(self, organization_id):
+        """
+        Возвращает последнюю полученную ревизию меню организации
+
+        Args:
+            organization_id (str): ID организации
+
+        Returns:
+            int: Ревизия или 0, если меню еще не загружалось
+        """
+        stored = self._menus.get(organization_id)
+        return stored.revision if stored else 0
+
+    def get_menu(self, organization_id):
+        """
+        Возвращает локальную копию меню в формате ответа get_nomenclature
+
+        Args:
+            organization_id (str): ID организации
+
+        Returns:
+            dict: Меню или None, если меню еще не загружалось
+        """
+        stored = self._menus.get(organization_id)
+        if stored is None or not stored.revision:
+            return None
+        with stored.lock:
+            return stored.to_result()
+
+    def apply(self, organization_id, menu_result):
+        """
+        Применяет ответ get_nomenclature к локальной копии меню
+
+        Args:
+            organization_id (str): ID организации
+            menu_result (dict): Ответ get_nomenclature (полный или с изменениями)
+
+        Returns:
+            int: Количество измененных объектов
+        """
+        stored = self._get_stored(organization_id)
+        with stored.lock:
+            return self._apply(stored, menu_result)
+
+    def _apply(self, stored, menu_result):
+        changed = 0
+        for name in MENU_COLLECTIONS:
+            changed += merge_by_id(stored.collections[name], menu_result.get(name))
+
+        revision = menu_result.get('revision')
+        revision_changed = revision is not None and revision != stored.revision
+        if revision_changed:
+            stored.revision = revision
+        stored.correlation_id = menu_result.get('correlationId', stored.correlation_id)
+
+        # Ранее выданный снимок не изменяется, при изменениях собирается новый
+        if changed or revision_changed:
+            stored._snapshot = None
+        return changed
+
+    def update(self, organization_id, fetch):
+        """
+        Загружает изменения меню через fetch и применяет их к локальной копии
+
+        Ревизия читается, изменения загружаются и применяются под блокировкой
+        организации, как в sync(), поэтому одновременные обновления одной
+        организации выполняются по очереди и более старый ответ не
+        перезаписывает новый.
+
+        Args:
+            organization_id (str): ID организации
+            fetch (callable): fetch(start_revision) -> ответ get_nomenclature;
+                исключения передаются вызывающему коду
+
+        Returns:
+            int: Количество измененных объектов
+        """
+        stored = self._get_stored(organization_id)
+        with stored.lock:
+            return self._apply(stored, fetch(stored.revision))
+
+    def sync(self, token, organization_id):
+        """
+        Загружает изменения меню с последней известной ревизии
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            organization_id (str): ID организации
+
+        Returns:
+            dict: Актуальное меню в формате ответа get_nomenclature или None при ошибке
+        """
+        client = self.client or get_default_client()
+        stored = self._get_stored(organization_id)
+
+        # Одновременные синхронизации одной организации выполняются по очереди,
+        # чтобы вторая запросила изменения уже с новой ревизии
+        with stored.lock:
+            menu_result = client.get_nomenclature(token, organization_id, start_revision=stored.revision)
+            if menu_result is None:
+                return None
+
+            changed = self._apply(stored, menu_result)
+            print(f"Меню {organization_id}: ревизия {stored.revision}, изменено объектов: {changed}")
+            return stored.to_result()
+
+    def save(self, filename):
+        """
+        Сохраняет локальные копии меню и ревизии в файл
+
+        Args:
+            filename (str): Имя файла
+        """
+        data = {}
+        with self._menus_lock:
+            menus = list(self._menus.items())
+        for organization_id, stored in menus:
+            with stored.lock:
+                data[organization_id] = stored.to_result()
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def load(self, filename):
+        """
+        Загружает локальные копии меню из файла, сохраненного методом save
+
+        Args:
+            filename (str): Имя файла
+        """
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        for organization_id, menu_result in data.items():
+            self.apply(organization_id, menu_result)
@@ -0,0 +1,363 @@
+import argparse
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from iiko_api import IikoClient, BASE_URL, _nomenclature_payload
+from codec import get_json_codec, decompress
+from fanout import FanOutEngine, DEFAULT_MAX_WORKERS, DEFAULT_PER_TENANT_CONCURRENCY
+from menu_snapshot import MenuSnapshot, write_snapshot, write_snapshot_into
+from order_batch import _error_message
+
+
+# Разделы меню, количество элементов которых попадает в MenuResult.counts
+MENU_COUNTS = ("groups", "productCategories", "products", "sizes")
+
+
+class MenuJob:
+    """
+    Ответ nomenclature в том виде, в каком он пришел по сети
+
+    Args:
+        organization_id (str): ID организации
+        body (bytes): Тело ответа (возможно, сжатое)
+        content_encoding (str): Значение Content-Encoding ответа (None - тело не сжато)
+    """
+    __slots__ = ("organization_id", "body", "content_encoding")
+
+    def __init__(self, organization_id, body, content_encoding=None):
+        self.organization_id = organization_id
+        self.body = body
+        self.content_encoding = content_encoding
+
+    def __repr__(self):
+        return f"MenuJob(organization_id={self.organization_id!r}, size={len(self.body)})"
+
+
+class MenuResult:
+    """
+    Результат обработки меню одной организации в рабочем процессе
+
+    Сам ответ меню в родительский процесс не передается: только счетчики,
+    ревизия и снимок меню - файлом или сегментом разделяемой памяти.
+
+    Attributes:
+        organization_id (str): ID организации
+        success (bool): Меню разобрано
+        error (str): Описание ошибки
+        revision (int): Ревизия меню
+        counts (dict): Количество групп, категорий, продуктов и размеров
+        body_size (int): Размер тела ответа по сети в байтах
+        snapshot_file (str): Файл снимка (если задан snapshot_dir)
+        shm_name (str): Сегмент разделяемой памяти со снимком (если shared_memory=True)
+        snapshot_size (int): Размер снимка в байтах
+        value: Результат handler
+        elapsed (float): Время обработки в рабочем процессе в секундах
+    """
+    __slots__ = ("organization_id", "success", "error", "revision", "counts", "body_size",
+                 "snapshot_file", "shm_name", "snapshot_size", "value", "elapsed")
+
+    def __init__(self, organization_id, success=False, error=None):
+        self.organization_id = organization_id
+        self.success = success
+        self.error = error
+        self.revision = None
+        self.counts = {}
+        self.body_size = 0
+        self.snapshot_file = None
+        self.shm_name = None
+        self.snapshot_size = 0
+        self.value = None
+        self.elapsed = 0.0
+
+    def open_snapshot(self):
+        """
+        Открывает снимок меню, созданный рабочим процессом
+
+        Снимок в разделяемой памяти открывается один раз: close() снимка
+        освобождает сегмент.
+
+        Returns:
+            MenuSnapshot: Снимок или None, если он не создавался
+        """
+        if self.shm_name is not None:
+            segment = SharedMemory(name=self.shm_name)
+            self.shm_name = None
+
+            def release():
+                segment.close()
+                segment.unlink()
+
+            return MenuSnapshot(f"shm:{segment.name}", segment.buf[:self.snapshot_size], release)
+        if self.snapshot_file is not None:
+            return MenuSnapshot(self.snapshot_file)
+        return None
+
+    def release(self):
+        """Освобождает сегмент разделяемой памяти, если снимок не открывался"""
+        if self.shm_name is not None:
+            segment = SharedMemory(name=self.shm_name)
+            self.shm_name = None
+            segment.close()
+            segment.unlink()
+
+    def print_stats(self):
+        """Выводит статистику меню так же, как ui.print_menu_stats"""
+        print(f"\nМеню организации {self.organization_id}:")
+        print(f"Групп: {self.counts.get('groups', 0)}")
+        print(f"Категорий продуктов: {self.counts.get('productCategories', 0)}")
+        print(f"Продуктов: {self.counts.get('products', 0)}")
+        print(f"Размеров: {self.counts.get('sizes', 0)}")
+        print(f"Ревизия: {self.revision if self.revision is not None else 'не указана'}")
+
+    def __repr__(self):
+        status = "ok" if self.success else f"error={self.error!r}"
+        return (f"MenuResult(organization_id={self.organization_id!r}, {status}, "
+                f"products={self.counts.get('products', 0)}, elapsed={self.elapsed:.3f})")
+
+
+def snapshot_filename(organization_id):
+    """Имя файла снимка меню организации в snapshot_dir"""
+    return f"menu_{organization_id}.snap"
+
+
+def _write_shared_snapshot(menu_result):
+    segments = []
+
+    def allocate(size):
+        segment = SharedMemory(create=True, size=max(size, 1))
+        segments.append(segment)
+        return segment.buf
+
+    try:
+        size = write_snapshot_into(menu_result, allocate)
+    except Exception:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+        raise
+
+    # Сегмент остается в системе до MenuResult.open_snapshot()/release() в родительском процессе
+    segment = segments[0]
+    segment.close()
+    return segment.name, size
+
+
+def process_menu(job, snapshot_dir=None, shared_memory=False, json_codec=None, handler=None):
+    """
+    Распаковывает, разбирает и сохраняет в снимок меню одной организации
+
+    Выполняется в рабочем процессе MenuWorkerPool; исключения не
+    выбрасываются, а записываются в MenuResult.error.
+
+    Args:
+        job (MenuJob): Ответ nomenclature
+        snapshot_dir (str): Папка для файлов снимков (None - файлы не создаются)
+        shared_memory (bool): Передать снимок в разделяемой памяти вместо файла
+        json_codec (str): Реализация JSON ("json", "orjson" или None - самая быстрая)
+        handler (callable): handler(organization_id, menu_result) - дополнительная
+            обработка в рабочем процессе, результат попадает в MenuResult.value
+
+    Returns:
+        MenuResult: Результат обработки
+    """
+    started = time.perf_counter()
+    result = MenuResult(job.organization_id)
+    result.body_size = len(job.body)
+    try:
+        menu_result = get_json_codec(json_codec).loads(decompress(job.body, job.content_encoding))
+        result.revision = menu_result.get('revision')
+        result.counts = {key: len(menu_result.get(key) or []) for key in MENU_COUNTS}
+
+        if handler is not None:
+            result.value = handler(job.organization_id, menu_result)
+
+        if shared_memory:
+            result.shm_name, result.snapshot_size = _write_shared_snapshot(menu_result)
+        elif snapshot_dir is not None:
+            result.snapshot_file = os.path.join(snapshot_dir, snapshot_filename(job.organization_id))
+            result.snapshot_size = write_snapshot(menu_result, result.snapshot_file)
+        result.success = True
+    except Exception as e:
+        result.error = _error_message(e)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def fetch_raw_nomenclature(client, token, organization_id, start_revision=0):
+    """
+    Загружает меню организации, не распаковывая и не разбирая ответ
+
+    Args:
+        client (IikoClient): Клиент iiko API
+        token (str | TokenManager): Токен доступа
+        organization_id (str): ID организации
+        start_revision (int): Начальная ревизия
+
+    Returns:
+        MenuJob: Тело ответа для MenuWorkerPool
+
+    Raises:
+        requests.exceptions.RequestException: При ошибке сети или HTTP
+    """
+    payload = _nomenclature_payload(organization_id, start_revision)
+    with client.send_stream("nomenclature", payload, token) as response:
+        body = response.raw.read(decode_content=False)
+        return MenuJob(organization_id, body, response.headers.get('Content-Encoding'))
+
+
+class MenuWorkerPool:
+    """
+    Пул процессов для разбора меню многих организаций
+
+    Распаковка, разбор JSON и построение снимка меню выполняются в рабочих
+    процессах, поэтому используют все ядра, а не одно под GIL. Рабочим
+    процессам передаются тела ответов в том виде, в каком они пришли по
+    сети (сжатые меньше в несколько раз), а обратно возвращается MenuResult
+    со счетчиками и снимком меню в файле или в разделяемой памяти; ответ
+    меню целиком между процессами не копируется.
+
+    Args:
+        processes (int): Количество рабочих процессов (по умолчанию число ядер)
+        snapshot_dir (str): Папка для файлов снимков (None - файлы не создаются)
+        shared_memory (bool): Передавать снимки в разделяемой памяти вместо файлов
+        json_codec (str): Реализация JSON ("json", "orjson" или None - самая быстрая)
+        handler (callable): Дополнительная обработка меню в рабочем процессе,
+            handler(organization_id, menu_result); должна быть функцией уровня модуля
+        mp_context: Контекст multiprocessing (по умолчанию системный)
+    """
+
+    def __init__(self, processes=None, snapshot_dir=None, shared_memory=False, json_codec=None, handler=None,
+                 mp_context=None):
+        if snapshot_dir is not None:
+            os.makedirs(snapshot_dir, exist_ok=True)
+        if shared_memory:
+            # Общий трекер ресурсов: сегменты рабочих процессов не удаляются при их завершении
+            resource_tracker.ensure_running()
+
+        self.processes = processes or os.cpu_count() or 1
+        self._process = functools.partial(process_menu, snapshot_dir=snapshot_dir, shared_memory=shared_memory,
+                                          json_codec=get_json_codec(json_codec).name, handler=handler)
+        self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=mp_context)
+
+    def close(self):
+        """Дожидается обработки отправленных меню и завершает рабочие процессы"""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, job):
+        """
+        Отправляет меню на обработку
+
+        Args:
+            job (MenuJob): Ответ nomenclature
+
+        Returns:
+            concurrent.futures.Future: Future с MenuResult
+        """
+        return self._executor.submit(self._process, job)
+
+    def process(self, jobs, max_pending=None):
+        """
+        Обрабатывает меню и возвращает результаты по мере готовности
+
+        Args:
+            jobs (iterable): MenuJob; читаются по мере освобождения процессов
+            max_pending (int): Максимум меню в обработке и в очереди
+                (по умолчанию вдвое больше числа процессов)
+
+        Yields:
+            MenuResult: Результаты в порядке завершения
+        """
+        max_pending = max_pending or 2 * self.processes
+        jobs = iter(jobs)
+        pending = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                else:
+                    pending.add(self.submit(job))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    def nomenclature_operation(self, start_revision=0):
+        """
+        Создает операцию для FanOutEngine.run: загрузка меню в потоке и разбор в пуле процессов
+
+        Поток движка только загружает ответ и сразу берется за следующую
+        организацию, пока меню разбирается в рабочем процессе.
+
+        Args:
+            start_revision (int): Начальная ревизия
+
+        Returns:
+            callable: operation(client, token, organization_id) -> Future с MenuResult
+        """
+        def operation(client, token, organization_id):
+            return self.submit(fetch_raw_nomenclature(client, token, organization_id, start_revision))
+
+        return operation
+
+    def sync(self, engine, start_revision=0, deadline=None):
+        """
+        Загружает и обрабатывает меню всех организаций FanOutEngine
+
+        Args:
+            engine (FanOutEngine): Клиенты iiko и их организации
+            start_revision (int): Начальная ревизия
+            deadline (float): Ограничение времени в секундах (только для загрузки)
+
+        Returns:
+            FanOutReport: MenuResult для каждой организации
+        """
+        started = time.perf_counter()
+        report = engine.run(self.nomenclature_operation(start_revision), deadline=deadline)
+        for task in report.succeeded:
+            task.value = task.value.result()
+            if not task.value.success:
+                task.success = False
+                task.error = f"Ошибка разбора меню: {task.value.error}"
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Полная загрузка меню организаций в снимки на всех ядрах")
+    parser.add_argument("--api-login", action="append", required=True, help="API логин (можно несколько)")
+    parser.add_argument("--snapshot-dir", default="snapshots", help="папка для снимков меню")
+    parser.add_argument("--processes", type=int, help="рабочих процессов (по умолчанию число ядер)")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="одновременных запросов")
+    parser.add_argument("--per-tenant-concurrency", type=int, default=DEFAULT_PER_TENANT_CONCURRENCY,
+                        help="одновременных запросов одного apiLogin")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--json-codec", choices=("json", "orjson"), help="реализация JSON (по умолчанию самая быстрая)")
+    parser.add_argument("--deadline", type=float, help="ограничение времени в секундах")
+    args = parser.parse_args(argv)
+
+    with MenuWorkerPool(args.processes, args.snapshot_dir, json_codec=args.json_codec) as pool:
+        with IikoClient(args.base_url, pool_maxsize=args.max_workers) as client:
+            engine = FanOutEngine(args.api_login, client, args.max_workers, args.per_tenant_concurrency)
+            report = pool.sync(engine, deadline=args.deadline)
+
+    report.print_summary()
+    products = sum(result.value.counts.get('products', 0) for result in report.succeeded)
+    print(f"Продуктов: {products}, снимки в папке {args.snapshot_dir}")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
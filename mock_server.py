@@ -0,0 +1,474 @@
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# Ответы меньше этого размера отправляются без сжатия
+COMPRESS_MIN_SIZE = 1024
+
+
+def _stable_id(kind, index):
+    """Детерминированный UUID, чтобы меню не менялось между запусками"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"iiko-mock/{kind}/{index}"))
+
+
+def build_mock_menu(menu_size, revision=1):
+    """
+    Формирует номенклатуру в формате ответа /api/1/nomenclature
+
+    Args:
+        menu_size (int): Количество продуктов
+        revision (int): Ревизия меню
+
+    Returns:
+        dict: Меню с группами, категориями, продуктами и размерами
+    """
+    group_count = max(menu_size // 20, 1)
+    sizes = [
+        {"id": _stable_id("size", i), "name": name, "priority": i, "isDefault": i == 0}
+        for i, name in enumerate(("S", "M", "L"))
+    ]
+    groups = [
+        {
+            "id": _stable_id("group", i),
+            "name": f"Группа {i + 1}",
+            "parentGroup": None,
+            "isDeleted": False
+        }
+        for i in range(group_count)
+    ]
+    categories = [
+        {"id": _stable_id("category", i), "name": f"Категория {i + 1}", "isDeleted": False}
+        for i in range(5)
+    ]
+
+    products = []
+    for i in range(menu_size):
+        # Каждый третий продукт продается в трех размерах, остальные без размера
+        if i % 3 == 0:
+            size_prices = [
+                {
+                    "sizeId": size["id"],
+                    "price": {"currentPrice": 100 + i % 500 + 50 * n, "isIncludedInMenu": True}
+                }
+                for n, size in enumerate(sizes)
+            ]
+        else:
+            size_prices = [{"sizeId": None, "price": {"currentPrice": 100 + i % 500, "isIncludedInMenu": True}}]
+
+        products.append({
+            "id": _stable_id("product", i),
+            "code": f"{i + 1:05d}",
+            "name": f"Блюдо {i + 1}",
+            "description": "",
+            "type": "Dish",
+            "orderItemType": "Product",
+            "parentGroup": groups[i % group_count]["id"],
+            "productCategoryId": categories[i % len(categories)]["id"],
+            "isDeleted": False,
+            "sizePrices": size_prices,
+            "modifiers": [],
+            "groupModifiers": []
+        })
+
+    return {
+        "correlationId": None,
+        "groups": groups,
+        "productCategories": categories,
+        "products": products,
+        "sizes": sizes,
+        "revision": revision
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    # Очередь соединений по умолчанию (5) переполняется при нагрузочном тесте:
+    # отброшенные SYN повторяются через ~1 с, и тест измеряет очередь сервера, а не клиент
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело пишутся отдельно, без TCP_NODELAY ответ задерживается на ~40 мс
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.mock.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _reply(self, status, data, headers=None):
+        mock = self.server.mock
+        if data is mock.menu_body and "gzip" in self.headers.get("Accept-Encoding", "") and mock.compression:
+            # Меню не меняется, поэтому сжимается один раз
+            body = mock.menu_body_gzip
+            headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+        else:
+            body = data if isinstance(data, bytes) else json.dumps(data, ensure_ascii=False).encode('utf-8')
+            if (mock.compression and len(body) >= COMPRESS_MIN_SIZE
+                    and "gzip" in self.headers.get("Accept-Encoding", "")):
+                body = gzip.compress(body, compresslevel=6)
+                headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        mock = self.server.mock
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = self.rfile.read(length)
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            payload = json.loads(body or b"{}")
+        except (ValueError, OSError, EOFError):
+            return self._reply(400, {"errorDescription": "Некорректный JSON"})
+
+        mock.simulate_latency()
+
+        if mock.should_fail():
+            return self._reply(mock.error_status, {"errorDescription": "Искусственная ошибка"},
+                               {"Retry-After": "0"})
+
+        failure = mock.next_failure()
+        if failure is not None:
+            status, headers = failure
+            return self._reply(status, {"errorDescription": "Заданная ошибка"}, headers)
+
+        path = self.path
+        if path.startswith(mock.prefix):
+            path = path[len(mock.prefix):]
+
+        handler = mock.routes.get(path)
+        if handler is None:
+            return self._reply(404, {"errorDescription": f"Метод {path} не найден"})
+
+        if path != "access_token" and not mock.check_token(self.headers.get("Authorization")):
+            return self._reply(401, {"errorDescription": "Unauthorized"})
+
+        status, data = handler(payload)
+        self._reply(status, data)
+
+
+class MockIikoServer:
+    """
+    Локальная замена iiko Cloud API для тестов и замеров производительности
+
+    Реализует методы, используемые iiko_api: access_token, organizations,
+    nomenclature, terminal_groups, order/create, order/by_id и
+    reserve/available_restaurant_sections.
+
+    Args:
+        host (str): Адрес для прослушивания
+        port (int): Порт (0 - выбрать свободный)
+        latency (float): Задержка ответа в секундах
+        latency_jitter (float): Случайная добавка к задержке в секундах
+        error_rate (float): Доля запросов, завершающихся ошибкой (0..1)
+        error_status (int): Код ответа для искусственных ошибок
+        menu_size (int): Количество продуктов в меню
+        organization_count (int): Количество организаций
+        order_completion_delay (float): Через сколько секунд заказ получает статус Success
+        webhook_url (str): Адрес, на который отправляется событие DeliveryOrderUpdate,
+            когда заказ получает статус Success
+        webhook_token (str): Значение заголовка Authorization для webhook
+        compression (bool): Сжимать ответы gzip, если клиент их принимает (как iiko)
+        verbose (bool): Выводить журнал запросов
+    """
+
+    prefix = "/api/1/"
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, latency_jitter=0.0, error_rate=0.0,
+                 error_status=500, menu_size=1000, organization_count=1, order_completion_delay=0.0,
+                 webhook_url=None, webhook_token=None, compression=True, verbose=False):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.order_completion_delay = order_completion_delay
+        self.webhook_url = webhook_url
+        self.webhook_token = webhook_token
+        self.verbose = verbose
+
+        self.organizations = [
+            {"id": _stable_id("organization", i), "name": f"Ресторан {i + 1}"}
+            for i in range(organization_count)
+        ]
+        self.terminal_groups = {
+            organization["id"]: [{
+                "id": _stable_id("terminal-group", i),
+                "organizationId": organization["id"],
+                "name": f"Касса {i + 1}",
+                "address": f"ул. Тестовая, {i + 1}"
+            }]
+            for i, organization in enumerate(self.organizations)
+        }
+        self.compression = compression
+        self.menu_body = json.dumps(build_mock_menu(menu_size), ensure_ascii=False).encode('utf-8')
+        self.menu_body_gzip = gzip.compress(self.menu_body, compresslevel=6) if compression else None
+        self.sections_revision = 1
+
+        self._tokens = set()
+        self._failures = []
+        self.token_count = 0
+        self._orders = {}
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self.request_count = 0
+
+        self.routes = {
+            "access_token": self._access_token,
+            "organizations": self._organizations,
+            "nomenclature": self._nomenclature,
+            "terminal_groups": self._terminal_groups,
+            "order/create": self._order_create,
+            "order/by_id": self._order_by_id,
+            "reserve/available_restaurant_sections": self._restaurant_sections
+        }
+
+        self._server = _Server((host, port), _Handler)
+        self._server.mock = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """Базовый URL для IikoClient(base_url=...)"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def start(self):
+        """Запускает сервер в фоновом потоке"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-iiko", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def serve_forever(self):
+        """Запускает сервер в текущем потоке"""
+        self._server.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def simulate_latency(self):
+        delay = self.latency
+        if self.latency_jitter:
+            delay += self._random.uniform(0, self.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def should_fail(self):
+        with self._lock:
+            self.request_count += 1
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def fail_next(self, count, status=429, retry_after=None):
+        """
+        Отвечает ошибкой на следующие count запросов
+
+        Args:
+            count (int): Количество запросов
+            status (int): Код ответа
+            retry_after (float): Значение заголовка Retry-After (None - без заголовка)
+        """
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        with self._lock:
+            self._failures.extend([(status, headers)] * count)
+
+    def next_failure(self):
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def expire_tokens(self):
+        """Отзывает выданные токены: запросы с ними получают 401"""
+        with self._lock:
+            self._tokens.clear()
+
+    def check_token(self, authorization):
+        if not authorization or not authorization.startswith("Bearer "):
+            return False
+        return authorization[len("Bearer "):] in self._tokens
+
+    def _access_token(self, payload):
+        if not payload.get("apiLogin"):
+            return 400, {"errorDescription": "apiLogin не указан"}
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._tokens.add(token)
+            self.token_count += 1
+        return 200, {"correlationId": str(uuid.uuid4()), "token": token}
+
+    def _organizations(self, payload):
+        organization_ids = payload.get("organizationIds")
+        organizations = [
+            organization for organization in self.organizations
+            if not organization_ids or organization["id"] in organization_ids
+        ]
+        return 200, {"correlationId": str(uuid.uuid4()), "organizations": organizations}
+
+    def _nomenclature(self, payload):
+        return 200, self.menu_body
+
+    def _terminal_groups(self, payload):
+        terminal_groups = [
+            {"organizationId": organization_id, "items": self.terminal_groups.get(organization_id, [])}
+            for organization_id in payload.get("organizationIds") or []
+        ]
+        return 200, {"correlationId": str(uuid.uuid4()), "terminalGroups": terminal_groups}
+
+    def _order_create(self, payload):
+        order = payload.get("order") or {}
+        order_id = order.get("id") or str(uuid.uuid4())
+        with self._lock:
+            if order_id in self._orders:
+                return 400, {"errorDescription": f"Заказ {order_id} уже существует"}
+            self._orders[order_id] = {
+                "number": len(self._orders) + 1,
+                "organizationId": payload.get("organizationId"),
+                "created": time.monotonic(),
+                "order": order
+            }
+            order_info = self._order_info(order_id)
+
+        if self.webhook_url:
+            timer = threading.Timer(self.order_completion_delay, self._push_order_event, (order_id,))
+            timer.daemon = True
+            timer.start()
+        return 200, {"correlationId": str(uuid.uuid4()), "orderInfo": order_info}
+
+    def _push_order_event(self, order_id):
+        with self._lock:
+            order_info = self._order_info(order_id)
+        event = {
+            "eventType": "DeliveryOrderUpdate",
+            "eventTime": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "organizationId": order_info["organizationId"],
+            "correlationId": str(uuid.uuid4()),
+            "eventInfo": order_info
+        }
+        request = urllib.request.Request(
+            self.webhook_url,
+            data=json.dumps([event], ensure_ascii=False).encode('utf-8'),
+            headers={"Content-Type": "application/json", "Authorization": self.webhook_token or ""}
+        )
+        try:
+            urllib.request.urlopen(request, timeout=10).close()
+        except OSError as e:
+            if self.verbose:
+                print(f"Ошибка отправки webhook: {e}")
+
+    def _order_info(self, order_id):
+        stored = self._orders[order_id]
+        done = time.monotonic() - stored["created"] >= self.order_completion_delay
+        order = stored["order"]
+        info = {
+            "id": order_id,
+            "posId": None,
+            "externalNumber": order.get("externalNumber"),
+            "organizationId": stored["organizationId"],
+            "creationStatus": "Success" if done else "InProgress",
+            "errorInfo": None,
+            "order": None
+        }
+        if done:
+            total = sum(item.get("price", 0) * item.get("amount", 1) for item in order.get("items") or [])
+            info["order"] = {
+                "number": stored["number"],
+                "status": "New",
+                "sum": total,
+                "items": [dict(item, status="Added") for item in order.get("items") or []],
+                "payments": order.get("payments") or [],
+                "customer": order.get("customer")
+            }
+        return info
+
+    def _order_by_id(self, payload):
+        with self._lock:
+            orders = [
+                self._order_info(order_id)
+                for order_id in payload.get("orderIds") or []
+                if order_id in self._orders
+            ]
+        return 200, {"correlationId": str(uuid.uuid4()), "orders": orders}
+
+    def _restaurant_sections(self, payload):
+        sections = []
+        if payload.get("revision") != self.sections_revision:
+            for i, terminal_group_id in enumerate(payload.get("terminalGroupIds") or []):
+                sections.append({
+                    "id": _stable_id("section", i),
+                    "terminalGroupId": terminal_group_id,
+                    "name": f"Зал {i + 1}",
+                    "tables": [
+                        {
+                            "id": _stable_id(f"table-{i}", n),
+                            "number": n + 1,
+                            "name": f"Стол {n + 1}",
+                            "seatingCapacity": 2 + n % 4 * 2,
+                            "revision": self.sections_revision,
+                            "isDeleted": False
+                        }
+                        for n in range(10)
+                    ]
+                })
+        return 200, {
+            "correlationId": str(uuid.uuid4()),
+            "restaurantSections": sections,
+            "revision": self.sections_revision
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный mock-сервер iiko Cloud API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа в секундах")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="случайная добавка к задержке")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ошибочных ответов (0..1)")
+    parser.add_argument("--error-status", type=int, default=500, help="код ответа для ошибок")
+    parser.add_argument("--menu-size", type=int, default=1000, help="количество продуктов в меню")
+    parser.add_argument("--organizations", type=int, default=1, help="количество организаций")
+    parser.add_argument("--no-compression", action="store_true", help="не сжимать ответы")
+    parser.add_argument("--verbose", action="store_true", help="выводить журнал запросов")
+    args = parser.parse_args()
+
+    server = MockIikoServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        menu_size=args.menu_size,
+        organization_count=args.organizations,
+        compression=not args.no_compression,
+        verbose=args.verbose
+    )
+    print(f"Mock iiko API: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from iiko_api import get_default_client, IikoApiError, _create_order_payload
+
+
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+class OrderResult:
+    """
+    Результат создания одного заказа из пакета
+
+    Attributes:
+        index (int): Позиция заказа во входной последовательности
+        order_id (str): ID заказа
+        success (bool): Заказ принят iiko
+        response (dict): Ответ от API (если он получен)
+        error (str): Описание ошибки (если заказ не создан)
+    """
+    __slots__ = ("index", "order_id", "success", "response", "error")
+
+    def __init__(self, index, order_id, success, response=None, error=None):
+        self.index = index
+        self.order_id = order_id
+        self.success = success
+        self.response = response
+        self.error = error
+
+    def __repr__(self):
+        status = "ok" if self.success else f"error={self.error!r}"
+        return f"OrderResult(index={self.index}, order_id={self.order_id!r}, {status})"
+
+
+def _error_message(error):
+    if isinstance(error, IikoApiError) and isinstance(error.details, dict):
+        description = error.details.get('errorDescription') or error.details.get('description')
+        if description:
+            return f"{error}: {description}"
+    return str(error)
+
+
+def _submit_order(client, token, index, organization_id, terminal_group_id, order_data, settings):
+    order_id = order_data.get('id')
+    payload = _create_order_payload(organization_id, terminal_group_id, order_data, settings)
+
+    try:
+        response = client.call("order/create", payload, token)
+    except (IikoApiError, requests.exceptions.RequestException) as e:
+        return OrderResult(index, order_id, False, error=_error_message(e))
+
+    order_info = response.get('orderInfo') or {}
+    if order_info.get('creationStatus') == 'Error':
+        error_info = order_info.get('errorInfo') or {}
+        return OrderResult(index, order_id, False, response,
+                           error_info.get('message', 'Неизвестная ошибка'))
+
+    return OrderResult(index, order_id, True, response)
+
+
+def create_orders(token, organization_id, terminal_group_id, orders, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                  settings=None, client=None):
+    """
+    Создает пакет заказов параллельно с ограничением числа одновременных запросов
+
+    В отличие от create_order, данные заказов не выводятся в консоль.
+    Чтобы соединения переиспользовались, pool_maxsize клиента должен быть
+    не меньше max_in_flight.
+
+    Args:
+        token (str | TokenManager): Токен доступа
+        organization_id (str): ID организации
+        terminal_group_id (str): ID группы терминалов
+        orders (iterable): Данные заказов (например, из build_simple_order)
+        max_in_flight (int): Максимум одновременно отправляемых заказов
+        settings (dict): Настройки создания заказа
+        client (IikoClient): Клиент iiko API (по умолчанию общий)
+
+    Returns:
+        list: OrderResult для каждого заказа в порядке входной последовательности
+    """
+    client = client or get_default_client()
+    slots = threading.BoundedSemaphore(max_in_flight)
+    futures = []
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        # Заказы читаются из итератора по мере освобождения слотов,
+        # поэтому длинный генератор не загружается в память целиком
+        for index, order_data in enumerate(orders):
+            slots.acquire()
+            try:
+                future = executor.submit(
+                    _submit_order, client, token, index,
+                    organization_id, terminal_group_id, order_data, settings
+                )
+            except BaseException:
+                slots.release()
+                raise
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+
+    return [future.result() for future in futures]
@@ -0,0 +1,309 @@
+import threading
+import time
+from collections import OrderedDict
+
+from iiko_api import get_default_client
+from order_tracker import DEFAULT_MAX_BATCH_SIZE
+
+
+DEFAULT_MAX_ORDERS = 10000
+DEFAULT_MAX_CLOSED = 10000
+
+# Статусы заказа (доставки и заказа на стол), после которых заказ больше не меняется
+CLOSED_ORDER_STATUSES = frozenset(("Closed", "Cancelled", "Deleted"))
+
+# Поля позиции и платежа, изменения которых попадают в поток
+ITEM_FIELDS = ("productId", "productSizeId", "amount", "price", "cost", "status")
+PAYMENT_FIELDS = ("sum", "isPreliminary", "isProcessedExternally")
+
+NEW = "new"
+CHANGED = "changed"
+CLOSED = "closed"
+
+
+class OrderChange:
+    """
+    Изменение заказа между двумя ответами order/by_id
+
+    Attributes:
+        order_id (str): ID заказа
+        organization_id (str): ID организации
+        kind (str): new - заказ встретился впервые, changed - заказ изменился,
+            closed - заказ закрыт, отменен или не создан
+        changes (list): Кортежи (field, old, new). Для позиций и платежей поле
+            имеет вид items[<ключ>].amount; добавленная позиция - (items[<ключ>], None, позиция),
+            удаленная - (items[<ключ>], позиция, None)
+        order (dict): Данные заказа из ответа
+    """
+    __slots__ = ("order_id", "organization_id", "kind", "changes", "order")
+
+    def __init__(self, order_id, organization_id, kind, changes, order):
+        self.order_id = order_id
+        self.organization_id = organization_id
+        self.kind = kind
+        self.changes = changes
+        self.order = order
+
+    def to_dict(self):
+        """Изменение в виде словаря для JSON (без данных заказа)"""
+        return {
+            "orderId": self.order_id,
+            "organizationId": self.organization_id,
+            "kind": self.kind,
+            "changes": [{"field": field, "old": old, "new": new} for field, old, new in self.changes]
+        }
+
+    def __repr__(self):
+        return f"OrderChange(order_id={self.order_id!r}, kind={self.kind!r}, changes={len(self.changes)})"
+
+
+class _OrderState:
+    """Последнее известное состояние заказа в сжатом виде"""
+    __slots__ = ("scalars", "items", "payments")
+
+    def __init__(self, scalars, items, payments):
+        self.scalars = scalars
+        self.items = items
+        self.payments = payments
+
+    def __eq__(self, other):
+        return (self.scalars == other.scalars and self.items == other.items
+                and self.payments == other.payments)
+
+
+# Отслеживаемые поля верхнего уровня: (имя в потоке, функция получения значения)
+_SCALAR_FIELDS = (
+    ("creationStatus", lambda order, details: order.get('creationStatus')),
+    ("errorInfo", lambda order, details: (order.get('errorInfo') or {}).get('message')),
+    ("number", lambda order, details: details.get('number')),
+    ("status", lambda order, details: details.get('status')),
+    ("sum", lambda order, details: details.get('sum')),
+)
+
+
+def _item_fields(item):
+    product_id = item.get('productId') or (item.get('product') or {}).get('id')
+    size_id = item.get('productSizeId') or (item.get('size') or {}).get('id')
+    return (product_id, size_id, item.get('amount'), item.get('price'), item.get('cost'), item.get('status'))
+
+
+def _payment_fields(payment):
+    return (payment.get('sum'), payment.get('isPreliminary'), payment.get('isProcessedExternally'))
+
+
+def _keyed(entries, key_function, fields_function):
+    # Ключи позиций стабильны между ответами (positionId), а при их отсутствии
+    # одинаковые ключи различаются порядковым номером
+    result = []
+    seen = {}
+    for index, entry in enumerate(entries or []):
+        key = key_function(entry, index)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        if count:
+            key = f"{key}#{count}"
+        result.append((key, fields_function(entry)))
+    return tuple(result)
+
+
+def _item_key(item, index):
+    return item.get('positionId') or f"#{index}"
+
+
+def _payment_key(payment, index):
+    payment_type = payment.get('paymentType') or {}
+    return payment_type.get('id') or payment.get('paymentTypeId') or payment_type.get('kind') or f"#{index}"
+
+
+def _state(order):
+    details = order.get('order') or {}
+    return _OrderState(
+        tuple(getter(order, details) for _, getter in _SCALAR_FIELDS),
+        _keyed(details.get('items'), _item_key, _item_fields),
+        _keyed(details.get('payments'), _payment_key, _payment_fields)
+    )
+
+
+def _diff_entries(prefix, old_entries, new_entries, field_names):
+    changes = []
+    if old_entries == new_entries:
+        return changes
+
+    old_by_key = dict(old_entries)
+    new_by_key = dict(new_entries)
+    for key, new_fields in new_entries:
+        old_fields = old_by_key.get(key)
+        if old_fields is None:
+            changes.append((f"{prefix}[{key}]", None, dict(zip(field_names, new_fields))))
+        elif old_fields != new_fields:
+            for name, old, new in zip(field_names, old_fields, new_fields):
+                if old != new:
+                    changes.append((f"{prefix}[{key}].{name}", old, new))
+    for key, old_fields in old_entries:
+        if key not in new_by_key:
+            changes.append((f"{prefix}[{key}]", dict(zip(field_names, old_fields)), None))
+    return changes
+
+
+def _diff(old, new):
+    changes = []
+    if old.scalars != new.scalars:
+        for (name, _), old_value, new_value in zip(_SCALAR_FIELDS, old.scalars, new.scalars):
+            if old_value != new_value:
+                changes.append((name, old_value, new_value))
+    changes.extend(_diff_entries("items", old.items, new.items, ITEM_FIELDS))
+    changes.extend(_diff_entries("payments", old.payments, new.payments, PAYMENT_FIELDS))
+    return changes
+
+
+def is_closed(order):
+    """
+    Проверяет, что заказ больше не изменится
+
+    Args:
+        order (dict): Данные заказа из order/by_id
+
+    Returns:
+        bool: True для закрытых, отмененных и не созданных заказов
+    """
+    if order.get('creationStatus') == 'Error':
+        return True
+    return (order.get('order') or {}).get('status') in CLOSED_ORDER_STATUSES
+
+
+class OrderChangeStream:
+    """
+    Превращает повторяющиеся ответы order/by_id в поток изменений заказов
+
+    Для каждого заказа хранится только сжатое последнее состояние: статусы,
+    сумма, позиции и платежи в виде кортежей. Ответ, в котором заказ не
+    изменился, не порождает событий. Состояния хранятся в LRU не больше
+    max_orders штук; закрытые заказы удаляются сразу, а их ID запоминаются
+    (не больше max_closed), чтобы повторные ответы не выдавались как новые заказы.
+
+    Args:
+        max_orders (int): Максимум отслеживаемых заказов
+        max_closed (int): Сколько ID закрытых заказов помнить
+        emit_new (bool): Выдавать событие new при первом появлении заказа
+    """
+
+    def __init__(self, max_orders=DEFAULT_MAX_ORDERS, max_closed=DEFAULT_MAX_CLOSED, emit_new=True):
+        self.max_orders = max_orders
+        self.max_closed = max_closed
+        self.emit_new = emit_new
+
+        self.evicted_count = 0
+        self._states = OrderedDict()
+        self._closed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def __contains__(self, order_id):
+        return order_id in self._states
+
+    def update(self, order):
+        """
+        Сравнивает заказ с последним известным состоянием
+
+        Args:
+            order (dict): Данные заказа из order/by_id или webhook
+
+        Returns:
+            OrderChange: Изменение или None, если заказ не изменился
+        """
+        order_id = order.get('id')
+        if not order_id:
+            return None
+        state = _state(order)
+        closed = is_closed(order)
+
+        with self._lock:
+            if order_id in self._closed:
+                return None
+            previous = self._states.get(order_id)
+
+            if closed:
+                self._states.pop(order_id, None)
+                self._closed[order_id] = True
+                if len(self._closed) > self.max_closed:
+                    self._closed.popitem(last=False)
+            else:
+                self._states[order_id] = state
+                self._states.move_to_end(order_id)
+                if len(self._states) > self.max_orders:
+                    self._states.popitem(last=False)
+                    self.evicted_count += 1
+
+        if previous is None:
+            if not (self.emit_new or closed):
+                return None
+            changes = _diff(_EMPTY_STATE, state)
+            kind = CLOSED if closed else NEW
+        else:
+            if not closed and previous == state:
+                return None
+            changes = _diff(previous, state)
+            kind = CLOSED if closed else CHANGED
+
+        return OrderChange(order_id, order.get('organizationId'), kind, changes, order)
+
+    def feed(self, orders):
+        """
+        Обрабатывает список заказов или ответ get_order_by_id
+
+        Args:
+            orders (dict | list): Ответ get_order_by_id или список заказов
+
+        Yields:
+            OrderChange: Изменения заказов в порядке ответа
+        """
+        if isinstance(orders, dict):
+            orders = orders.get('orders') or []
+        for order in orders:
+            change = self.update(order)
+            if change is not None:
+                yield change
+
+    def forget(self, order_id):
+        """Удаляет состояние заказа без события"""
+        with self._lock:
+            self._states.pop(order_id, None)
+
+    def watch(self, token, order_ids, organization_ids, client=None, interval=5.0, stop_when_closed=True):
+        """
+        Опрашивает заказы через order/by_id и выдает только их изменения
+
+        Args:
+            token (str | TokenManager): Токен доступа
+            order_ids (list): ID заказов
+            organization_ids (list): ID организаций заказов
+            client (IikoClient): Клиент iiko API (по умолчанию общий)
+            interval (float): Интервал опроса в секундах
+            stop_when_closed (bool): Завершиться, когда все заказы закрыты
+
+        Yields:
+            OrderChange: Изменения заказов
+        """
+        client = client or get_default_client()
+        pending = list(order_ids)
+
+        while pending:
+            started = time.monotonic()
+            for start in range(0, len(pending), DEFAULT_MAX_BATCH_SIZE):
+                result = client.get_order_by_id(
+                    token,
+                    order_ids=pending[start:start + DEFAULT_MAX_BATCH_SIZE],
+                    organization_ids=organization_ids
+                )
+                if result:
+                    yield from self.feed(result)
+
+            if stop_when_closed:
+                pending = [order_id for order_id in pending if order_id not in self._closed]
+            if pending:
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+_EMPTY_STATE = _OrderState(tuple(None for _ in _SCALAR_FIELDS), (), ())
@@ -0,0 +1,464 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from iiko_api import get_default_client, IikoApiError, _create_order_payload
+from order_batch import _error_message
+from transport import RetryPolicy
+
+
+DEFAULT_QUEUE_FILE = "iiko_orders.sqlite3"
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_ATTEMPTS = 10
+
+PENDING = "pending"
+SENDING = "sending"
+ACKED = "acked"
+FAILED = "failed"
+
+# Ответы, после которых заказ отправляется повторно; для остальных 4xx повтор не поможет
+_RETRY_STATUSES = frozenset((401, 408, 429))
+# Ответы, после которых неизвестно, создан ли заказ
+_UNCERTAIN_STATUSES = frozenset((408,))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id TEXT PRIMARY KEY,
+    organization_id TEXT NOT NULL,
+    terminal_group_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    uncertain INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT,
+    response TEXT
+)
+"""
+
+
+class QueuedOrder:
+    """
+    Заказ в очереди отправки
+
+    Attributes:
+        order_id (str): ID заказа
+        organization_id (str): ID организации
+        terminal_group_id (str): ID группы терминалов
+        state (str): pending - ожидает отправки, sending - отправляется,
+            acked - принят iiko, failed - отклонен или исчерпаны попытки
+        attempts (int): Количество попыток отправки
+        last_error (str): Описание последней ошибки
+        response (dict): orderInfo из ответа iiko (для принятых заказов)
+        created_at (float): Время постановки в очередь (unix time)
+        updated_at (float): Время последнего изменения состояния (unix time)
+    """
+    __slots__ = ("order_id", "organization_id", "terminal_group_id", "state", "attempts",
+                 "last_error", "response", "created_at", "updated_at")
+
+    def __init__(self, order_id, organization_id, terminal_group_id, state, attempts,
+                 last_error, response, created_at, updated_at):
+        self.order_id = order_id
+        self.organization_id = organization_id
+        self.terminal_group_id = terminal_group_id
+        self.state = state
+        self.attempts = attempts
+        self.last_error = last_error
+        self.response = response
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def __repr__(self):
+        return f"QueuedOrder(order_id={self.order_id!r}, state={self.state!r}, attempts={self.attempts})"
+
+
+class _Claimed:
+    __slots__ = ("order_id", "organization_id", "payload", "attempts", "uncertain")
+
+    def __init__(self, order_id, organization_id, payload, attempts, uncertain):
+        self.order_id = order_id
+        self.organization_id = organization_id
+        self.payload = payload
+        self.attempts = attempts
+        self.uncertain = uncertain
+
+
+class OrderQueue:
+    """
+    Очередь исходящих заказов в файле SQLite с фоновой отправкой в iiko
+
+    enqueue() записывает заказ в базу (журнал WAL) и сразу возвращает
+    управление, не дожидаясь iiko. Фоновые потоки отправляют заказы через
+    order/create и отмечают принятые. Повторная отправка использует тот же
+    ID заказа, а если исход прошлой попытки неизвестен (обрыв соединения,
+    ответ 5xx, завершение процесса во время отправки), перед ней заказ
+    ищется через order/by_id, поэтому повтор не создает дубликат.
+
+    Очередь с одним файлом должен разбирать один процесс; ставить заказы
+    в очередь можно из нескольких.
+
+    Args:
+        token (str | TokenManager): Токен доступа
+        path (str): Путь к файлу базы
+        client (IikoClient): Клиент iiko API (по умолчанию общий)
+        workers (int): Количество одновременно отправляемых заказов
+        max_attempts (int): Максимум попыток, после которого заказ отмечается failed
+        retry_policy (RetryPolicy): Задержки между попытками
+        synchronous (str): Режим PRAGMA synchronous (FULL переживает и отключение питания)
+        on_result (callable): Функция on_result(QueuedOrder), вызываемая, когда
+            заказ принят или окончательно отклонен
+    """
+
+    def __init__(self, token, path=DEFAULT_QUEUE_FILE, client=None, workers=DEFAULT_WORKERS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, retry_policy=None, synchronous="NORMAL",
+                 on_result=None, timeout=5.0):
+        self.token = token
+        self.path = path
+        self.client = client
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_policy = retry_policy or RetryPolicy(base_delay=1.0, max_delay=60.0)
+        self.synchronous = synchronous
+        self.on_result = on_result
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._stopped = True
+        self._dispatcher = None
+        self._executor = None
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(_SCHEMA)
+        connection.execute("CREATE INDEX IF NOT EXISTS orders_due ON orders (state, next_attempt_at)")
+
+    def _connection(self):
+        # Соединение SQLite нельзя разделять между потоками; транзакции открываются явно
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.connection = connection
+        return connection
+
+    def enqueue(self, organization_id, terminal_group_id, order_data, settings=None):
+        """
+        Записывает заказ в очередь
+
+        Заказ без ID получает новый ID. Повторная постановка заказа с тем же
+        ID ничего не меняет.
+
+        Args:
+            organization_id (str): ID организации
+            terminal_group_id (str): ID группы терминалов
+            order_data (dict): Данные заказа (например, из build_simple_order)
+            settings (dict): Настройки создания заказа
+
+        Returns:
+            str: ID заказа
+        """
+        return self.enqueue_many(organization_id, terminal_group_id, [order_data], settings)[0]
+
+    def enqueue_many(self, organization_id, terminal_group_id, orders, settings=None):
+        """
+        Записывает несколько заказов в очередь одной транзакцией
+
+        Args:
+            organization_id (str): ID организации
+            terminal_group_id (str): ID группы терминалов
+            orders (iterable): Данные заказов
+            settings (dict): Настройки создания заказа
+
+        Returns:
+            list: ID заказов
+        """
+        now = time.time()
+        rows = []
+        for order_data in orders:
+            if not order_data.get('id'):
+                order_data = dict(order_data, id=str(uuid.uuid4()))
+            payload = _create_order_payload(organization_id, terminal_group_id, order_data, settings)
+            rows.append((order_data['id'], organization_id, terminal_group_id,
+                         json.dumps(payload, ensure_ascii=False), PENDING, now, now, now))
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT OR IGNORE INTO orders (order_id, organization_id, terminal_group_id, payload, state, "
+                "next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        with self._condition:
+            self._condition.notify_all()
+        return [row[0] for row in rows]
+
+    def get(self, order_id):
+        """
+        Возвращает состояние заказа
+
+        Returns:
+            QueuedOrder: Заказ или None
+        """
+        row = self._connection().execute(
+            "SELECT order_id, organization_id, terminal_group_id, state, attempts, last_error, response, "
+            "created_at, updated_at FROM orders WHERE order_id = ?", (order_id,)
+        ).fetchone()
+        return _queued_order(row) if row else None
+
+    def counts(self):
+        """
+        Возвращает количество заказов в каждом состоянии
+
+        Returns:
+            dict: {state: count}
+        """
+        counts = {PENDING: 0, SENDING: 0, ACKED: 0, FAILED: 0}
+        for state, count in self._connection().execute("SELECT state, COUNT(*) FROM orders GROUP BY state"):
+            counts[state] = count
+        return counts
+
+    def failed(self):
+        """Возвращает окончательно не отправленные заказы"""
+        rows = self._connection().execute(
+            "SELECT order_id, organization_id, terminal_group_id, state, attempts, last_error, response, "
+            "created_at, updated_at FROM orders WHERE state = ? ORDER BY created_at", (FAILED,)
+        ).fetchall()
+        return [_queued_order(row) for row in rows]
+
+    def retry_failed(self):
+        """
+        Возвращает отклоненные заказы в очередь (перед отправкой они ищутся через order/by_id)
+
+        Returns:
+            int: Количество заказов
+        """
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE orders SET state = ?, attempts = 0, uncertain = 1, next_attempt_at = ?, updated_at = ? "
+            "WHERE state = ?", (PENDING, now, now, FAILED)
+        )
+        with self._condition:
+            self._condition.notify_all()
+        return cursor.rowcount
+
+    def purge_acked(self, older_than=0.0):
+        """
+        Удаляет принятые заказы
+
+        Args:
+            older_than (float): Удалять заказы, принятые больше стольких секунд назад
+
+        Returns:
+            int: Количество удаленных заказов
+        """
+        cursor = self._connection().execute(
+            "DELETE FROM orders WHERE state = ? AND updated_at <= ?", (ACKED, time.time() - older_than)
+        )
+        return cursor.rowcount
+
+    def start(self):
+        """
+        Запускает фоновую отправку
+
+        Заказы, отправка которых прервалась при прошлом запуске, возвращаются
+        в очередь с проверкой через order/by_id.
+        """
+        with self._condition:
+            if self._dispatcher is not None:
+                return self
+            now = time.time()
+            self._connection().execute(
+                "UPDATE orders SET state = ?, uncertain = 1, next_attempt_at = ?, updated_at = ? WHERE state = ?",
+                (PENDING, now, now, SENDING)
+            )
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="iiko-order-queue")
+            self._dispatcher = threading.Thread(target=self._dispatch, name="iiko-order-queue", daemon=True)
+            self._dispatcher.start()
+        return self
+
+    def stop(self):
+        """Останавливает отправку, дожидаясь заказов, которые уже отправляются"""
+        with self._condition:
+            self._stopped = True
+            dispatcher = self._dispatcher
+            self._dispatcher = None
+            self._condition.notify_all()
+        if dispatcher is not None:
+            dispatcher.join()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def drain(self, timeout=None):
+        """
+        Ждет, пока в очереди не останется заказов, ожидающих отправки
+
+        Args:
+            timeout (float): Максимальное время ожидания в секундах
+
+        Returns:
+            bool: True, если очередь разобрана
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            counts = self.counts()
+            if not counts[PENDING] and not counts[SENDING]:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            with self._condition:
+                self._condition.wait(0.05)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _claim(self, limit):
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT order_id, organization_id, payload, attempts, uncertain FROM orders "
+                "WHERE state = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (PENDING, now, limit)
+            ).fetchall()
+            connection.executemany(
+                "UPDATE orders SET state = ?, attempts = attempts + 1, updated_at = ? WHERE order_id = ?",
+                [(SENDING, now, row[0]) for row in rows]
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return [_Claimed(order_id, organization_id, payload, attempts + 1, bool(uncertain))
+                for order_id, organization_id, payload, attempts, uncertain in rows]
+
+    def _next_due(self):
+        row = self._connection().execute(
+            "SELECT MIN(next_attempt_at) FROM orders WHERE state = ?", (PENDING,)
+        ).fetchone()
+        return row[0]
+
+    def _dispatch(self):
+        while True:
+            with self._condition:
+                while not self._stopped and self._in_flight >= self.workers:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                free = self.workers - self._in_flight
+
+            try:
+                claimed = self._claim(free)
+            except sqlite3.Error as e:
+                print(f"Ошибка чтения очереди заказов: {e}")
+                claimed = []
+
+            if claimed:
+                with self._condition:
+                    self._in_flight += len(claimed)
+                for order in claimed:
+                    self._executor.submit(self._process, order)
+                continue
+
+            # Новых заказов нет: ждем постановки в очередь или срока следующей попытки
+            next_due = self._next_due()
+            delay = 1.0 if next_due is None else min(1.0, max(0.0, next_due - time.time()))
+            with self._condition:
+                if not self._stopped:
+                    self._condition.wait(delay)
+
+    def _process(self, order):
+        try:
+            self._send(order)
+        except Exception as e:
+            self._retry(order, f"Непредвиденная ошибка: {e}", uncertain=True)
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def _lookup(self, client, order):
+        result = client.call("order/by_id", {
+            "organizationIds": [order.organization_id],
+            "orderIds": [order.order_id]
+        }, self.token)
+        for order_info in result.get('orders') or []:
+            if order_info.get('id') == order.order_id:
+                return order_info
+        return None
+
+    def _send(self, order):
+        client = self.client or get_default_client()
+        try:
+            if order.uncertain:
+                order_info = self._lookup(client, order)
+                if order_info is not None:
+                    return self._complete(order, order_info)
+
+            response = client.call("order/create", order.payload.encode('utf-8'), self.token)
+        except IikoApiError as e:
+            if e.status_code >= 500 or e.status_code in _RETRY_STATUSES:
+                return self._retry(order, _error_message(e),
+                                   uncertain=e.status_code >= 500 or e.status_code in _UNCERTAIN_STATUSES)
+            return self._finish(order, FAILED, _error_message(e), None)
+        except requests.exceptions.RequestException as e:
+            return self._retry(order, _error_message(e), uncertain=True)
+
+        self._complete(order, response.get('orderInfo') or {})
+
+    def _complete(self, order, order_info):
+        if order_info.get('creationStatus') == 'Error':
+            error_info = order_info.get('errorInfo') or {}
+            return self._finish(order, FAILED, error_info.get('message', 'Неизвестная ошибка'), order_info)
+        self._finish(order, ACKED, None, order_info)
+
+    def _retry(self, order, error, uncertain):
+        if order.attempts >= self.max_attempts:
+            return self._finish(order, FAILED, f"Исчерпаны попытки отправки: {error}", None)
+        now = time.time()
+        # Однажды неизвестный исход остается неизвестным до проверки через order/by_id
+        self._connection().execute(
+            "UPDATE orders SET state = ?, uncertain = ?, next_attempt_at = ?, updated_at = ?, last_error = ? "
+            "WHERE order_id = ?",
+            (PENDING, int(uncertain or order.uncertain),
+             now + self.retry_policy.backoff(order.attempts - 1), now, error, order.order_id)
+        )
+
+    def _finish(self, order, state, error, order_info):
+        now = time.time()
+        response = json.dumps(order_info, ensure_ascii=False) if order_info is not None else None
+        self._connection().execute(
+            "UPDATE orders SET state = ?, uncertain = 0, updated_at = ?, last_error = ?, response = ? "
+            "WHERE order_id = ?",
+            (state, now, error, response, order.order_id)
+        )
+        if self.on_result is not None:
+            try:
+                self.on_result(self.get(order.order_id))
+            except Exception as e:
+                print(f"Ошибка в обработчике результата заказа {order.order_id}: {e}")
+
+
+def _queued_order(row):
+    order_id, organization_id, terminal_group_id, state, attempts, last_error, response, created_at, updated_at = row
+    return QueuedOrder(order_id, organization_id, terminal_group_id, state, attempts, last_error,
+                       json.loads(response) if response else None, created_at, updated_at)
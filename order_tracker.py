@@ -0,0 +1,243 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from iiko_api import get_default_client
+
+
+# Статусы creationStatus, после которых заказ больше не меняется
+FINAL_CREATION_STATUSES = frozenset(("Success", "Error"))
+
+DEFAULT_MAX_BATCH_SIZE = 100
+
+
+class _TrackedOrder:
+    __slots__ = ("order_id", "organization_id", "future", "callbacks", "last_status")
+
+    def __init__(self, order_id, organization_id):
+        self.order_id = order_id
+        self.organization_id = organization_id
+        self.future = Future()
+        self.callbacks = []
+        self.last_status = None
+
+
+class OrderStatusTracker:
+    """
+    Отслеживает статус создания заказов, объединяя их в общие запросы order/by_id
+
+    Все отслеживаемые заказы опрашиваются пакетами по max_batch_size ID за
+    запрос. Интервал опроса начинается с min_interval и увеличивается в
+    backoff раз, пока статусы не меняются (но не больше max_interval).
+    Заказ перестает опрашиваться, когда его creationStatus становится Success
+    или Error.
+
+    Args:
+        token (str | TokenManager): Токен доступа
+        client (IikoClient): Клиент iiko API (по умолчанию общий)
+        min_interval (float): Минимальный интервал опроса в секундах
+        max_interval (float): Максимальный интервал опроса в секундах
+        backoff (float): Множитель интервала, если статусы не изменились
+        max_batch_size (int): Максимум ID заказов в одном запросе
+    """
+
+    def __init__(self, token, client=None, min_interval=1.0, max_interval=30.0, backoff=1.5,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        self.token = token
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_batch_size = max_batch_size
+
+        self._orders = {}
+        self._condition = threading.Condition()
+        self._interval = min_interval
+        self._next_poll = None
+        self._thread = None
+        self._stopped = False
+
+    def track(self, order_id, organization_id, callback=None):
+        """
+        Добавляет заказ в отслеживание
+
+        Args:
+            order_id (str): ID заказа
+            organization_id (str): ID организации
+            callback (callable): Функция callback(order_id, order), вызываемая
+                при финальном статусе заказа
+
+        Returns:
+            concurrent.futures.Future: Будущий результат - данные заказа из order/by_id
+        """
+        with self._condition:
+            tracked = self._orders.get(order_id)
+            if tracked is None:
+                tracked = self._orders[order_id] = _TrackedOrder(order_id, organization_id)
+            if callback is not None:
+                tracked.callbacks.append(callback)
+
+            # Новые заказы опрашиваются с минимальным интервалом, при этом
+            # заказы, добавленные в пределах интервала, попадают в один запрос
+            self._interval = self.min_interval
+            deadline = time.monotonic() + self.min_interval
+            if self._next_poll is None or deadline < self._next_poll:
+                self._next_poll = deadline
+            self._condition.notify()
+            return tracked.future
+
+    async def wait(self, order_id, organization_id):
+        """
+        Добавляет заказ в отслеживание и ожидает его финальный статус
+
+        Args:
+            order_id (str): ID заказа
+            organization_id (str): ID организации
+
+        Returns:
+            dict: Данные заказа из order/by_id
+
+        Raises:
+            RuntimeError: Если фоновый опрос не запущен (start() не вызывался или вызван stop())
+        """
+        if not self.running:
+            raise RuntimeError("Отслеживание статусов не запущено: вызовите start()")
+        return await asyncio.wrap_future(self.track(order_id, organization_id))
+
+    def untrack(self, order_id):
+        """
+        Прекращает отслеживание заказа, отменяя его ожидание
+
+        Args:
+            order_id (str): ID заказа
+        """
+        with self._condition:
+            tracked = self._orders.pop(order_id, None)
+        if tracked is not None:
+            tracked.future.cancel()
+
+    @property
+    def running(self):
+        """True, если фоновый опрос запущен"""
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    @property
+    def pending_count(self):
+        """Количество заказов, ожидающих финального статуса"""
+        return len(self._orders)
+
+    def poll_once(self):
+        """
+        Опрашивает все отслеживаемые заказы одним или несколькими запросами
+
+        Returns:
+            bool: True, если статус хотя бы одного заказа изменился
+        """
+        with self._condition:
+            pending = list(self._orders.values())
+
+        client = self.client or get_default_client()
+        changed = False
+
+        for start in range(0, len(pending), self.max_batch_size):
+            batch = pending[start:start + self.max_batch_size]
+            order_ids = [tracked.order_id for tracked in batch]
+            organization_ids = sorted({tracked.organization_id for tracked in batch})
+
+            result = client.get_order_by_id(
+                self.token,
+                order_ids=order_ids,
+                organization_ids=organization_ids
+            )
+            if not result:
+                continue
+
+            for order in result.get('orders') or []:
+                if self._update(order):
+                    changed = True
+
+        return changed
+
+    def notify(self, order):
+        """
+        Передает данные заказа, полученные без опроса (например, из webhook)
+
+        Args:
+            order (dict): Данные заказа в формате order/by_id
+
+        Returns:
+            bool: True, если статус отслеживаемого заказа изменился
+        """
+        return self._update(order)
+
+    def _update(self, order):
+        order_id = order.get('id')
+        status = order.get('creationStatus')
+
+        with self._condition:
+            tracked = self._orders.get(order_id)
+            if tracked is None:
+                return False
+            changed = status != tracked.last_status
+            tracked.last_status = status
+            if status not in FINAL_CREATION_STATUSES:
+                return changed
+            del self._orders[order_id]
+
+        if tracked.future.set_running_or_notify_cancel():
+            tracked.future.set_result(order)
+        for callback in tracked.callbacks:
+            try:
+                callback(order_id, order)
+            except Exception as e:
+                print(f"Ошибка в обработчике статуса заказа {order_id}: {e}")
+        return True
+
+    def start(self):
+        """Запускает фоновый опрос в отдельном потоке"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="order-status-tracker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Останавливает фоновый опрос"""
+        with self._condition:
+            self._stopped = True
+            thread = self._thread
+            self._thread = None
+            self._condition.notify()
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._orders and self._next_poll is not None:
+                        delay = self._next_poll - time.monotonic()
+                        if delay <= 0:
+                            break
+                        self._condition.wait(delay)
+                    else:
+                        self._condition.wait()
+                if self._stopped:
+                    return
+
+            # Ошибка одного опроса не должна останавливать поток: иначе ожидания заказов не завершатся
+            try:
+                changed = self.poll_once()
+            except Exception as e:
+                print(f"Ошибка при опросе статусов заказов: {e}")
+                changed = False
+
+            with self._condition:
+                if changed:
+                    self._interval = self.min_interval
+                else:
+                    self._interval = min(self._interval * self.backoff, self.max_interval)
+                self._next_poll = time.monotonic() + self._interval
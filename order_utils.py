@@ -1,6 +1,9 @@
+import time
 import uuid
 from datetime import datetime
 
+from codec import get_json_codec
+
 
 def build_simple_order(product_id, product_size_id, price, amount=1, customer_name="Тестовый заказ", order_type_id=None, price_category_id=None, table_ids=None):
     """
@@ -96,4 +99,346 @@ def get_product_size_and_price(selected_product):
         # Если sizePrices отсутствует, также не указываем productSizeId
         product_size_id = None
 
-    return product_size_id, price
\ No newline at end of file
+    return product_size_id, price
+
+
+_JSON = get_json_codec()
+
+
+def encode_json(data):
+    """
+    Кодирует данные в компактный JSON (через orjson, если он установлен)
+
+    Args:
+        data: Данные для кодирования
+
+    Returns:
+        bytes: JSON в UTF-8
+    """
+    return _JSON.dumps(data)
+
+
+class OrderValidationError(ValueError):
+    """Позиция заказа не соответствует меню"""
+
+
+# Значение size_id по умолчанию: первый размер продукта из меню
+FIRST_SIZE = object()
+
+DEFAULT_CREATE_ORDER_SETTINGS = {
+    "servicePrint": False,
+    "transportToFrontTimeout": 0,
+    "checkStopList": False
+}
+
+
+class Combo:
+    """
+    Комбо заказа и входящие в него позиции
+
+    Attributes:
+        combo (dict): Данные комбо для списка combos заказа
+        items (list): Позиции комбо с comboInformation
+    """
+    __slots__ = ("combo", "items")
+
+    def __init__(self, combo, items):
+        self.combo = combo
+        self.items = items
+
+
+def _allowed_modifiers(product):
+    # Одиночные модификаторы и модификаторы групп: {ID модификатора: {ID групп или None}}
+    allowed = {}
+    for group_id, modifier_id in product.modifiers:
+        allowed.setdefault(modifier_id, set()).add(group_id)
+    return allowed
+
+
+class OrderBuilder:
+    """
+    Собирает заказы из нескольких позиций с модификаторами и комбо
+
+    Неизменные части заказа (клиент, гости, источник, тип заказа) готовятся
+    один раз при создании и используются во всех заказах; гости, оплаты и
+    чаевые копируются в каждый заказ, поэтому собранные заказы можно
+    изменять независимо. Если передано меню, позиции проверяются по нему,
+    а цены и размеры по умолчанию берутся из него.
+
+    Args:
+        menu (MenuIndex | MenuSnapshot): Меню для проверки позиций (опционально)
+        customer_name (str): Имя клиента
+        phone (str): Телефон
+        order_type_id (str): ID типа заказа
+        price_category_id (str): ID категории цен
+        source_key (str): Источник заказа
+        external_number_prefix (str): Префикс внешнего номера заказа
+    """
+
+    def __init__(self, menu=None, customer_name="Тестовый заказ", phone="77777777777", order_type_id=None,
+                 price_category_id=None, source_key="api-test", external_number_prefix="TEST"):
+        self.menu = menu
+        self.external_number_prefix = external_number_prefix
+
+        self._customer_template = {
+            "name": customer_name,
+            "gender": "NotSpecified",
+            "type": "one_time"
+        }
+        self._order_template = {
+            "phone": phone,
+            "guestCount": 1,
+            "guests": {
+                "count": 1
+            },
+            "payments": [],
+            "tips": [],
+            "sourceKey": source_key
+        }
+        if order_type_id:
+            self._order_template["orderTypeId"] = order_type_id
+        if price_category_id:
+            self._order_template["priceCategoryId"] = price_category_id
+
+        self._payload_prefixes = {}
+        self._timestamp_second = None
+        self._timestamp = None
+
+    def _external_number(self):
+        # strftime вызывается не чаще раза в секунду
+        second = int(time.time())
+        if second != self._timestamp_second:
+            self._timestamp = datetime.fromtimestamp(second).strftime('%Y%m%d-%H%M%S')
+            self._timestamp_second = second
+        return f"{self.external_number_prefix}-{self._timestamp}"
+
+    def _menu_product(self, product_id):
+        product = self.menu.get_product(product_id)
+        if product is None:
+            raise OrderValidationError(f"Продукт {product_id} не найден в меню")
+        if product.is_deleted:
+            raise OrderValidationError(f"Продукт {product_id} удален из меню")
+        return product
+
+    def _check_modifiers(self, product, modifiers):
+        allowed = _allowed_modifiers(product)
+        for modifier in modifiers:
+            groups = allowed.get(modifier.get("productId"))
+            if groups is None or modifier.get("productGroupId") not in groups:
+                raise OrderValidationError(
+                    f"Модификатор {modifier.get('productId')} недоступен для продукта {product.id}"
+                )
+
+    def _check_item(self, item):
+        # Проверка готовой позиции (например, переданной в combo()) по меню
+        product = self._menu_product(item.get("productId"))
+        size_id = item.get("productSizeId")
+        if product.size_prices and size_id not in {size_price.size_id for size_price in product.size_prices}:
+            raise OrderValidationError(f"У продукта {product.id} нет размера {size_id}")
+        if item.get("modifiers"):
+            self._check_modifiers(product, item["modifiers"])
+
+    def modifier(self, product_id, amount=1, group_id=None, price=None):
+        """
+        Создает модификатор позиции
+
+        Args:
+            product_id (str): ID модификатора
+            amount (int): Количество
+            group_id (str): ID группы модификаторов (для групповых модификаторов)
+            price (float): Цена (по умолчанию из меню, если оно передано)
+
+        Returns:
+            dict: Модификатор для item(modifiers=...)
+        """
+        if price is None and self.menu is not None:
+            price = self.menu.get_price(product_id)
+
+        modifier = {"productId": product_id, "amount": amount}
+        if group_id is not None:
+            modifier["productGroupId"] = group_id
+        if price is not None:
+            modifier["price"] = price
+        return modifier
+
+    def item(self, product_id, amount=1, size_id=FIRST_SIZE, price=None, modifiers=None, comment=""):
+        """
+        Создает позицию заказа
+
+        Args:
+            product_id (str): ID продукта
+            amount (float): Количество
+            size_id (str): ID размера (по умолчанию первый размер продукта в меню,
+                None - продукт без размера)
+            price (float): Цена за единицу (по умолчанию из меню)
+            modifiers (list): Модификаторы из modifier()
+            comment (str): Комментарий
+
+        Returns:
+            dict: Позиция для build()
+
+        Raises:
+            OrderValidationError: Если продукт, размер или модификатор не найден в меню
+        """
+        if self.menu is not None:
+            product = self._menu_product(product_id)
+            size_prices = {size_price.size_id: size_price.current_price for size_price in product.size_prices}
+
+            if size_id is FIRST_SIZE:
+                size_id = product.size_prices[0].size_id if product.size_prices else None
+            elif size_prices and size_id not in size_prices:
+                raise OrderValidationError(f"У продукта {product_id} нет размера {size_id}")
+            if price is None:
+                if size_id not in size_prices:
+                    raise OrderValidationError(f"В меню нет цены продукта {product_id} для размера {size_id}")
+                price = size_prices[size_id]
+
+            if modifiers:
+                self._check_modifiers(product, modifiers)
+        else:
+            if size_id is FIRST_SIZE:
+                size_id = None
+            if price is None:
+                raise OrderValidationError(f"Не указана цена продукта {product_id}")
+
+        item = {
+            "productId": product_id,
+            "price": price,
+            "type": "Product",
+            "amount": amount,
+            "comment": comment
+        }
+        if size_id is not None:
+            item["productSizeId"] = size_id
+        if modifiers:
+            item["modifiers"] = modifiers
+        return item
+
+    def combo(self, source_id, name, price, items, amount=1, program_id=None):
+        """
+        Создает комбо
+
+        Args:
+            source_id (str): ID комбо в меню
+            name (str): Название комбо
+            price (float): Цена комбо
+            items (list): Пары (ID группы комбо, позиция из item())
+            amount (int): Количество
+            program_id (str): ID программы лояльности комбо
+
+        Returns:
+            Combo: Комбо для build()
+
+        Raises:
+            OrderValidationError: Если не указан source_id, в комбо нет позиций или
+                продукт, размер или модификатор позиции не найден в меню
+        """
+        if not source_id:
+            raise OrderValidationError(f"Не указан ID комбо {name} в меню")
+        if not items:
+            raise OrderValidationError(f"В комбо {name} нет позиций")
+        if self.menu is not None:
+            for _, item in items:
+                self._check_item(item)
+
+        combo_id = str(uuid.uuid4())
+        combo = {
+            "id": combo_id,
+            "name": name,
+            "amount": amount,
+            "price": price,
+            "sourceId": source_id
+        }
+        if program_id:
+            combo["programId"] = program_id
+
+        combo_items = []
+        for group_id, item in items:
+            item = dict(item)
+            item["comboInformation"] = {
+                "comboId": combo_id,
+                "comboSourceId": source_id,
+                "comboGroupId": group_id
+            }
+            combo_items.append(item)
+        return Combo(combo, combo_items)
+
+    def build(self, items, order_id=None, external_number=None, table_ids=None, comment=None):
+        """
+        Собирает заказ
+
+        Args:
+            items (list): Позиции из item() и комбо из combo()
+            order_id (str): ID заказа (по умолчанию новый UUID)
+            external_number (str): Внешний номер (по умолчанию префикс и текущее время)
+            table_ids (list): Список ID столов
+            comment (str): Комментарий к заказу
+
+        Returns:
+            dict: Данные заказа для create_order
+
+        Raises:
+            OrderValidationError: Если в заказе нет позиций
+        """
+        order_items = []
+        combos = []
+        for item in items:
+            if isinstance(item, Combo):
+                combos.append(item.combo)
+                order_items.extend(item.items)
+            else:
+                order_items.append(item)
+
+        if not order_items:
+            raise OrderValidationError("В заказе нет позиций")
+
+        customer = self._customer_template.copy()
+        customer["id"] = str(uuid.uuid4())
+
+        order = {
+            "id": order_id or str(uuid.uuid4()),
+            "externalNumber": external_number or self._external_number(),
+            "customer": customer,
+            "items": order_items,
+            "combos": combos
+        }
+        order.update(self._order_template)
+        # Изменяемые объекты шаблона копируются, чтобы заказы не делили их между собой
+        order["guests"] = self._order_template["guests"].copy()
+        order["payments"] = list(self._order_template["payments"])
+        order["tips"] = list(self._order_template["tips"])
+
+        if table_ids:
+            order["tableIds"] = table_ids
+        if comment:
+            order["comment"] = comment
+        return order
+
+    def encode_payload(self, organization_id, terminal_group_id, order, settings=None):
+        """
+        Кодирует тело запроса order/create в байты
+
+        Закодированная часть с организацией, группой терминалов и настройками
+        сохраняется и используется повторно. Результат можно передать в
+        IikoClient.call("order/create", body, token).
+
+        Args:
+            organization_id (str): ID организации
+            terminal_group_id (str): ID группы терминалов
+            order (dict): Данные заказа из build()
+            settings (dict): Настройки создания заказа
+
+        Returns:
+            bytes: Тело запроса в JSON
+        """
+        key = (organization_id, terminal_group_id)
+        prefix = self._payload_prefixes.get(key) if settings is None else None
+        if prefix is None:
+            prefix = encode_json({
+                "organizationId": organization_id,
+                "terminalGroupId": terminal_group_id,
+                "createOrderSettings": settings if settings is not None else DEFAULT_CREATE_ORDER_SETTINGS
+            })[:-1] + b',"order":'
+            if settings is None:
+                self._payload_prefixes[key] = prefix
+        return prefix + encode_json(order) + b"}"
@@ -0,0 +1,346 @@
+"""
+Колоночные цены меню
+
+numpy - необязательная зависимость (requirements.txt): если он установлен,
+фильтры, пересчет цен, суммы и сравнение меню выполняются векторно над
+колонками. Без numpy те же операции выполняются циклами по array('d') и
+дают те же результаты, только медленнее на больших меню.
+"""
+import math
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Ключ колонки цен из ответа get_nomenclature без категории цен
+BASE_PRICES = None
+
+_MISSING = float('nan')
+
+
+def _size_price_rows(menu_result):
+    for product in menu_result.get('products') or []:
+        for size_price in product.get('sizePrices') or []:
+            price_info = size_price.get('price') or {}
+            price = price_info.get('currentPrice')
+            yield (product['id'], size_price.get('sizeId'), product.get('name'),
+                   _MISSING if price is None else float(price),
+                   price_info.get('isIncludedInMenu', True))
+
+
+class PriceEngine:
+    """
+    Цены всех продуктов и размеров меню в колонках
+
+    Каждая строка - пара (продукт, размер) из sizePrices. Цены хранятся в
+    колонке array('d') для каждой категории цен (отсутствующая цена - NaN).
+    Массовые операции выполняются через numpy, если он установлен, и
+    циклом по массивам без обращения к словарям меню, если нет.
+
+    Args:
+        menu_result (dict): Ответ get_nomenclature
+        price_category_id (str): Категория цен, к которой относятся цены ответа
+            (None - базовые цены)
+    """
+
+    def __init__(self, menu_result, price_category_id=BASE_PRICES):
+        self.revision = menu_result.get('revision')
+        self.product_ids = []
+        self.size_ids = []
+        self.names = []
+        self.included = array('b')
+        self._rows = {}
+        self._first_rows = {}
+
+        prices = array('d')
+        for product_id, size_id, name, price, included in _size_price_rows(menu_result):
+            row = len(self.product_ids)
+            self.product_ids.append(product_id)
+            self.size_ids.append(size_id)
+            self.names.append(name)
+            self.included.append(1 if included else 0)
+            prices.append(price)
+            self._rows[(product_id, size_id)] = row
+            self._first_rows.setdefault(product_id, row)
+
+        self._columns = {price_category_id: prices}
+        self._views = {}
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    @property
+    def price_categories(self):
+        return list(self._columns)
+
+    def add_price_category(self, price_category_id, menu_result):
+        """
+        Добавляет колонку цен категории из ответа меню с ценами этой категории
+
+        Строки, которых нет в ответе, получают цену NaN; продукты, которых
+        нет в меню движка, пропускаются.
+
+        Args:
+            price_category_id (str): ID категории цен
+            menu_result (dict): Ответ меню с ценами категории
+        """
+        prices = array('d', [_MISSING]) * len(self)
+        for product_id, size_id, _, price, _ in _size_price_rows(menu_result):
+            row = self._rows.get((product_id, size_id))
+            if row is not None:
+                prices[row] = price
+        self._set_column(price_category_id, prices)
+
+    def _set_column(self, price_category_id, prices):
+        self._columns[price_category_id] = prices
+        self._views.pop(price_category_id, None)
+
+    def column(self, price_category_id=BASE_PRICES):
+        """
+        Возвращает колонку цен категории
+
+        Args:
+            price_category_id (str): ID категории цен
+
+        Returns:
+            numpy.ndarray | array: Цены по строкам (numpy без копирования, если установлен)
+        """
+        prices = self._columns[price_category_id]
+        if numpy is None:
+            return prices
+        view = self._views.get(price_category_id)
+        if view is None:
+            view = self._views[price_category_id] = numpy.frombuffer(prices, dtype=numpy.float64)
+        return view
+
+    def row(self, product_id, size_id=None):
+        """
+        Возвращает номер строки продукта и размера
+
+        Args:
+            product_id (str): ID продукта
+            size_id (str): ID размера (None - продукт без размеров)
+
+        Returns:
+            int: Номер строки или None
+        """
+        return self._rows.get((product_id, size_id))
+
+    def get_price(self, product_id, size_id=None, price_category_id=BASE_PRICES):
+        """
+        Возвращает цену продукта для размера
+
+        Returns:
+            float: Цена или None, если строки или цены нет
+        """
+        row = self._rows.get((product_id, size_id))
+        if row is None:
+            return None
+        price = self._columns[price_category_id][row]
+        return None if math.isnan(price) else price
+
+    def get_product_size_and_price(self, product_id, price_category_id=BASE_PRICES):
+        """
+        Возвращает первый размер и цену продукта, как order_utils.get_product_size_and_price
+
+        Returns:
+            tuple: (product_size_id, price) или (None, 0), если продукт не найден
+        """
+        row = self._first_rows.get(product_id)
+        if row is None:
+            return None, 0
+        price = self._columns[price_category_id][row]
+        return self.size_ids[row], 0 if math.isnan(price) else price
+
+    def rows_for(self, keys):
+        """
+        Переводит пары (product_id, size_id) в номера строк
+
+        Args:
+            keys (iterable): Пары (product_id, size_id)
+
+        Returns:
+            array: Номера строк
+
+        Raises:
+            KeyError: Если пары нет в меню
+        """
+        rows = array('l')
+        for key in keys:
+            row = self._rows.get(key)
+            if row is None:
+                raise KeyError(f"Продукт {key[0]} с размером {key[1]} не найден в меню")
+            rows.append(row)
+        return rows
+
+    def filter_by_price(self, min_price=None, max_price=None, price_category_id=BASE_PRICES, included_only=False):
+        """
+        Находит строки с ценой в диапазоне
+
+        Args:
+            min_price (float): Нижняя граница включительно (None - без ограничения)
+            max_price (float): Верхняя граница включительно (None - без ограничения)
+            price_category_id (str): ID категории цен
+            included_only (bool): Только цены, включенные в меню
+
+        Returns:
+            list: Кортежи (product_id, size_id, price)
+        """
+        prices = self.column(price_category_id)
+
+        if numpy is not None:
+            mask = ~numpy.isnan(prices)
+            if min_price is not None:
+                mask &= prices >= min_price
+            if max_price is not None:
+                mask &= prices <= max_price
+            if included_only:
+                mask &= numpy.frombuffer(self.included, dtype=numpy.int8).astype(bool)
+            rows = numpy.flatnonzero(mask).tolist()
+        else:
+            low = -math.inf if min_price is None else min_price
+            high = math.inf if max_price is None else max_price
+            included = self.included
+            # NaN не проходит сравнение, поэтому строки без цены отбрасываются сами
+            rows = [row for row, price in enumerate(prices)
+                    if low <= price <= high and (not included_only or included[row])]
+
+        return [(self.product_ids[row], self.size_ids[row], float(prices[row])) for row in rows]
+
+    def reprice(self, factor=1.0, delta=0.0, round_to=None, price_category_id=BASE_PRICES,
+                target_category_id=None):
+        """
+        Пересчитывает все цены: price * factor + delta с округлением
+
+        Args:
+            factor (float): Множитель
+            delta (float): Надбавка
+            round_to (float): Шаг округления (например, 10 - до десятков)
+            price_category_id (str): Исходная категория цен
+            target_category_id (str): Если указан, результат сохраняется как
+                колонка этой категории
+
+        Returns:
+            numpy.ndarray | array: Новые цены по строкам
+        """
+        source = self.column(price_category_id)
+
+        if numpy is not None:
+            result = source * factor + delta
+            if round_to:
+                result = numpy.round(result / round_to) * round_to
+            prices = None
+            if target_category_id is not None:
+                prices = array('d')
+                prices.frombytes(result.tobytes())
+        else:
+            if round_to:
+                result = array('d', (round((price * factor + delta) / round_to) * round_to
+                                     if price == price else price for price in source))
+            else:
+                result = array('d', (price * factor + delta for price in source))
+            prices = result
+
+        if target_category_id is not None:
+            self._set_column(target_category_id, prices)
+            return self.column(target_category_id)
+        return result
+
+    def total(self, keys, amounts, price_category_id=BASE_PRICES):
+        """
+        Считает сумму позиций
+
+        Args:
+            keys (iterable): Пары (product_id, size_id)
+            amounts (iterable): Количество для каждой пары
+            price_category_id (str): ID категории цен
+
+        Returns:
+            float: Сумма (math.fsum, поэтому результат с numpy и без него одинаковый)
+
+        Raises:
+            KeyError: Если пары нет в меню или у нее нет цены
+        """
+        rows = self.rows_for(keys)
+        prices = self.column(price_category_id)
+
+        if numpy is not None:
+            row_prices = prices[numpy.frombuffer(rows, dtype=numpy.dtype(rows.typecode))]
+            amounts = numpy.fromiter(amounts, dtype=numpy.float64, count=len(rows))
+            missing = numpy.isnan(row_prices)
+            if missing.any():
+                row = rows[int(numpy.flatnonzero(missing)[0])]
+                raise KeyError(f"Нет цены продукта {self.product_ids[row]} с размером {self.size_ids[row]}")
+            return math.fsum((row_prices * amounts).tolist())
+
+        items = []
+        for row, amount in zip(rows, amounts):
+            price = prices[row]
+            if price != price:
+                raise KeyError(f"Нет цены продукта {self.product_ids[row]} с размером {self.size_ids[row]}")
+            items.append(price * amount)
+        return math.fsum(items)
+
+    def order_total(self, order_data, price_category_id=BASE_PRICES):
+        """
+        Считает сумму позиций заказа (без модификаторов) по ценам меню
+
+        Args:
+            order_data (dict): Данные заказа (например, из OrderBuilder.build)
+            price_category_id (str): ID категории цен
+
+        Returns:
+            float: Сумма
+        """
+        items = order_data.get('items') or []
+        keys = [(item['productId'], item.get('productSizeId')) for item in items]
+        return self.total(keys, [item.get('amount', 1) for item in items], price_category_id)
+
+    def diff(self, other, price_category_id=BASE_PRICES):
+        """
+        Сравнивает цены с другим PriceEngine (например, построенным по новому меню)
+
+        Args:
+            other (PriceEngine): Цены для сравнения
+            price_category_id (str): ID категории цен
+
+        Returns:
+            dict: {"changed": [(product_id, size_id, old, new)], "added": [(product_id, size_id)],
+                "removed": [(product_id, size_id)]}
+        """
+        old_prices = self._columns[price_category_id]
+        new_prices = other._columns[price_category_id]
+
+        # Строки другого меню в порядке строк этого (-1 - строки нет)
+        mapping = array('l', (other._rows.get(key, -1) for key in zip(self.product_ids, self.size_ids)))
+
+        if numpy is not None:
+            rows = numpy.frombuffer(mapping, dtype=numpy.dtype(mapping.typecode))
+            present = rows >= 0
+            old = self.column(price_category_id)[present]
+            new = other.column(price_category_id)[rows[present]]
+            changed_mask = (old != new) & ~(numpy.isnan(old) & numpy.isnan(new))
+            changed_rows = numpy.flatnonzero(present)[changed_mask].tolist()
+        else:
+            changed_rows = []
+            for row, other_row in enumerate(mapping):
+                if other_row < 0:
+                    continue
+                old, new = old_prices[row], new_prices[other_row]
+                if old != new and not (old != old and new != new):
+                    changed_rows.append(row)
+
+        changed = []
+        for row in changed_rows:
+            old, new = old_prices[row], new_prices[mapping[row]]
+            changed.append((self.product_ids[row], self.size_ids[row],
+                            None if math.isnan(old) else old, None if math.isnan(new) else new))
+
+        return {
+            "changed": changed,
+            "added": [key for key in zip(other.product_ids, other.size_ids) if key not in self._rows],
+            "removed": [key for row, key in enumerate(zip(self.product_ids, self.size_ids)) if mapping[row] < 0]
+        }
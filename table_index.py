@@ -0,0 +1,313 @@
+import bisect
+import threading
+
+from iiko_api import get_default_client
+
+
+class TableRecord:
+    """Стол секции ресторана"""
+    __slots__ = ("id", "number", "name", "seating_capacity", "section_id", "terminal_group_id", "raw")
+
+    def __init__(self, table, section_id, terminal_group_id):
+        self.id = table['id']
+        self.number = table.get('number')
+        self.name = table.get('name') or f"Стол {table.get('number', 'без номера')}"
+        self.seating_capacity = table.get('seatingCapacity') or 0
+        self.section_id = section_id
+        self.terminal_group_id = terminal_group_id
+        self.raw = table
+
+    def __repr__(self):
+        return f"TableRecord(id={self.id!r}, name={self.name!r}, seating_capacity={self.seating_capacity})"
+
+
+class _TerminalGroupTables:
+    __slots__ = ("revision", "sections", "section_tables", "by_capacity", "free_by_capacity", "capacities")
+
+    def __init__(self):
+        self.revision = 0
+        self.sections = {}
+        self.section_tables = {}
+        # Вместимость -> {ID стола: стол}; capacities - отсортированные ключи by_capacity
+        self.by_capacity = {}
+        self.free_by_capacity = {}
+        self.capacities = []
+
+
+class TableIndex:
+    """
+    Секции ресторана и столы групп терминалов с обновлением по ревизии
+
+    Первая загрузка группы терминалов запрашивает все секции (revision=0),
+    следующие - только изменения с сохраненной ревизии: измененные столы
+    заменяются, столы с isDeleted удаляются. Столы разложены по секциям и
+    по вместимости, поэтому выборки не перебирают все столы групп.
+
+    Занятость столов (брони, открытые заказы) iiko в этом ответе не
+    передает, ее отмечают mark_busy/mark_free.
+
+    Args:
+        token (str | TokenManager): Токен доступа
+        client (IikoClient): Клиент iiko API (по умолчанию общий)
+        return_schema (bool): Запрашивать схему расположения столов
+    """
+
+    def __init__(self, token, client=None, return_schema=True):
+        self.token = token
+        self.client = client
+        self.return_schema = return_schema
+
+        self._groups = {}
+        self._tables = {}
+        self._busy = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tables)
+
+    def __contains__(self, table_id):
+        return table_id in self._tables
+
+    def revision(self, terminal_group_id):
+        """Ревизия, до которой загружены столы группы терминалов (0 - не загружались)"""
+        group = self._groups.get(terminal_group_id)
+        return group.revision if group is not None else 0
+
+    def refresh(self, terminal_group_ids=None):
+        """
+        Загружает изменения секций и столов с последней ревизии
+
+        Группы терминалов с одинаковой ревизией обновляются одним запросом.
+
+        Args:
+            terminal_group_ids (list): ID групп терминалов (по умолчанию все уже загруженные)
+
+        Returns:
+            bool: True, если все запросы выполнены успешно
+        """
+        if terminal_group_ids is None:
+            terminal_group_ids = list(self._groups)
+
+        by_revision = {}
+        for terminal_group_id in terminal_group_ids:
+            by_revision.setdefault(self.revision(terminal_group_id), []).append(terminal_group_id)
+
+        client = self.client or get_default_client()
+        success = True
+        for revision, group_ids in by_revision.items():
+            result = client.get_available_restaurant_sections(self.token, group_ids, self.return_schema, revision)
+            if result is None:
+                success = False
+                continue
+            self.apply(result, group_ids)
+        return success
+
+    def apply(self, sections_result, terminal_group_ids=()):
+        """
+        Применяет ответ reserve/available_restaurant_sections
+
+        Args:
+            sections_result (dict): Ответ get_available_restaurant_sections
+            terminal_group_ids (iterable): Группы терминалов запроса - их ревизия
+                обновляется, даже если изменений не было
+        """
+        revision = sections_result.get('revision') or 0
+
+        with self._lock:
+            for terminal_group_id in terminal_group_ids:
+                self._group(terminal_group_id).revision = revision
+
+            for section in sections_result.get('restaurantSections') or []:
+                terminal_group_id = section.get('terminalGroupId')
+                group = self._group(terminal_group_id)
+                group.revision = max(group.revision, revision)
+                section_id = section['id']
+
+                if section.get('isDeleted', False):
+                    for table_id in list(group.section_tables.get(section_id, ())):
+                        self._remove_table(table_id)
+                    group.sections.pop(section_id, None)
+                    group.section_tables.pop(section_id, None)
+                    continue
+
+                group.sections[section_id] = {key: value for key, value in section.items() if key != 'tables'}
+                group.section_tables.setdefault(section_id, {})
+                for table in section.get('tables') or []:
+                    self._remove_table(table['id'])
+                    if not table.get('isDeleted', False):
+                        self._add_table(group, TableRecord(table, section_id, terminal_group_id))
+
+    def _group(self, terminal_group_id):
+        group = self._groups.get(terminal_group_id)
+        if group is None:
+            group = self._groups[terminal_group_id] = _TerminalGroupTables()
+        return group
+
+    def _add_table(self, group, record):
+        self._tables[record.id] = record
+        group.section_tables[record.section_id][record.id] = record
+        capacity = record.seating_capacity
+        if capacity not in group.by_capacity:
+            group.by_capacity[capacity] = {}
+            group.free_by_capacity[capacity] = {}
+            bisect.insort(group.capacities, capacity)
+        group.by_capacity[capacity][record.id] = record
+        if record.id not in self._busy:
+            group.free_by_capacity[capacity][record.id] = record
+
+    def _remove_table(self, table_id):
+        record = self._tables.pop(table_id, None)
+        if record is None:
+            return
+        group = self._groups[record.terminal_group_id]
+        group.section_tables.get(record.section_id, {}).pop(table_id, None)
+        capacity = record.seating_capacity
+        tables = group.by_capacity[capacity]
+        tables.pop(table_id, None)
+        group.free_by_capacity[capacity].pop(table_id, None)
+        if not tables:
+            del group.by_capacity[capacity]
+            del group.free_by_capacity[capacity]
+            group.capacities.remove(capacity)
+
+    def mark_busy(self, table_ids):
+        """
+        Отмечает столы занятыми
+
+        Args:
+            table_ids (iterable): ID столов
+        """
+        with self._lock:
+            for table_id in table_ids:
+                self._busy.add(table_id)
+                record = self._tables.get(table_id)
+                if record is not None:
+                    self._groups[record.terminal_group_id].free_by_capacity[record.seating_capacity].pop(table_id, None)
+
+    def mark_free(self, table_ids):
+        """
+        Отмечает столы свободными
+
+        Args:
+            table_ids (iterable): ID столов
+        """
+        with self._lock:
+            for table_id in table_ids:
+                self._busy.discard(table_id)
+                record = self._tables.get(table_id)
+                if record is not None:
+                    group = self._groups[record.terminal_group_id]
+                    group.free_by_capacity[record.seating_capacity][table_id] = record
+
+    def is_free(self, table_id):
+        return table_id in self._tables and table_id not in self._busy
+
+    def get_table(self, table_id):
+        """
+        Возвращает стол по ID
+
+        Returns:
+            TableRecord: Стол или None
+        """
+        return self._tables.get(table_id)
+
+    def sections(self, terminal_group_id):
+        """
+        Возвращает секции группы терминалов
+
+        Returns:
+            list: Секции из ответа (без списка столов)
+        """
+        group = self._groups.get(terminal_group_id)
+        return list(group.sections.values()) if group is not None else []
+
+    def tables_in_section(self, section_id, terminal_group_id=None):
+        """
+        Возвращает столы секции
+
+        Args:
+            section_id (str): ID секции
+            terminal_group_id (str): Группа терминалов секции (по умолчанию ищется среди всех)
+
+        Returns:
+            list: TableRecord
+        """
+        groups = [self._groups.get(terminal_group_id)] if terminal_group_id else self._groups.values()
+        for group in groups:
+            if group is not None and section_id in group.section_tables:
+                return list(group.section_tables[section_id].values())
+        return []
+
+    def tables(self, terminal_group_id=None):
+        """
+        Возвращает столы группы терминалов в порядке секций
+
+        Args:
+            terminal_group_id (str): ID группы терминалов (None - все группы)
+
+        Returns:
+            list: TableRecord
+        """
+        groups = [self._groups.get(terminal_group_id)] if terminal_group_id else list(self._groups.values())
+        return [record for group in groups if group is not None
+                for tables in group.section_tables.values() for record in tables.values()]
+
+    def free_tables(self, terminal_group_id, min_capacity=0, max_capacity=None):
+        """
+        Возвращает свободные столы группы терминалов подходящей вместимости
+
+        Перебираются только корзины нужной вместимости, поэтому время не
+        зависит от количества остальных столов.
+
+        Args:
+            terminal_group_id (str): ID группы терминалов
+            min_capacity (int): Минимальная вместимость
+            max_capacity (int): Максимальная вместимость (None - без ограничения)
+
+        Returns:
+            list: TableRecord, от меньшей вместимости к большей
+        """
+        group = self._groups.get(terminal_group_id)
+        if group is None:
+            return []
+        start = bisect.bisect_left(group.capacities, min_capacity)
+        end = (len(group.capacities) if max_capacity is None
+               else bisect.bisect_right(group.capacities, max_capacity))
+        return [record for capacity in group.capacities[start:end]
+                for record in group.free_by_capacity[capacity].values()]
+
+    def best_table(self, terminal_group_id, guests):
+        """
+        Возвращает свободный стол наименьшей подходящей вместимости
+
+        Args:
+            terminal_group_id (str): ID группы терминалов
+            guests (int): Количество гостей
+
+        Returns:
+            TableRecord: Стол или None
+        """
+        group = self._groups.get(terminal_group_id)
+        if group is None:
+            return None
+        for capacity in group.capacities[bisect.bisect_left(group.capacities, guests):]:
+            for record in group.free_by_capacity[capacity].values():
+                return record
+        return None
+
+    def table_choices(self, terminal_group_id=None):
+        """
+        Столы в формате, который возвращает ui.select_table
+
+        Returns:
+            list: Словари {'table': ..., 'section': ..., 'section_name': ...}
+        """
+        choices = []
+        for record in self.tables(terminal_group_id):
+            section = self._groups[record.terminal_group_id].sections.get(record.section_id, {})
+            choices.append({
+                'table': record.raw,
+                'section': section,
+                'section_name': section.get('name', 'Без названия')
+            })
+        return choices
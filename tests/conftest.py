@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# Модули проекта лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iiko_api import IikoClient  # noqa: E402
+from mock_server import MockIikoServer  # noqa: E402
+
+
+@pytest.fixture
+def mock_server():
+    with MockIikoServer(menu_size=200) as server:
+        yield server
+
+
+@pytest.fixture
+def client(mock_server):
+    client = IikoClient(base_url=mock_server.url, coalesce=False)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def token(client):
+    return client.call("access_token", {"apiLogin": "test"})["token"]
+
+
+@pytest.fixture
+def organization_id(client, token):
+    return client.call("organizations", {}, token)["organizations"][0]["id"]
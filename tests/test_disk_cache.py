@@ -0,0 +1,46 @@
+import time
+
+from disk_cache import DiskCache, make_cache_key
+
+
+def test_expired_entry_is_returned_only_on_request(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("key", {"value": 1}, ttl=-1, revision=5)
+
+    assert cache.get("key") is None
+    entry = cache.get("key", allow_expired=True)
+    assert entry.value == {"value": 1}
+    assert entry.revision == 5
+    assert entry.expired
+
+    cache.touch("key", ttl=60)
+    entry = cache.get("key")
+    assert entry is not None and not entry.expired
+
+
+def test_least_recently_read_entries_are_evicted(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", {"n": 1}, ttl=60)
+    time.sleep(0.01)
+    cache.set("b", {"n": 2}, ttl=60)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", {"n": 3}, ttl=60)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a").value == {"n": 1}
+    assert cache.get("c").value == {"n": 3}
+
+
+def test_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    DiskCache(path).set("key", {"n": 1}, ttl=60)
+    assert DiskCache(path).get("key").value == {"n": 1}
+
+
+def test_cache_key_ignores_payload_key_order():
+    assert make_cache_key("organizations", "login", {"a": 1, "b": 2}) == \
+        make_cache_key("organizations", "login", {"b": 2, "a": 1})
+    assert make_cache_key("organizations", "login", {}) != make_cache_key("organizations", "other", {})
@@ -0,0 +1,98 @@
+import copy
+import json
+
+from menu_index import MenuIndex
+from menu_snapshot import MenuSnapshot, load_snapshot, write_snapshot, write_snapshot_into
+from mock_server import build_mock_menu
+
+
+def _menu():
+    menu = build_mock_menu(300)
+    menu['products'][0]['modifiers'] = [{"id": "modifier", "minAmount": 0, "maxAmount": 2.5}]
+    menu['products'][0]['groupModifiers'] = [{"id": "group", "childModifiers": [{"id": "child"}]}]
+    menu['products'][1]['sizePrices'][0]['price']['currentPrice'] = None
+    menu['products'][2]['sizePrices'][0]['price']['currentPrice'] = 12.5
+    menu['products'][3]['name'] = None
+    del menu['products'][4]['code']
+    menu['products'][5]['extra'] = {"big": 2 ** 70, "values": [None, True, False, -0.5, "строка", [], {}]}
+    menu['sizes'][0]['priority'] = 1.5
+    menu['groups'][1]['parentGroup'] = menu['groups'][0]['id']
+    menu['productCategories'] = [{"id": "category", "name": "Категория"}]
+    return menu
+
+
+def test_file_snapshot_round_trip(tmp_path):
+    menu = _menu()
+    filename = str(tmp_path / "menu.snap")
+    write_snapshot(menu, filename)
+
+    with MenuSnapshot(filename) as snapshot:
+        result = snapshot.to_result()
+        assert result == menu
+        assert list(result) == list(menu)
+        assert list(result['products'][5]) == list(menu['products'][5])
+
+        snapshot.export_json(str(tmp_path / "menu.json"))
+    with open(tmp_path / "menu.json", encoding='utf-8') as f:
+        assert json.load(f) == menu
+
+
+def test_buffer_snapshot_round_trip():
+    menu = _menu()
+    buffers = []
+
+    def allocate(size):
+        buffers.append(bytearray(size))
+        return buffers[0]
+
+    size = write_snapshot_into(copy.deepcopy(menu), allocate)
+    snapshot = MenuSnapshot("memory", memoryview(buffers[0])[:size])
+    assert snapshot.to_result() == menu
+    snapshot.close()
+
+
+def test_snapshot_lookups_match_menu_index(tmp_path):
+    menu = _menu()
+    filename = str(tmp_path / "menu.snap")
+    write_snapshot(menu, filename)
+    index = MenuIndex(menu)
+    snapshot = load_snapshot(filename)
+
+    for product in menu['products']:
+        expected = index.get_product(product['id'])
+        actual = snapshot.get_product(product['id'])
+        for field in ("id", "name", "code", "type", "group_id", "product_category_id", "is_deleted", "modifiers"):
+            assert getattr(actual, field) == getattr(expected, field)
+        assert index.get_product_size_and_price(product['id']) == snapshot.get_product_size_and_price(product['id'])
+        for size_price in expected.size_prices:
+            assert snapshot.get_price(product['id'], size_price.size_id) == size_price.current_price
+
+    for group in menu['groups']:
+        assert [p.id for p in snapshot.products_in_group(group['id'])] == \
+            [p.id for p in index.products_in_group(group['id'])]
+    assert [g.id for g in snapshot.child_groups(menu['groups'][0]['id'])] == [menu['groups'][1]['id']]
+    assert snapshot.get_product("missing") is None and "missing" not in snapshot
+    assert snapshot.revision == menu['revision'] and len(snapshot) == len(menu['products'])
+    snapshot.close()
+
+
+def test_empty_and_partial_menus_round_trip(tmp_path):
+    filename = str(tmp_path / "menu.snap")
+    for menu in ({}, {"revision": 1}, {"revision": 2, "groups": [], "products": None, "sizes": []}):
+        write_snapshot(menu, filename)
+        with MenuSnapshot(filename) as snapshot:
+            assert snapshot.to_result() == menu
+
+
+def test_truncated_or_foreign_files_are_rejected(tmp_path):
+    filename = str(tmp_path / "menu.snap")
+    write_snapshot(_menu(), filename)
+    with open(filename, 'rb') as f:
+        data = f.read()
+
+    broken = str(tmp_path / "broken.snap")
+    for content in (data[:10], data[:len(data) // 2], b"x" * 400):
+        with open(broken, 'wb') as f:
+            f.write(content)
+        assert load_snapshot(broken) is None
+    assert load_snapshot(str(tmp_path / "missing.snap")) is None
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+import requests
+
+from iiko_api import IikoClient
+from menu_stream import ITEM, VALUE, iter_json_events, iter_nomenclature, stream_menu_to_file
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_events_do_not_depend_on_chunk_boundaries(chunk_size):
+    document = {
+        "correlationId": "c",
+        "groups": [{"id": "g", "name": "Группа «1»", "price": 12345.678e-2, "big": -98765432109876}],
+        "products": [{"id": str(i), "n": i * 1.5, "ok": i % 2 == 0, "none": None} for i in range(20)],
+        "sizes": [],
+        "revision": 1234567890
+    }
+    data = json.dumps(document, ensure_ascii=False).encode('utf-8')
+
+    rebuilt = {}
+    for event, key, value in iter_json_events(_chunks(data, chunk_size)):
+        if event == ITEM:
+            rebuilt.setdefault(key, []).append(value)
+        elif event == VALUE:
+            rebuilt[key] = value
+    rebuilt.setdefault("sizes", [])
+    assert rebuilt == document
+
+
+@pytest.mark.parametrize("data", [b'{"products": [{"id": 1}', b'{"revision": 12', b'{"a" 1}', b'[1, 2]'])
+def test_broken_documents_raise(data):
+    with pytest.raises(ValueError):
+        list(iter_json_events(_chunks(data, 4)))
+
+
+def test_iter_nomenclature_matches_get_nomenclature(client, token, organization_id):
+    menu = client.call("nomenclature", {"organizationId": organization_id, "startRevision": 0}, token)
+
+    streamed = {}
+    for key, value in iter_nomenclature(token, organization_id, client=client, chunk_size=1000):
+        if isinstance(menu.get(key), list):
+            streamed.setdefault(key, []).append(value)
+        else:
+            streamed[key] = value
+    assert streamed == {key: value for key, value in menu.items() if value != []}
+
+
+def test_iter_nomenclature_raises_instead_of_empty_menu(client, organization_id):
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(iter_nomenclature("bad-token", organization_id, client=client))
+
+    unreachable = IikoClient(base_url="http://127.0.0.1:9/api/1/", retry_policy=None)
+    unreachable.retry_policy.max_retries = 0
+    with pytest.raises(requests.exceptions.ConnectionError):
+        list(iter_nomenclature("token", organization_id, client=unreachable))
+
+
+def test_stream_menu_to_file_keeps_old_file_on_error(tmp_path, client, token, organization_id):
+    filename = str(tmp_path / "menu.json")
+    stats = stream_menu_to_file(token, organization_id, filename, client=client)
+    assert stats["products"] == 200
+    with open(filename, encoding='utf-8') as f:
+        saved = f.read()
+
+    assert stream_menu_to_file("bad-token", organization_id, filename, client=client) is None
+    with open(filename, encoding='utf-8') as f:
+        assert f.read() == saved
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["menu.json"]
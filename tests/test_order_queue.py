@@ -0,0 +1,70 @@
+import sqlite3
+
+from order_queue import ACKED, PENDING, SENDING, OrderQueue
+from order_utils import OrderBuilder
+
+
+def _orders(count):
+    builder = OrderBuilder()
+    return [builder.build([builder.item("product", price=100)]) for _ in range(count)]
+
+
+def test_queue_replays_pending_orders_after_restart(tmp_path, mock_server, client, token, organization_id):
+    path = str(tmp_path / "orders.sqlite3")
+    orders = _orders(3)
+
+    # Процесс поставил заказы в очередь и завершился, не начав отправку
+    queue = OrderQueue(token, path, client=client)
+    for order in orders:
+        queue.enqueue(organization_id, "terminal-group", order)
+    assert queue.counts()[PENDING] == 3
+
+    with OrderQueue(token, path, client=client) as restarted:
+        assert restarted.drain(timeout=10)
+        assert [restarted.get(order["id"]).state for order in orders] == [ACKED] * 3
+
+    created = client.call("order/by_id", {"organizationIds": [organization_id],
+                                          "orderIds": [order["id"] for order in orders]}, token)
+    assert len(created["orders"]) == 3
+
+
+def test_interrupted_send_is_checked_instead_of_duplicated(tmp_path, mock_server, client, token, organization_id):
+    path = str(tmp_path / "orders.sqlite3")
+    order = _orders(1)[0]
+
+    queue = OrderQueue(token, path, client=client)
+    queue.enqueue(organization_id, "terminal-group", order)
+    # Заказ ушел в iiko, но процесс завершился до записи ответа
+    client.call("order/create", {"organizationId": organization_id, "terminalGroupId": "terminal-group",
+                                 "order": order}, token)
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("UPDATE orders SET state = ?, attempts = 1 WHERE order_id = ?", (SENDING, order["id"]))
+    connection.close()
+
+    with OrderQueue(token, path, client=client) as restarted:
+        assert restarted.drain(timeout=10)
+        queued = restarted.get(order["id"])
+
+    # Повторный order/create вернул бы 400 "уже существует", и заказ стал бы failed
+    assert queued.state == ACKED
+    assert queued.attempts == 2
+    assert queued.response["id"] == order["id"]
+
+
+def test_queue_retries_after_server_errors(tmp_path, mock_server, client, token, organization_id):
+    from transport import RetryPolicy
+
+    client.retry_policy = RetryPolicy(max_retries=0)
+    queue = OrderQueue(token, str(tmp_path / "orders.sqlite3"), client=client,
+                       retry_policy=RetryPolicy(base_delay=0.0))
+    order = _orders(1)[0]
+    mock_server.fail_next(2, status=429)
+
+    with queue:
+        queue.enqueue(organization_id, "terminal-group", order)
+        assert queue.drain(timeout=10)
+
+    queued = queue.get(order["id"])
+    assert queued.state == ACKED
+    assert queued.attempts == 3
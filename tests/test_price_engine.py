@@ -0,0 +1,84 @@
+import copy
+import math
+
+import pytest
+
+import price_engine
+from mock_server import build_mock_menu
+from price_engine import PriceEngine
+
+
+def _menus():
+    menu = build_mock_menu(300)
+    menu['products'][1]['sizePrices'][0]['price']['currentPrice'] = None
+    menu['products'][2]['sizePrices'][0]['price']['isIncludedInMenu'] = False
+    menu['products'][3]['sizePrices'][0]['price']['currentPrice'] = 123.45
+
+    new_menu = copy.deepcopy(menu)
+    new_menu['products'][3]['sizePrices'][0]['price']['currentPrice'] = 99.99
+    del new_menu['products'][4]
+    new_menu['products'].append({"id": "new", "sizePrices": [{"sizeId": None, "price": {"currentPrice": 10}}]})
+    return menu, new_menu
+
+
+def _normalize(value):
+    # NaN не равен самому себе, поэтому сравнивается как строка
+    if isinstance(value, float) and math.isnan(value):
+        return "nan"
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+def _results():
+    menu, new_menu = _menus()
+    engine = PriceEngine(menu)
+    keys = [(product['id'], product['sizePrices'][0]['sizeId']) for product in menu['products'][5:80]]
+    amounts = [1, 2, 0.5, 3.3, 7] * 15
+
+    results = {
+        "filter": engine.filter_by_price(100, 300),
+        "filter_included": engine.filter_by_price(included_only=True),
+        "filter_max": engine.filter_by_price(max_price=150.5),
+        "reprice_rounded": list(engine.reprice(1.07, 0.3, round_to=0.5)),
+        "reprice": list(engine.reprice(0.9)),
+        "total": engine.total(keys, amounts),
+        "diff": engine.diff(PriceEngine(new_menu)),
+    }
+    engine.reprice(1.5, target_category_id="marked_up")
+    results["column"] = list(engine.column("marked_up"))
+    results["price"] = engine.get_price(*keys[0], price_category_id="marked_up")
+    return results
+
+
+def test_numpy_and_array_paths_match(monkeypatch):
+    pytest.importorskip("numpy")
+    vectorized = _results()
+    monkeypatch.setattr(price_engine, "numpy", None)
+    assert _normalize(_results()) == _normalize(vectorized)
+
+
+def test_total_without_price_raises_on_both_paths(monkeypatch):
+    menu, _ = _menus()
+    key = (menu['products'][1]['id'], menu['products'][1]['sizePrices'][0]['sizeId'])
+    if price_engine.numpy is not None:
+        with pytest.raises(KeyError):
+            PriceEngine(menu).total([key], [1])
+    monkeypatch.setattr(price_engine, "numpy", None)
+    with pytest.raises(KeyError):
+        PriceEngine(menu).total([key], [1])
+
+
+def test_array_path_values(monkeypatch):
+    monkeypatch.setattr(price_engine, "numpy", None)
+    menu, _ = _menus()
+    engine = PriceEngine(menu)
+    product = menu['products'][3]
+    size_id = product['sizePrices'][0]['sizeId']
+
+    assert engine.get_price(product['id'], size_id) == 123.45
+    assert engine.get_price(menu['products'][1]['id'], menu['products'][1]['sizePrices'][0]['sizeId']) is None
+    assert (product['id'], size_id, 123.45) in engine.filter_by_price(123.45, 123.45)
+    assert engine.total([(product['id'], size_id)] * 3, [1, 1, 1]) == math.fsum([123.45] * 3)
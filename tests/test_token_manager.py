@@ -0,0 +1,43 @@
+import threading
+
+from token_manager import TokenManager
+
+
+def test_concurrent_401_refresh_token_once(mock_server, client):
+    manager = TokenManager("test", client=client, background_refresh=False)
+    old_token = manager.get_token()
+    issued = mock_server.token_count
+
+    mock_server.expire_tokens()
+    barrier = threading.Barrier(8)
+    results = []
+    errors = []
+
+    def request():
+        barrier.wait()
+        try:
+            results.append(client.call("organizations", {}, manager))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(results) == 8
+    assert mock_server.token_count == issued + 1
+    assert manager.cached_token not in (None, old_token)
+
+
+def test_cached_token_is_reused(mock_server, client):
+    manager = TokenManager("test", client=client, background_refresh=False)
+    token = manager.get_token()
+    assert manager.get_token() == token
+    assert mock_server.token_count == 1
+
+    manager.invalidate()
+    assert manager.get_token() != token
+    assert mock_server.token_count == 2
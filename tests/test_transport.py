@@ -0,0 +1,109 @@
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from iiko_api import IikoApiError, IikoClient
+from transport import RetryPolicy, SingleFlight, TokenBucket, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+
+
+def test_retry_policy_status_delay():
+    policy = RetryPolicy(max_retries=2, base_delay=0.0, max_retry_after=10)
+    assert policy.status_delay(0, 429, "3") == 3.0
+    assert policy.status_delay(0, 503) == 0.0
+    assert policy.status_delay(0, 400) is None
+    assert policy.status_delay(0, 429, "60") is None
+    assert policy.status_delay(2, 429, "1") is None
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_single_flight_runs_one_call_for_concurrent_callers():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def function():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", function))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.coalesced_count < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+
+
+def test_single_flight_shares_exception():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    # Ключ освобождается после ошибки
+    assert flight.do("key", lambda: 1) == 1
+
+
+def test_client_retries_429_after_retry_after(mock_server, token):
+    client = IikoClient(base_url=mock_server.url, retry_policy=RetryPolicy(max_retries=3, base_delay=0.0))
+    mock_server.fail_next(2, status=429, retry_after=0.2)
+
+    started = time.monotonic()
+    result = client.call("organizations", {}, token)
+    elapsed = time.monotonic() - started
+    client.close()
+
+    assert result["organizations"]
+    # base_delay=0, поэтому ожидание берется только из Retry-After
+    assert elapsed >= 0.4
+
+
+def test_client_gives_up_when_retry_after_too_long(mock_server, token):
+    client = IikoClient(base_url=mock_server.url, retry_policy=RetryPolicy(max_retry_after=1))
+    mock_server.fail_next(1, status=429, retry_after=30)
+
+    started = time.monotonic()
+    with pytest.raises(IikoApiError) as error:
+        client.call("organizations", {}, token)
+    client.close()
+
+    assert error.value.status_code == 429
+    assert time.monotonic() - started < 5
+
+
+def test_client_stops_after_max_retries(mock_server, token):
+    client = IikoClient(base_url=mock_server.url, retry_policy=RetryPolicy(max_retries=2, base_delay=0.0))
+    mock_server.fail_next(5, status=503)
+
+    with pytest.raises(IikoApiError) as error:
+        client.call("organizations", {}, token)
+    client.close()
+
+    assert error.value.status_code == 503
+    # Первая попытка и два повтора
+    assert mock_server.next_failure() is not None and mock_server.next_failure() is not None
+    assert mock_server.next_failure() is None
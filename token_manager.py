@@ -0,0 +1,160 @@
+import threading
+import time
+
+from iiko_api import get_default_client
+
+
+# Токен iiko живет один час
+DEFAULT_TOKEN_LIFETIME = 3600
+DEFAULT_REFRESH_MARGIN = 300
+
+
+class TokenManager:
+    """
+    Кэширует токен доступа для одного apiLogin и обновляет его заранее
+
+    Экземпляр можно передавать во все функции iiko_api вместо строки токена:
+    токен будет взят из кэша, а при ответе 401 обновлен и запрос повторен
+    один раз. Одновременные попытки обновления объединяются в один запрос.
+
+    Args:
+        api_login (str): API логин для iiko
+        client (IikoClient): Клиент для запроса токена (по умолчанию общий)
+        lifetime (float): Время жизни токена в секундах
+        refresh_margin (float): За сколько секунд до истечения обновлять токен
+        background_refresh (bool): Обновлять токен в фоновом потоке
+    """
+
+    def __init__(self, api_login, client=None, lifetime=DEFAULT_TOKEN_LIFETIME,
+                 refresh_margin=DEFAULT_REFRESH_MARGIN, background_refresh=True):
+        self.api_login = api_login
+        self.client = client
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self.correlation_id = None
+
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = None
+        self._timer = None
+        self._closed = False
+
+    @property
+    def cached_token(self):
+        """Токен из кэша, если он еще действует, иначе None (без запросов к API)"""
+        token = self._token
+        if token is not None and time.monotonic() < self._expires_at:
+            return token
+        return None
+
+    def get_token(self):
+        """
+        Возвращает действующий токен, при необходимости получая новый
+
+        Returns:
+            str: Токен доступа или None, если получить токен не удалось
+        """
+        token = self.cached_token
+        if token is not None:
+            return token
+        return self.refresh(stale_token=self._token)
+
+    def refresh(self, stale_token=None):
+        """
+        Получает новый токен. Если обновление уже идет в другом потоке,
+        дожидается его результата вместо повторного запроса.
+
+        Args:
+            stale_token (str): Токен, который считается устаревшим. Если кэш
+                уже содержит другой токен, он возвращается без запроса.
+
+        Returns:
+            str: Токен доступа или None при ошибке
+        """
+        with self._lock:
+            if stale_token is not None and self._token is not None and self._token != stale_token:
+                return self._token
+
+            event = self._refreshing
+            leader = event is None
+            if leader:
+                event = self._refreshing = threading.Event()
+
+        if not leader:
+            event.wait()
+            return self._token
+
+        result = None
+        try:
+            client = self.client or get_default_client()
+            result = client.get_iiko_access_token(self.api_login)
+        finally:
+            with self._lock:
+                if result and 'token' in result:
+                    self._token = result['token']
+                    self._expires_at = time.monotonic() + self.lifetime
+                    self.correlation_id = result.get('correlationId')
+                self._refreshing = None
+            event.set()
+
+        if result and 'token' in result:
+            self._schedule_refresh()
+            return result['token']
+
+        print(f"Не удалось обновить токен для apiLogin {self.api_login}")
+        return None
+
+    def invalidate(self):
+        """Сбрасывает кэшированный токен"""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+    def close(self):
+        """Останавливает фоновое обновление токена"""
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule_refresh(self):
+        if not self.background_refresh or self._closed:
+            return
+
+        if self._timer is not None:
+            self._timer.cancel()
+
+        delay = max(self.lifetime - self.refresh_margin, 0)
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        if not self._closed:
+            self.refresh(stale_token=self._token)
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(api_login, client=None, **kwargs):
+    """
+    Возвращает общий TokenManager для apiLogin, создавая его при первом вызове
+
+    Args:
+        api_login (str): API логин для iiko
+        client (IikoClient): Клиент для запроса токена (по умолчанию общий)
+        **kwargs: Дополнительные параметры TokenManager
+
+    Returns:
+        TokenManager: Менеджер токена для apiLogin
+    """
+    with _managers_lock:
+        manager = _managers.get(api_login)
+        if manager is None:
+            manager = TokenManager(api_login, client=client, **kwargs)
+            _managers[api_login] = manager
+        return manager
@@ -0,0 +1,324 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+# Коды ответа, после которых запрос имеет смысл повторить
+DEFAULT_RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# Методы только для чтения: одинаковые одновременные запросы к ним объединяются
+READ_ONLY_PATHS = frozenset((
+    "organizations",
+    "nomenclature",
+    "terminal_groups",
+    "reserve/available_restaurant_sections",
+    "order/by_id"
+))
+
+
+def parse_retry_after(value):
+    """
+    Разбирает заголовок Retry-After
+
+    Args:
+        value (str): Значение заголовка - число секунд или HTTP-дата
+
+    Returns:
+        float: Задержка в секундах или None, если заголовок отсутствует или некорректен
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    Политика повторов: экспоненциальная задержка со случайным разбросом
+
+    Задержка перед повтором номер attempt (с нуля) выбирается случайно
+    из [0, min(max_delay, base_delay * 2 ** attempt)]. Если сервер прислал
+    Retry-After, используется он.
+
+    Заказы создаются с ID, сформированным на клиенте, поэтому повтор
+    order/create не приводит к дублированию заказа.
+
+    Args:
+        max_retries (int): Максимум повторов одного запроса
+        base_delay (float): Базовая задержка в секундах
+        max_delay (float): Максимальная задержка в секундах
+        retry_statuses (iterable): Коды ответа, после которых выполняется повтор
+        max_retry_after (float): Если Retry-After больше, запрос не повторяется
+    """
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30.0,
+                 retry_statuses=DEFAULT_RETRY_STATUSES, max_retry_after=120.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt):
+        """
+        Возвращает задержку перед повтором
+
+        Args:
+            attempt (int): Номер повтора, начиная с нуля
+
+        Returns:
+            float: Задержка в секундах
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def status_delay(self, attempt, status_code, retry_after=None):
+        """
+        Решает, нужно ли повторить запрос после ответа с кодом status_code
+
+        Args:
+            attempt (int): Номер повтора, начиная с нуля
+            status_code (int): Код ответа
+            retry_after (str): Значение заголовка Retry-After
+
+        Returns:
+            float: Задержка перед повтором или None, если повторять не нужно
+        """
+        if attempt >= self.max_retries or status_code not in self.retry_statuses:
+            return None
+
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            return self.backoff(attempt)
+        if delay > self.max_retry_after:
+            return None
+        return delay
+
+    def error_delay(self, attempt):
+        """
+        Решает, нужно ли повторить запрос после ошибки соединения или таймаута
+
+        Args:
+            attempt (int): Номер повтора, начиная с нуля
+
+        Returns:
+            float: Задержка перед повтором или None, если повторять не нужно
+        """
+        if attempt >= self.max_retries:
+            return None
+        return self.backoff(attempt)
+
+
+class TokenBucket:
+    """
+    Ограничение частоты запросов по алгоритму token bucket
+
+    Args:
+        rate (float): Запросов в секунду в среднем
+        burst (int): Сколько запросов можно отправить подряд без ожидания
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Резервирует право на один запрос
+
+        Returns:
+            float: Сколько секунд нужно подождать перед отправкой запроса
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Набор TokenBucket, по одному на ключ (apiLogin или токен)
+
+    Args:
+        rate (float): Запросов в секунду для одного ключа
+        burst (int): Сколько запросов можно отправить подряд без ожидания
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key):
+        """
+        Резервирует право на один запрос для ключа
+
+        Args:
+            key (str): apiLogin или токен
+
+        Returns:
+            float: Сколько секунд нужно подождать перед отправкой запроса
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+        return bucket.reserve()
+
+    def acquire(self, key):
+        """
+        Ожидает, пока для ключа можно будет отправить запрос
+
+        Args:
+            key (str): apiLogin или токен
+        """
+        delay = self.reserve(key)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def tenant_key(token, payload=None):
+    """
+    Возвращает ключ клиента iiko для ограничения частоты и кэширования
+
+    Args:
+        token (str | TokenManager): Токен доступа
+        payload (dict): Тело запроса (для access_token берется apiLogin)
+
+    Returns:
+        str: apiLogin, если он известен, иначе токен
+    """
+    api_login = getattr(token, 'api_login', None)
+    if api_login:
+        return api_login
+    if token:
+        return token
+    if isinstance(payload, dict):
+        return payload.get('apiLogin')
+    return None
+
+
+def request_key(path, token, payload):
+    """
+    Возвращает ключ запроса для объединения одинаковых запросов
+
+    Args:
+        path (str): Путь метода API
+        token (str | TokenManager): Токен доступа
+        payload (dict): Тело запроса
+
+    Returns:
+        tuple: Ключ из метода, клиента iiko и тела запроса
+    """
+    return path, tenant_key(token, payload), json.dumps(payload, sort_keys=True, ensure_ascii=False)
+
+
+class SingleFlight:
+    """
+    Объединяет одинаковые одновременные вызовы в один
+
+    Пока выполняется вызов с ключом, остальные вызовы с тем же ключом ждут
+    его и получают тот же результат (тот же объект) или то же исключение.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced_count = 0
+
+    def do(self, key, function):
+        """
+        Выполняет function() или ждет уже выполняющийся вызов с тем же ключом
+
+        Args:
+            key: Ключ вызова
+            function (callable): Функция без аргументов
+
+        Returns:
+            Результат function()
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                future.set_running_or_notify_cancel()
+            else:
+                self.coalesced_count += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    Вариант SingleFlight для asyncio
+
+    Вызов выполняется в отдельной задаче, поэтому отмена первого ожидающего
+    не прерывает запрос для остальных.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self.coalesced_count = 0
+
+    async def do(self, key, coroutine_function):
+        """
+        Выполняет coroutine_function() или ждет уже выполняющийся вызов с тем же ключом
+
+        Args:
+            key: Ключ вызова
+            coroutine_function (callable): Функция без аргументов, возвращающая корутину
+
+        Returns:
+            Результат корутины
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coroutine_function())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced_count += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
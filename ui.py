@@ -1,5 +1,8 @@
 import json
 
+from menu_search import MenuSearchIndex
+from table_index import TableIndex
+
 
 def select_organization(organizations):
     """
@@ -70,12 +73,24 @@ def select_terminal_group(terminal_groups):
             print("Введите число")
 
 
-def select_product_from_menu(products):
+def _format_product_price(product):
+    if product.get('sizePrices') and len(product['sizePrices']) > 0:
+        current_price = product['sizePrices'][0].get('price', {}).get('currentPrice')
+        if current_price:
+            return f"{current_price} руб."
+    return "Цена не указана"
+
+
+def select_product_from_menu(products, search_index=None):
     """
-    Позволяет пользователю выбрать продукт из меню
+    Позволяет пользователю найти и выбрать продукт из меню
+
+    Продукты выводятся по страницам; введенный текст ищется по названиям
+    и артикулам с учетом опечаток.
 
     Args:
         products (list): Список продуктов
+        search_index (MenuSearchIndex): Готовый индекс меню (по умолчанию строится по products)
 
     Returns:
         dict: Выбранный продукт или None
@@ -83,28 +98,42 @@ def select_product_from_menu(products):
     if not products:
         return None
 
-    print("\nДоступные продукты (первые 20):")
-    display_products = products[:20]
-
-    for i, product in enumerate(display_products, 1):
-        price = "Цена не указана"
-        if product.get('sizePrices') and len(product['sizePrices']) > 0:
-            current_price = product['sizePrices'][0].get('price', {}).get('currentPrice')
-            if current_price:
-                price = f"{current_price} руб."
-
-        print(f"{i}. {product.get('name', 'Без названия')} - {price}")
+    index = search_index or MenuSearchIndex(products)
+    query = ""
+    page_number = 1
 
     while True:
-        try:
-            choice = input(f"\nВыберите продукт (1-{len(display_products)}): ")
-            index = int(choice) - 1
-            if 0 <= index < len(display_products):
-                return display_products[index]
+        page = index.search(query, page=page_number)
+        if query:
+            print(f"\nНайдено по запросу '{query}': {page.total} (страница {page.page} из {page.pages})")
+        else:
+            print(f"\nДоступные продукты: {page.total} (страница {page.page} из {page.pages})")
+
+        for i, product in enumerate(page.items, 1):
+            print(f"{i}. {product.get('name', 'Без названия')} - {_format_product_price(product)}")
+
+        choice = input("\nНомер продукта, текст для поиска, > или < - другая страница, "
+                       "пустая строка - все продукты: ").strip()
+
+        if choice.isdigit() and 1 <= int(choice) <= len(page.items):
+            return page.items[int(choice) - 1]
+        if choice == ">":
+            if page.has_next:
+                page_number += 1
             else:
-                print("Неверный номер продукта")
-        except ValueError:
-            print("Введите число")
+                print("Это последняя страница")
+        elif choice == "<":
+            if page_number > 1:
+                page_number -= 1
+            else:
+                print("Это первая страница")
+        else:
+            # Число вне номеров страницы ищется как артикул
+            query = choice
+            page_number = 1
+            if query and not index.search(query, page_size=1).total:
+                print("Ничего не найдено")
+                query = ""
 
 
 def display_order_info(order_data):
@@ -156,6 +185,24 @@ def display_order_info(order_data):
         print("Детали заказа недоступны (возможно, заказ еще обрабатывается)")
 
 
+def display_order_change(change):
+    """
+    Отображает только изменившиеся поля заказа
+
+    Args:
+        change (OrderChange): Изменение из order_changes.OrderChangeStream
+    """
+    titles = {"new": "новый заказ", "changed": "изменен", "closed": "закрыт"}
+    print(f"\n🔄 Заказ {change.order_id}: {titles.get(change.kind, change.kind)}")
+    for field, old, new in change.changes:
+        if old is None:
+            print(f"  + {field}: {new}")
+        elif new is None:
+            print(f"  - {field}: {old}")
+        else:
+            print(f"  {field}: {old} -> {new}")
+
+
 def print_menu_stats(menu_result):
     """
     Выводит статистику по меню
@@ -198,7 +245,8 @@ def select_table(restaurant_sections):
     Позволяет пользователю выбрать стол из доступных секций ресторана
 
     Args:
-        restaurant_sections (list): Список секций ресторана с столами
+        restaurant_sections (list | TableIndex): Список секций ресторана с столами
+            или индекс столов, в котором удаленные столы уже исключены
 
     Returns:
         dict: Выбранный стол с информацией о секции или None
@@ -207,8 +255,13 @@ def select_table(restaurant_sections):
         print("Нет доступных секций ресторана")
         return None
 
+    if isinstance(restaurant_sections, TableIndex):
+        all_tables = restaurant_sections.table_choices()
+        restaurant_sections = ()
+    else:
+        all_tables = []
+
     # Собираем все столы из всех секций
-    all_tables = []
     for section in restaurant_sections:
         section_name = section.get('name', 'Без названия')
         tables = section.get('tables', [])
@@ -0,0 +1,324 @@
+import hmac
+import json
+import queue
+import threading
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+DEFAULT_MAX_QUEUE_SIZE = 1000
+DEFAULT_WORKERS = 4
+DEFAULT_DEDUP_SIZE = 10000
+DEFAULT_MAX_BODY_SIZE = 10 * 1024 * 1024
+
+# Типы событий iiko, в eventInfo которых передаются данные заказа
+ORDER_EVENT_TYPES = frozenset(("DeliveryOrderUpdate", "DeliveryOrderError", "TableOrderUpdate", "TableOrderError"))
+
+
+class WebhookEvent:
+    """
+    Событие, полученное от iiko через webhook
+
+    Attributes:
+        event_type (str): Тип события (DeliveryOrderUpdate, TableOrderUpdate, StopListUpdate и т.д.)
+        event_time (str): Время события
+        organization_id (str): ID организации
+        correlation_id (str): correlationId события
+        event_info (dict): Данные события (для заказов - в формате order/by_id)
+        raw (dict): Исходный объект события
+    """
+    __slots__ = ("event_type", "event_time", "organization_id", "correlation_id", "event_info", "raw")
+
+    def __init__(self, raw):
+        self.event_type = raw.get('eventType')
+        self.event_time = raw.get('eventTime')
+        self.organization_id = raw.get('organizationId')
+        self.correlation_id = raw.get('correlationId')
+        self.event_info = raw.get('eventInfo') or {}
+        self.raw = raw
+
+    @property
+    def order_id(self):
+        return self.event_info.get('id')
+
+    @property
+    def dedup_key(self):
+        # В одном пакете iiko может прислать события разных заказов с общим correlationId
+        if not self.correlation_id:
+            return None
+        return (self.correlation_id, self.event_type, self.order_id)
+
+    def __repr__(self):
+        return (f"WebhookEvent(event_type={self.event_type!r}, order_id={self.order_id!r}, "
+                f"correlation_id={self.correlation_id!r})")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.receiver.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _reply(self, status, message=None, headers=None):
+        body = json.dumps({"message": message} if message else {}, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        receiver = self.server.receiver
+
+        if self.path.split('?', 1)[0] != receiver.path:
+            return self._reply(404, "Неизвестный путь")
+
+        # В ответах до чтения тела оно остается в сокете, поэтому соединение нельзя использовать повторно
+        if not receiver.check_auth(self.headers.get("Authorization")):
+            self.close_connection = True
+            return self._reply(401, "Unauthorized")
+
+        # int() принимает знак, пробелы и подчеркивания, поэтому допускаются только цифры
+        content_length = self.headers.get("Content-Length", "0")
+        if not content_length.isdecimal():
+            self.close_connection = True
+            return self._reply(400, "Некорректный Content-Length")
+        length = int(content_length)
+        if length > receiver.max_body_size:
+            self.close_connection = True
+            return self._reply(413, "Слишком большой запрос")
+        body = self.rfile.read(length)
+
+        try:
+            events = receiver.parse(body)
+        except ValueError as e:
+            return self._reply(400, str(e))
+
+        if not receiver.offer(events):
+            return self._reply(503, "Очередь событий заполнена", {"Retry-After": str(receiver.retry_after)})
+        self._reply(200)
+
+
+class WebhookReceiver:
+    """
+    Принимает события iiko по webhook и передает их обработчикам в пуле потоков
+
+    Адрес приемника и authToken задаются в настройках webhook организации
+    в iiko. Запросы с неверным заголовком Authorization отклоняются, события
+    с уже полученным correlationId пропускаются, остальные ставятся в
+    ограниченную очередь. Если обработчики не успевают и очередь заполнена,
+    приемник отвечает 503 с Retry-After, и iiko повторяет отправку позже.
+
+    Args:
+        host (str): Адрес для прослушивания
+        port (int): Порт (0 - выбрать свободный)
+        auth_token (str): Ожидаемое значение заголовка Authorization (None - без проверки)
+        path (str): Путь, на который iiko отправляет события
+        workers (int): Количество потоков обработчиков
+        max_queue_size (int): Максимум событий в очереди
+        dedup_size (int): Сколько последних correlationId хранится для отсева повторов
+        max_body_size (int): Максимальный размер запроса в байтах
+        retry_after (int): Значение Retry-After при заполненной очереди в секундах
+        verbose (bool): Выводить журнал запросов
+    """
+
+    def __init__(self, host="0.0.0.0", port=0, auth_token=None, path="/", workers=DEFAULT_WORKERS,
+                 max_queue_size=DEFAULT_MAX_QUEUE_SIZE, dedup_size=DEFAULT_DEDUP_SIZE,
+                 max_body_size=DEFAULT_MAX_BODY_SIZE, retry_after=5, verbose=False):
+        self.auth_token = auth_token
+        self.path = path
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.dedup_size = dedup_size
+        self.max_body_size = max_body_size
+        self.retry_after = retry_after
+        self.verbose = verbose
+
+        self.received_count = 0
+        self.duplicate_count = 0
+        self.rejected_count = 0
+
+        self._handlers = []
+        self._queue = queue.Queue()
+        self._queue_lock = threading.Lock()
+        self._queued = 0
+        self._seen = OrderedDict()
+        self._threads = []
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.receiver = self
+        self._server_thread = None
+
+    @property
+    def url(self):
+        """Адрес приемника для настроек webhook в iiko"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    @property
+    def queue_size(self):
+        """Количество событий, ожидающих обработки"""
+        return self._queued
+
+    def add_handler(self, handler, event_types=None):
+        """
+        Добавляет обработчик событий
+
+        Args:
+            handler (callable): Функция handler(event), вызываемая в потоке пула
+            event_types (iterable): Типы событий (None - все события)
+        """
+        self._handlers.append((handler, frozenset(event_types) if event_types is not None else None))
+
+    def check_auth(self, authorization):
+        if self.auth_token is None:
+            return True
+        if authorization is None:
+            return False
+        if authorization.startswith("Bearer "):
+            authorization = authorization[len("Bearer "):]
+        return hmac.compare_digest(authorization.encode('utf-8'), self.auth_token.encode('utf-8'))
+
+    def parse(self, body):
+        """
+        Разбирает тело запроса iiko в список событий
+
+        Args:
+            body (bytes): Тело запроса - объект события или массив событий
+
+        Returns:
+            list: WebhookEvent
+
+        Raises:
+            ValueError: Если тело не является JSON с событиями
+        """
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            raise ValueError("Некорректный JSON")
+
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, list) or not all(isinstance(item, dict) and item.get('eventType') for item in data):
+            raise ValueError("Ожидается событие или массив событий с полем eventType")
+        return [WebhookEvent(item) for item in data]
+
+    def offer(self, events):
+        """
+        Ставит события в очередь, пропуская уже полученные
+
+        События одного запроса принимаются целиком или не принимаются совсем,
+        чтобы при повторной отправке после 503 ни одно из них не потерялось.
+
+        Args:
+            events (list): WebhookEvent
+
+        Returns:
+            bool: False, если в очереди нет места (запрос учитывается в rejected_count)
+        """
+        with self._queue_lock:
+            fresh = []
+            keys = set()
+            for event in events:
+                key = event.dedup_key
+                if key is not None and (key in self._seen or key in keys):
+                    self.duplicate_count += 1
+                    continue
+                keys.add(key)
+                fresh.append(event)
+
+            if self._queued + len(fresh) > self.max_queue_size:
+                self.rejected_count += 1
+                return False
+
+            for event in fresh:
+                key = event.dedup_key
+                if key is not None:
+                    self._seen[key] = True
+                    if len(self._seen) > self.dedup_size:
+                        self._seen.popitem(last=False)
+            self._queued += len(fresh)
+            self.received_count += len(fresh)
+
+        for event in fresh:
+            self._queue.put(event)
+        return True
+
+    def _dispatch(self, event):
+        for handler, event_types in self._handlers:
+            if event_types is not None and event.event_type not in event_types:
+                continue
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"Ошибка в обработчике события {event.event_type}: {e}")
+
+    def _work(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            try:
+                self._dispatch(event)
+            finally:
+                with self._queue_lock:
+                    self._queued -= 1
+
+    def start(self):
+        """Запускает прием запросов и потоки обработчиков"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"iiko-webhook-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name="iiko-webhook",
+                                               daemon=True)
+        self._server_thread.start()
+        return self
+
+    def stop(self):
+        """Прекращает прием запросов и ждет обработки событий, уже стоящих в очереди"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._server_thread is not None:
+            self._server_thread.join()
+            self._server_thread = None
+
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def tracker_handler(tracker):
+    """
+    Создает обработчик, передающий статусы заказов из webhook в OrderStatusTracker
+
+    Заказы, финальный статус которых пришел через webhook, перестают
+    опрашиваться через order/by_id.
+
+    Args:
+        tracker (OrderStatusTracker): Отслеживание статуса заказов
+
+    Returns:
+        callable: Обработчик для WebhookReceiver.add_handler
+    """
+    def handler(event):
+        if event.event_type not in ORDER_EVENT_TYPES or not event.order_id:
+            return
+        order = dict(event.event_info)
+        order.setdefault('organizationId', event.organization_id)
+        tracker.notify(order)
+
+    return handler